@@ -0,0 +1,63 @@
+import click
+
+
+def register_commands(app):
+    """Maintenance commands, run with `flask <command>`."""
+
+    @app.cli.command("purge-idempotency-keys")
+    def purge_idempotency_keys_command():
+        """Delete expired Idempotency-Key records."""
+        from .utils.idempotency_utils import purge_expired_idempotency_keys
+
+        removed = purge_expired_idempotency_keys()
+        click.echo(f"Removed {removed} expired idempotency keys")
+
+    @app.cli.command("deactivate-expired-api-keys")
+    def deactivate_expired_api_keys_command():
+        """Deactivate API keys whose rotation grace period has ended."""
+        from .utils.api_key_utils import deactivate_expired_api_keys
+
+        count = deactivate_expired_api_keys()
+        click.echo(f"Deactivated {count} expired API keys")
+
+    @app.cli.command("gc-images")
+    @click.option("--dry-run", is_flag=True, help="Report what would be removed.")
+    def gc_images_command(dry_run):
+        """Prune dangling layers and evict unused images over the disk budget."""
+        from .utils.image_gc_utils import collect_images
+
+        report = collect_images(dry_run=dry_run)
+        click.echo(
+            f"Reclaimed {report['reclaimed_bytes']} bytes, "
+            f"evicted {len(report['evicted'])} images"
+        )
+        for image in report["evicted"]:
+            click.echo(f"  {image['id'][:19]} {', '.join(image['tags'])} {image['bytes']}")
+
+    @app.cli.command("reconcile")
+    @click.option("--dry-run", is_flag=True, help="Report without changing anything.")
+    def reconcile_command(dry_run):
+        """Remove orphan Docker containers and fail rows whose container is gone."""
+        from .utils.reconcile_utils import reconcile_containers
+
+        report = reconcile_containers(dry_run=dry_run)
+        click.echo(
+            f"{'Would remove' if dry_run else 'Removed'} {len(report['removed'])} orphan containers; "
+            f"{len(report['missing'])} rows missing their container"
+        )
+        for orphan in report["removed"]:
+            click.echo(f"  orphan {orphan['docker_id'][:12]} (row {orphan['container_id']})")
+        for row_id in report["missing"]:
+            click.echo(f"  missing {row_id}")
+
+    @app.cli.command("profile-token")
+    @click.option("--ttl", default=600, show_default=True, help="Validity in seconds.")
+    def profile_token_command(ttl):
+        """Print an X-Profile-Token header value for on-demand profiling."""
+        import time
+
+        from .utils.profiling_utils import PROFILING_SECRET, sign_profile_token
+
+        if not PROFILING_SECRET:
+            raise click.ClickException("PROFILING_SECRET is not set")
+        click.echo(sign_profile_token(time.time() + ttl))
@@ -1,14 +1,18 @@
 from functools import wraps
 from flask import request, jsonify, g, current_app
-import requests
 import os
-from dotenv import load_dotenv
+import logging
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.timing_utils import span
 
-load_dotenv()
+requests = lazy_import("requests")
 
 # Auth service URL
 AUTH_SERVICE_URL = os.environ.get("AUTH_SERVICE_URL", "http://localhost:5001/api")
 
+# Hot-path logger; sample it with LOG_SAMPLE_RATES="app.auth=..."
+logger = logging.getLogger("app.auth")
+
 
 def login_required(f):
     @wraps(f)
@@ -16,14 +20,10 @@ def login_required(f):
         from flask import g
         # Extract token from headers or cookies
         token = request.headers.get("Authorization")
-        current_app.logger.info("Attempting to extract token from headers")
 
         if not token:
-            current_app.logger.info("Token not found in headers; checking cookies")
+            logger.debug("Token not found in headers; checking cookies")
             token = request.cookies.get("jwt")
-            current_app.logger.info(f"the token in cookies is {token}")
-            
-        current_app.logger.info(f"the cookies for this request are {request.cookies}")
 
         if not token:
             current_app.logger.warning("Authorization token is missing")
@@ -31,21 +31,17 @@ def login_required(f):
 
         # Remove "Bearer " prefix if present
         token = token.replace("Bearer ", "")
-        current_app.logger.debug(f"Token extracted: {token[:10]}... (truncated)")
 
         try:
             # Call the auth service to validate the token
-
-            current_app.logger.info(
-                "Calling auth service to validate token. The token is: " + token
-            )
-            response = requests.post(
-                f"{AUTH_SERVICE_URL}/auth/validate-token",
-                json={"token": token},
-                timeout=5,  # Set a timeout to avoid hanging requests
-            )
+            logger.debug("Calling auth service to validate token")
+            with span("auth"):
+                response = requests.post(
+                    f"{AUTH_SERVICE_URL}/auth/validate-token",
+                    json={"token": token},
+                    timeout=5,  # Set a timeout to avoid hanging requests
+                )
             response.raise_for_status()  # Raise an exception for HTTP errors
-            current_app.logger.info("Auth service responded successfully")
 
             # Parse the response from the auth service
             user_data = response.json().get("user")
@@ -55,8 +51,7 @@ def login_required(f):
 
             # Store the user information in Flask's `g` context
             g.user = user_data
-            current_app.logger.info(f"User authenticated: {user_data['id']}")
-            current_app.logger.info("g.user is " + str(g.user))
+            logger.debug(f"User authenticated: {user_data['id']}")
         except requests.exceptions.Timeout:
             current_app.logger.error("Auth service request timed out")
             return jsonify({"error": "Auth service timeout"}), 504
@@ -70,3 +65,19 @@ def login_required(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+
+def admin_required(f):
+    """Use after login_required; rejects users whose role isn't ADMIN."""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user = g.get("user") or {}
+        if str(user.get("role", "")).upper() != "ADMIN":
+            current_app.logger.warning(
+                f"Non-admin user {user.get('id')} denied access to {request.path}"
+            )
+            return jsonify({"error": "Admin access required"}), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
@@ -6,6 +6,11 @@ from app.models.container import Container  # Keep Container relationship
 
 class APIKey(db.Model):
     __tablename__ = "api_keys"
+    __table_args__ = (
+        db.Index("ix_api_keys_user_id_is_active", "user_id", "is_active"),
+        db.Index("ix_api_keys_created_at", "created_at"),
+        db.Index("ix_api_keys_expires_at", "expires_at"),
+    )
 
     id = db.Column(
         db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -19,6 +24,9 @@ class APIKey(db.Model):
     key = db.Column(db.String(255), unique=True, nullable=False)  # Unique API key
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    expires_at = db.Column(
+        db.DateTime, nullable=True
+    )  # Set when the key is rotated out; deactivated by the sweep after this
 
     # Remove User relationship (handled via API)
     container = db.relationship(
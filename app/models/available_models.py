@@ -1,8 +1,14 @@
 from app import db
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 
 class AvailableModel(db.Model):
     __tablename__ = "available_models"
+    __table_args__ = (
+        db.Index("ix_available_models_search_vector", "search_vector", postgresql_using="gin"),
+        db.Index("ix_available_models_created_at_id", "created_at", "id"),
+        db.Index("ix_available_models_is_active_name", "is_active", "name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)  # Unique identifier for the model
     name = db.Column(db.String(100), nullable=False, unique=True)  # Name of the model
@@ -25,6 +31,27 @@ class AvailableModel(db.Model):
     is_active = db.Column(
         db.Boolean, nullable=False, default=True
     )  # Whether the model is currently available for deployment
+    readiness_probe = db.Column(
+        JSONB, nullable=True
+    )  # e.g. {"type": "http", "path": "/health", "port": 8080, "timeout_seconds": 120}
+    min_replicas = db.Column(
+        db.Integer, nullable=False, default=1, server_default="1"
+    )  # Autoscaler never runs fewer containers per deployment
+    max_replicas = db.Column(
+        db.Integer, nullable=False, default=1, server_default="1"
+    )  # Autoscaling is off for the model while this is 1
+    cpu_cores = db.Column(
+        db.Integer, nullable=True
+    )  # Dedicated cores per container when CPU pinning is on (None: the default)
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed(
+            "to_tsvector('simple', regexp_replace("
+            "coalesce(name, '') || ' ' || coalesce(description, ''), "
+            "'[^[:alnum:]]+', ' ', 'g'))",
+            persisted=True,
+        ),
+    )  # Maintained by Postgres; backs catalog search
 
     def __repr__(self):
         return f"<AvailableModel(name={self.name}, docker_image={self.docker_image}, version={self.version})>"
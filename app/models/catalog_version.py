@@ -0,0 +1,13 @@
+from app import db
+
+
+class CatalogVersion(db.Model):
+    """Monotonic version counters for process-local caches, one row per cache."""
+
+    __tablename__ = "catalog_versions"
+
+    name = db.Column(db.String(50), primary_key=True)  # e.g. "available_models"
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CatalogVersion {self.name}={self.version}>"
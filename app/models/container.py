@@ -10,10 +10,15 @@ class ContainerStatus(str, Enum):
     STOPPED = "stopped"
     FAILED = "failed"
     PENDING = "pending"
+    PAUSED = "paused"
 
 
 class Container(db.Model):
     __tablename__ = "containers"
+    __table_args__ = (
+        db.Index("ix_containers_user_id_status", "user_id", "status"),
+        db.Index("ix_containers_stack_id", "stack_id"),
+    )
 
     id = db.Column(
         db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -31,6 +36,18 @@ class Container(db.Model):
     ports = db.Column(JSONB, nullable=True)  # JSONB for port mappings (host:container)
     config = db.Column(JSONB, nullable=True)  # JSONB for configuration
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    stack_id = db.Column(
+        db.String(36), db.ForeignKey("stacks.id"), nullable=True
+    )  # Set for containers deployed as part of a stack
+    replicas = db.Column(
+        db.Integer, nullable=False, default=1, server_default="1"
+    )  # Docker containers serving this deployment, including the primary
+    scaled_at = db.Column(db.DateTime, nullable=True)  # Last autoscaler change
+    cpuset = db.Column(db.String(255), nullable=True)  # Pinned cores, e.g. "4-7"; None if unpinned
+    cpuset_mems = db.Column(db.String(64), nullable=True)  # NUMA memory nodes for cpuset
+    readiness_token = db.Column(
+        db.String(36), nullable=True
+    )  # Start attempt the pending readiness probe belongs to
 
     # Relationship to AvailableModel
     available_model = db.relationship(
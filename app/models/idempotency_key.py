@@ -0,0 +1,25 @@
+from app import db
+
+
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)  # No ForeignKey (user in auth service)
+    key = db.Column(db.String(255), nullable=False)  # Client-supplied Idempotency-Key
+    fingerprint = db.Column(
+        db.LargeBinary(16), nullable=False
+    )  # blake2b digest of method, path and body
+    status_code = db.Column(db.Integer, nullable=True)  # NULL while in flight
+    content_type = db.Column(db.String(100), nullable=True)
+    response_body = db.Column(db.LargeBinary, nullable=True)  # zlib-compressed
+    created_at = db.Column(
+        db.DateTime, nullable=False, server_default=db.func.now()
+    )  # Also the in-flight lease start
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key} - User {self.user_id} - Status {self.status_code}>"
@@ -0,0 +1,33 @@
+from app import db
+import uuid
+from sqlalchemy.dialects.postgresql import JSONB
+from app.models.container import ContainerStatus
+
+
+class Stack(db.Model):
+    """A group of containers deployed, started, stopped and deleted together."""
+
+    __tablename__ = "stacks"
+    __table_args__ = (db.UniqueConstraint("user_id", "name", name="uq_stacks_user_name"),)
+
+    id = db.Column(
+        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )  # UUID as primary key
+    user_id = db.Column(db.Integer, nullable=False)  # No ForeignKey (user in auth service)
+    name = db.Column(db.String(64), nullable=False)
+    spec = db.Column(JSONB, nullable=False)  # Validated stack spec as submitted
+    network_name = db.Column(db.String(128), nullable=False)  # Private Docker network
+    status = db.Column(
+        db.Enum(ContainerStatus),
+        default=ContainerStatus.PENDING,
+        nullable=False,
+    )
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    heartbeat_at = db.Column(
+        db.DateTime, nullable=True, default=db.func.current_timestamp()
+    )  # Refreshed while an orchestration runs; a stale one means its worker died
+
+    containers = db.relationship("Container", backref="stack", lazy=True)
+
+    def __repr__(self):
+        return f"<Stack {self.id} - {self.name} - Status {self.status}>"
@@ -0,0 +1,28 @@
+from app import db
+
+
+class UsageRecord(db.Model):
+    """Request counts per API key and container, rolled up per time bucket."""
+
+    __tablename__ = "usage_records"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "bucket_start",
+            "api_key_id",
+            "container_id",
+            name="uq_usage_records_bucket_key_container",
+        ),
+        db.Index("ix_usage_records_container_bucket", "container_id", "bucket_start"),
+        db.Index("ix_usage_records_api_key_bucket", "api_key_id", "bucket_start"),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    bucket_start = db.Column(db.DateTime, nullable=False)  # UTC, aligned to the bucket size
+    # No ForeignKeys: usage history outlives deleted keys and containers
+    api_key_id = db.Column(db.String(36), nullable=False)
+    container_id = db.Column(db.String(255), nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    request_count = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UsageRecord {self.bucket_start} - Key {self.api_key_id} - {self.request_count}>"
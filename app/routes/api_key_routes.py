@@ -1,3 +1,4 @@
+import logging
 import uuid
 from flask import Blueprint, jsonify, request, current_app, g
 from app import db
@@ -5,13 +6,24 @@ from app.models.api_key import APIKey
 from app.models.container import Container
 from app.middleware.protected import login_required
 from app.utils.api_key_utils import (
+    API_KEY_ROTATION_GRACE_SECONDS,
+    API_KEY_ROTATION_MAX_CONTAINERS,
+    API_KEY_ROTATION_MAX_GRACE_SECONDS,
     delete_api_key_by_id,
     get_authenticated_user,
     get_user_container,
+    rotate_api_keys,
     store_api_key,
+    usable_key_filter,
 )
+from app.utils.idempotency_utils import idempotent
+from app.utils.key_filter_utils import api_key_filter
+from app.utils.metering_utils import usage_meter
 from app.utils.user_request_utils import extract_container_name
 
+# Hot-path logger for proxy forward-auth; sample with LOG_SAMPLE_RATES
+proxy_auth_logger = logging.getLogger("app.proxy_auth")
+
 # Define the Blueprint
 api_key_bp = Blueprint("api_key", __name__, url_prefix="/api/api-keys")
 
@@ -19,6 +31,7 @@ api_key_bp = Blueprint("api_key", __name__, url_prefix="/api/api-keys")
 # 🔹 Create API Key Route
 @api_key_bp.route("/", methods=["POST"])
 @login_required
+@idempotent
 def create_api_key():
     current_app.logger.info("Create API Key endpoint hit")
 
@@ -54,6 +67,81 @@ def create_api_key():
     )
 
 
+# 🔹 Rotate API Keys for many containers at once
+@api_key_bp.route("/rotate", methods=["POST"])
+@login_required
+@idempotent
+def rotate_api_keys_route():
+    """
+    Body: {"container_ids": [...], "grace_seconds": 3600}
+
+    Issues a new key per container; existing keys keep working for
+    grace_seconds and are then deactivated by the sweep.
+    """
+    current_app.logger.info("Rotate API Keys endpoint hit")
+
+    user = get_authenticated_user()
+    if not user:
+        return jsonify({"error": "User not authenticated"}), 401
+
+    data = request.get_json() or {}
+    container_ids = data.get("container_ids")
+    if not isinstance(container_ids, list) or not container_ids:
+        return jsonify({"error": "'container_ids' must be a non-empty list"}), 400
+    container_ids = list(dict.fromkeys(str(c) for c in container_ids))
+    if len(container_ids) > API_KEY_ROTATION_MAX_CONTAINERS:
+        return (
+            jsonify(
+                {"error": f"At most {API_KEY_ROTATION_MAX_CONTAINERS} containers per rotation"}
+            ),
+            400,
+        )
+
+    grace_seconds = data.get("grace_seconds", API_KEY_ROTATION_GRACE_SECONDS)
+    if (
+        not isinstance(grace_seconds, int)
+        or isinstance(grace_seconds, bool)
+        or not 0 <= grace_seconds <= API_KEY_ROTATION_MAX_GRACE_SECONDS
+    ):
+        return (
+            jsonify(
+                {
+                    "error": "'grace_seconds' must be an integer between 0 and "
+                    f"{API_KEY_ROTATION_MAX_GRACE_SECONDS}"
+                }
+            ),
+            400,
+        )
+
+    # Ownership of every container, checked in one query
+    owned = {
+        container_id
+        for (container_id,) in db.session.query(Container.id).filter(
+            Container.id.in_(container_ids), Container.user_id == user["id"]
+        )
+    }
+    missing = [c for c in container_ids if c not in owned]
+    if missing:
+        current_app.logger.warning(f"Rotation requested for unknown containers: {missing}")
+        return jsonify({"error": "Containers not found", "container_ids": missing}), 404
+
+    rows, expires_at = rotate_api_keys(user["id"], container_ids, grace_seconds)
+
+    return (
+        jsonify(
+            {
+                "message": "API keys rotated successfully",
+                "old_keys_expire_at": expires_at.isoformat(),
+                "api_keys": [
+                    {"id": api_key_id, "container_id": container_id, "api_key": key}
+                    for api_key_id, container_id, key in rows
+                ],
+            }
+        ),
+        201,
+    )
+
+
 # 🔹 Delete API Key Route
 @api_key_bp.route("/<string:api_key_id>", methods=["DELETE"])
 @login_required
@@ -117,16 +205,34 @@ def validate_api_key():
     """
     Validates the API key and ensures it has access to the requested container.
     """
-    current_app.logger.info("Validate API Key endpoint hit")
+    proxy_auth_logger.debug("Validate API Key endpoint hit")
 
     # 1️⃣ Check if API key is present in request headers
     api_key = request.headers.get("X-API-Key")
     if not api_key:
         return jsonify({"message": "Missing API Key"}), 400
 
+    # The trusted proxy hop's client address (ProxyFix), never the
+    # client-controlled leftmost X-Forwarded-For entry
+    source_ip = request.remote_addr or ""
+    retry_after = api_key_filter.offenders.is_blocked(source_ip)
+    if retry_after:
+        return (
+            jsonify({"message": "Too many invalid API keys"}),
+            429,
+            {"Retry-After": str(retry_after)},
+        )
+
+    # Shed definitely-invalid keys in memory, before any DB query
+    if not api_key_filter.might_be_valid(api_key):
+        api_key_filter.offenders.record_failure(source_ip)
+        return jsonify({"message": "Invalid API Key"}), 401
+
     # 2️⃣ Check if API key exists in the database
-    api_key_obj = APIKey.query.filter_by(key=api_key, is_active=True).first()
+    api_key_obj = APIKey.query.filter(APIKey.key == api_key, *usable_key_filter()).first()
     if not api_key_obj:
+        api_key_filter.record_invalid(api_key)
+        api_key_filter.offenders.record_failure(source_ip)
         return jsonify({"message": "Invalid API Key"}), 401
 
     # 3️⃣ Extract container name from request URL
@@ -147,4 +253,7 @@ def validate_api_key():
             403,
         )
 
+    # Counted in memory; flushed to usage_records in bulk
+    usage_meter.record(api_key_obj.id, container.id, api_key_obj.user_id)
+
     return jsonify({"message": "API Key validated successfully"}), 200
@@ -1,6 +1,15 @@
 from flask import Blueprint, request, jsonify, make_response
 from app.models.available_models import AvailableModel
 from app import db
+from app.utils.autoscale_utils import validate_replica_bounds
+from app.utils.json_utils import json_array_response
+from app.utils.model_cache_utils import bump_catalog_version, model_cache
+from app.utils.model_search_utils import (
+    MODEL_SORT_KEYS,
+    InvalidCursor,
+    search_models,
+)
+from app.utils.readiness_utils import validate_readiness_probe
 
 # Define the Blueprint
 model_bp = Blueprint("models", __name__, url_prefix="/api/models")
@@ -21,6 +30,22 @@ def create_model():
     # Extract version and set default to "latest"
     version = data.get("version", "latest")
 
+    probe_error = validate_readiness_probe(data.get("readiness_probe"))
+    if probe_error:
+        return make_response(jsonify({"error": probe_error}), 400)
+
+    min_replicas = data.get("min_replicas", 1)
+    max_replicas = data.get("max_replicas", min_replicas)
+    replicas_error = validate_replica_bounds(min_replicas, max_replicas)
+    if replicas_error:
+        return make_response(jsonify({"error": replicas_error}), 400)
+
+    cpu_cores = data.get("cpu_cores")
+    if cpu_cores is not None and (
+        not isinstance(cpu_cores, int) or isinstance(cpu_cores, bool) or cpu_cores < 1
+    ):
+        return make_response(jsonify({"error": "'cpu_cores' must be a positive integer"}), 400)
+
     # Check for duplicate name
     if AvailableModel.query.filter_by(name=data["name"]).first():
         return make_response(jsonify({"error": "Model name already exists"}), 400)
@@ -48,32 +73,85 @@ def create_model():
         docker_image=data["docker_image"],
         version=version,
         is_active=data.get("is_active", True),
+        readiness_probe=data.get("readiness_probe"),
+        min_replicas=min_replicas,
+        max_replicas=max_replicas,
+        cpu_cores=cpu_cores,
     )
     db.session.add(new_model)
+    bump_catalog_version()
     db.session.commit()
+    model_cache.invalidate()
 
     return jsonify({"message": "Model created successfully", "model": new_model.name})
 
 
-# READ: Get all available models
+def serialize_model(model):
+    return {
+        "id": model.id,
+        "name": model.name,
+        "description": model.description,
+        "docker_image": model.docker_image,
+        "version": model.version,
+        "is_active": model.is_active,
+        "readiness_probe": model.readiness_probe,
+        "min_replicas": model.min_replicas,
+        "max_replicas": model.max_replicas,
+        "cpu_cores": model.cpu_cores,
+        "created_at": model.created_at,
+        "updated_at": model.updated_at,
+    }
+
+
+# READ: Search available models
+# ?q=<text>&is_active=true|false&sort=name|-name|created_at|-created_at&limit=&cursor=
+# Without limit or cursor every model is returned, as before pagination existed;
+# paginated responses carry the next page's cursor in X-Next-Cursor
 @model_bp.route("/", methods=["GET"])
 def get_models():
-    models = AvailableModel.query.all()
-    return jsonify(
-        [
-            {
-                "id": model.id,
-                "name": model.name,
-                "description": model.description,
-                "docker_image": model.docker_image,
-                "version": model.version,
-                "is_active": model.is_active,
-                "created_at": model.created_at,
-                "updated_at": model.updated_at,
-            }
-            for model in models
-        ]
-    )
+    sort = request.args.get("sort", "name")
+    if sort not in MODEL_SORT_KEYS:
+        return make_response(
+            jsonify({"error": f"'sort' must be one of {', '.join(MODEL_SORT_KEYS)}"}),
+            400,
+        )
+
+    is_active = request.args.get("is_active")
+    if is_active is not None:
+        if is_active.lower() not in ("true", "false"):
+            return make_response(
+                jsonify({"error": "'is_active' must be 'true' or 'false'"}), 400
+            )
+        is_active = is_active.lower() == "true"
+
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return make_response(
+                jsonify({"error": "'limit' must be a positive integer"}), 400
+            )
+    cursor = request.args.get("cursor")
+
+    try:
+        models, next_cursor = search_models(
+            q=request.args.get("q"),
+            is_active=is_active,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+            paginate=limit is not None or cursor is not None,
+        )
+    except InvalidCursor as e:
+        return make_response(jsonify({"error": str(e)}), 400)
+
+    response = json_array_response(models, serialize_model)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
 # READ: Get a single model by ID
@@ -83,18 +161,7 @@ def get_model(model_id):
     if not model:
         return make_response(jsonify({"error": "Model not found"}), 404)
 
-    return jsonify(
-        {
-            "id": model.id,
-            "name": model.name,
-            "description": model.description,
-            "docker_image": model.docker_image,
-            "version": model.version,
-            "is_active": model.is_active,
-            "created_at": model.created_at,
-            "updated_at": model.updated_at,
-        }
-    )
+    return jsonify(serialize_model(model))
 
 
 # UPDATE: Update an existing model
@@ -106,14 +173,36 @@ def update_model(model_id):
 
     data = request.get_json()
 
+    probe_error = validate_readiness_probe(data.get("readiness_probe"))
+    if probe_error:
+        return make_response(jsonify({"error": probe_error}), 400)
+
+    min_replicas = data.get("min_replicas", model.min_replicas)
+    max_replicas = data.get("max_replicas", model.max_replicas)
+    replicas_error = validate_replica_bounds(min_replicas, max_replicas)
+    if replicas_error:
+        return make_response(jsonify({"error": replicas_error}), 400)
+
+    cpu_cores = data.get("cpu_cores", model.cpu_cores)
+    if cpu_cores is not None and (
+        not isinstance(cpu_cores, int) or isinstance(cpu_cores, bool) or cpu_cores < 1
+    ):
+        return make_response(jsonify({"error": "'cpu_cores' must be a positive integer"}), 400)
+
     # Update fields if provided
     model.name = data.get("name", model.name)
     model.description = data.get("description", model.description)
     model.docker_image = data.get("docker_image", model.docker_image)
     model.version = data.get("version", model.version)
     model.is_active = data.get("is_active", model.is_active)
+    model.readiness_probe = data.get("readiness_probe", model.readiness_probe)
+    model.min_replicas = min_replicas
+    model.max_replicas = max_replicas
+    model.cpu_cores = cpu_cores
 
+    bump_catalog_version()
     db.session.commit()
+    model_cache.invalidate()
 
     return jsonify({"message": "Model updated successfully", "model": model.name})
 
@@ -126,6 +215,8 @@ def delete_model(model_id):
         return make_response(jsonify({"error": "Model not found"}), 404)
 
     db.session.delete(model)
+    bump_catalog_version()
     db.session.commit()
+    model_cache.invalidate()
 
     return jsonify({"message": "Model deleted successfully", "model": model.name})
@@ -1,25 +1,82 @@
-import jwt
-import datetime
-import docker
-from flask import Blueprint, request, jsonify, make_response, g, current_app
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    make_response,
+    g,
+    current_app,
+    stream_with_context,
+)
 from app.models.container import Container, ContainerStatus
 from app.models.available_models import AvailableModel
 from app import db
-from dotenv import load_dotenv
 import os
 from app.middleware.protected import login_required
 from app.utils.user_request_utils import (
     assign_port,
     is_container_name_taken,
+    is_port_available,
     generate_subdomain,
 )
 from app.utils.api_key_utils import (
     store_api_key,
 )
+from app.utils.autoscale_utils import remove_replicas
+from app.utils.cpu_pinning_utils import NoFreeCores, assign_cores, release_cores
+from app.utils.container_fields_utils import (
+    DETAIL_FIELDS,
+    SUMMARY_FIELDS,
+    parse_fields,
+    row_serializer,
+    select_containers,
+)
+from app.utils.deploy_queue_utils import (
+    DeployQueueFull,
+    DeployQueueTimeout,
+    deploy_scheduler,
+    deploy_slot,
+)
+from app.utils.docker_utils import (
+    DockerCallError,
+    DockerConflict,
+    DockerNotFound,
+    docker_call,
+    docker_error_response,
+    find_docker_container,
+    remove_partial_container,
+)
+from app.utils.events_utils import (
+    EVENT_HEARTBEAT_SECONDS,
+    EVENT_RETRY_AFTER_SECONDS,
+    EventStreamsFull,
+    TooManySubscribers,
+    event_bus,
+    format_sse,
+    publish_deploy_progress,
+    publish_status,
+)
+from app.utils.idempotency_utils import idempotent
+from app.utils.image_gc_utils import image_in_use
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.live_state_utils import live_state
+from app.utils.readiness_utils import (
+    new_readiness_token,
+    start_readiness_probe,
+    wait_for_readiness,
+)
+from app.utils.reconcile_utils import managed_labels
+from app.utils.json_utils import json_array_response
+from app.utils.model_cache_utils import model_cache
+from app.utils.timing_utils import span, timed
+from app.utils.summary_utils import get_user_summary
+from app.utils.reverse_proxy_utils import (
+    build_traefik_labels,
+    router_name_for,
+    routing_publisher,
+)
 
-# Load variables from .env file
-load_dotenv()
+docker = lazy_import("docker")
 
 # Define the Blueprint
 deploy_bp = Blueprint("deploy", __name__, url_prefix="/api/deploy")
@@ -28,6 +85,7 @@ deploy_bp = Blueprint("deploy", __name__, url_prefix="/api/deploy")
 SECRET_KEY = os.environ.get("SECRET_KEY")  # Replace with an environment variable
 
 
+@timed()
 def parse_request_data():
     data = request.get_json()
     available_model_id = data.get("available_model_id")
@@ -49,8 +107,12 @@ def parse_request_data():
     return available_model_id, env_vars, name, requested_ports
 
 
+@timed()
 def fetch_available_model(available_model_id):
-    available_model = AvailableModel.query.get(available_model_id)
+    try:
+        available_model = model_cache.get(int(available_model_id))
+    except (TypeError, ValueError):
+        raise ValueError("'available_model_id' must be an integer")
     if not available_model:
         current_app.logger.warning(
             f"Available model with ID {available_model_id} not found"
@@ -59,6 +121,7 @@ def fetch_available_model(available_model_id):
     return available_model
 
 
+@timed()
 def assign_ports(user_id, requested_ports):
     host_ports = {}
     port_mappings = []
@@ -92,11 +155,51 @@ def assign_ports(user_id, requested_ports):
     return host_ports, port_mappings
 
 
-def run_docker_container(available_model, env_vars, name, host_ports, labels):
-    client = docker.from_env(timeout=200)
+@timed()
+def reuse_ports(user_id, port_mappings):
+    """Keep each stored host port if it is still free, otherwise assign a new one."""
+    host_ports = {}
+    new_mappings = []
+    used_host_ports = set()
+
+    for i, mapping in enumerate(port_mappings):
+        host_port = mapping.get("host_port")
+        if not host_port or host_port in used_host_ports or not is_port_available(host_port):
+            host_port = assign_port(user_id, unique_offset=i)
+        used_host_ports.add(host_port)
+
+        protocol = mapping.get("protocol", "tcp")
+        host_ports[f"{mapping['container_port']}/{protocol}"] = host_port
+        new_mappings.append({**mapping, "host_port": host_port})
+
+    return host_ports, new_mappings
+
+
+@timed()
+def run_docker_container(
+    available_model,
+    env_vars,
+    name,
+    host_ports,
+    labels,
+    stack_network=None,
+    alias=None,
+    resources=None,
+):
+    """
+    Create and start a container on the shared platform network.
+
+    With stack_network, the container also joins that network under alias
+    before it starts, so its processes can reach sibling services by name.
+    resources are extra create() arguments such as the pinned cpuset.
+    Runs as one non-retried "create" Docker call: if any step fails or the
+    deadline passes, the half-created container is removed again. Raises
+    DockerCallError.
+    """
     network_name = "cloud-platform_flask_network"
-    try:
-        container = client.containers.run(
+
+    def create(client):
+        container = client.containers.create(
             image=available_model.docker_image,
             detach=True,
             environment=env_vars,
@@ -104,25 +207,69 @@ def run_docker_container(available_model, env_vars, name, host_ports, labels):
             ports=host_ports,
             labels=labels,
             network=network_name,
+            **(resources or {}),
         )
+        if stack_network is not None:
+            client.networks.get(stack_network).connect(container, aliases=[alias])
+        container.start()
         return container
-    except docker.errors.ImageNotFound:
-        current_app.logger.error(
-            f"Docker image {available_model.docker_image} not found"
-        )
-        raise LookupError(f"Image {available_model.docker_image} not found")
-    except docker.errors.APIError as e:
-        current_app.logger.error(f"Docker API error: {str(e)}")
-        raise RuntimeError("Docker API error")
 
+    def cleanup(error):
+        # A name conflict means someone else's container; leave it alone
+        if not isinstance(error, DockerConflict):
+            remove_partial_container(name, labels)
 
-def save_container_to_db(user_id, available_model_id, name, env_vars, port_mappings):
+    # Pin the image so the image GC can't evict it mid-deploy
+    with image_in_use(available_model.docker_image):
+        try:
+            return docker_call("create", create, cleanup=cleanup)
+        except DockerNotFound as e:
+            current_app.logger.error(f"Docker image {available_model.docker_image} not found")
+            raise DockerNotFound("create", f"Image {available_model.docker_image} not found") from e
+        except DockerCallError as e:
+            current_app.logger.error(f"Docker API error ({e.outcome}): {str(e)}")
+            raise
+
+
+def queue_error_response(error):
+    """429 with Retry-After for a deploy the queue refused or couldn't start in time."""
+    response = jsonify(
+        {
+            "error": str(error),
+            "estimated_wait_seconds": error.estimated_wait,
+            "queue": deploy_scheduler.snapshot(),
+        }
+    )
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, int(error.estimated_wait)))
+    return response
+
+
+def no_free_cores_response(error):
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(max(1, int(error.retry_after)))
+    return response
+
+
+@timed()
+def save_container_to_db(
+    user_id,
+    available_model_id,
+    name,
+    env_vars,
+    port_mappings,
+    host=None,
+    status=ContainerStatus.RUNNING,
+    readiness_token=None,
+):
     """Save container details in the database before API key generation."""
     new_container = Container(
         user_id=user_id,
         available_model_id=available_model_id,
-        status=ContainerStatus.RUNNING,
-        config={"environment": env_vars},
+        status=status,
+        readiness_token=readiness_token,
+        config={"environment": env_vars, "host": host},
         name=name,
         ports=port_mappings,
     )
@@ -134,6 +281,7 @@ def save_container_to_db(user_id, available_model_id, name, env_vars, port_mappi
 
 @deploy_bp.route("/container", methods=["POST"])
 @login_required
+@idempotent
 def make_container():
     current_app.logger.info("Make container endpoint hit")
 
@@ -148,19 +296,25 @@ def make_container():
 
         # Fetch the available model
         available_model = fetch_available_model(available_model_id)
-        current_app.logger.info(f"Available model found: {available_model.name}")
+        current_app.logger.debug(f"Available model found: {available_model.name}")
 
         # Assign ports
         host_ports, port_mappings = assign_ports(user["id"], requested_ports)
-        current_app.logger.info(f"Assigned port mappings: {port_mappings}")
+        current_app.logger.debug(f"Assigned port mappings: {port_mappings}")
 
         # Generate subdomain
         subdomain = generate_subdomain(user["username"], name)
-        current_app.logger.info(f"Generated subdomain: {subdomain}")
+        current_app.logger.debug(f"Generated subdomain: {subdomain}")
 
         # Get domain from environment variables
         domain = os.environ.get("DOMAIN")
-        current_app.logger.info(f"Using domain: {domain}")
+        current_app.logger.debug(f"Using domain: {domain}")
+
+        # Models with a readiness probe stay PENDING until the probe passes
+        readiness_probe = available_model.readiness_probe
+        initial_status = (
+            ContainerStatus.PENDING if readiness_probe else ContainerStatus.RUNNING
+        )
 
         # Save the container to DB first to generate a unique container_id
         new_container = save_container_to_db(
@@ -169,42 +323,56 @@ def make_container():
             name=name,
             env_vars=env_vars,
             port_mappings=port_mappings,
+            host=f"{subdomain}.{domain}",
+            status=initial_status,
+            readiness_token=new_readiness_token() if readiness_probe else None,
         )
         db.session.commit()  # ✅ Ensure container is fully saved
 
         # Retrieve container ID for unique router name
         container_id = new_container.id
+        publish_deploy_progress(user["id"], container_id, "created")
 
         # Use the first available port mapping (assuming one primary port per container)
         first_mapping = port_mappings[0] if port_mappings else None
         container_port = first_mapping["container_port"] if first_mapping else None
 
         # Create unique router name using user ID and container ID
-        router_name = f"user-{user['id']}-{container_id}"
-
-        labels = {
-            "traefik.enable": "true",
-            f"traefik.http.routers.{router_name}.rule": f'Host("{subdomain}.{domain}")',
-            f"traefik.http.routers.{router_name}.entrypoints": "websecure",
-            f"traefik.http.routers.{router_name}.tls.certresolver": "myresolver",
-            f"traefik.http.services.{router_name}.loadbalancer.server.port": str(
-                container_port
-            ),
-            f"traefik.http.routers.{router_name}.middlewares": "api-key-auth",
-            f"traefik.http.routers.{router_name}.middlewares": "rate-limit",
-        }
-        current_app.logger.info(f"Traefik labels set for {router_name}: {labels}")
+        router_name = router_name_for(user["id"], container_id)
 
-        # Run Docker container
-        container = run_docker_container(
-            available_model, env_vars, name, host_ports, labels
+        labels = build_traefik_labels(
+            router_name, f"{subdomain}.{domain}", container_port
         )
+        labels.update(managed_labels(container_id))
+        current_app.logger.debug(f"Traefik labels set for {router_name}: {labels}")
+
+        # Run Docker container once the deploy queue gives us a slot
+        try:
+            resources = assign_cores(container_id, available_model)
+            with deploy_slot(user["id"], container_id, user.get("role")) as queued_seconds:
+                publish_deploy_progress(user["id"], container_id, "starting")
+                container = run_docker_container(
+                    available_model, env_vars, name, host_ports, labels, resources=resources
+                )
+        except (DeployQueueFull, DeployQueueTimeout, DockerCallError, NoFreeCores) as e:
+            # Nothing is left running in Docker; don't keep a row for it
+            # (deleting it also frees any pinned cores)
+            db.session.delete(new_container)
+            db.session.commit()
+            publish_status(user["id"], container_id, "deleted")
+            if isinstance(e, DockerCallError):
+                return docker_error_response(e)
+            if isinstance(e, NoFreeCores):
+                return no_free_cores_response(e)
+            return queue_error_response(e)
         current_app.logger.info(f"Container {container.id} started successfully")
+        publish_deploy_progress(user["id"], container_id, "started")
 
         # ✅ Introduce a short delay (PostgreSQL replication lag fix)
         import time
 
-        time.sleep(1)
+        with span("wait_for_start"):
+            time.sleep(1)
 
         # Re-fetch to ensure it exists in the DB
         saved_container = Container.query.get(container_id)
@@ -219,21 +387,35 @@ def make_container():
         try:
             api_key_value = store_api_key(user["id"], container_id)
             current_app.logger.info(
-                f"API Key {api_key_value} created and stored for container {container_id}"
+                f"API Key created and stored for container {container_id}"
             )
         except Exception as e:
             current_app.logger.error(f"Error generating API key: {str(e)}")
             db.session.rollback()
             return jsonify({"error": "Failed to generate API key"}), 500
 
+        if readiness_probe:
+            start_readiness_probe(
+                container_id,
+                readiness_probe,
+                name,
+                port_mappings,
+                new_container.readiness_token,
+            )
+
+        routing_publisher.schedule(current_app._get_current_object())
+        publish_status(user["id"], container_id, initial_status)
+
         return jsonify(
             {
                 "message": "Container created successfully",
                 "container_id": container_id,
+                "status": initial_status.value,
                 "available_model_id": available_model_id,
                 "environment": env_vars,
                 "ports": port_mappings,
                 "domain": f"https://{subdomain}.{domain}",
+                "queued_seconds": round(queued_seconds, 3),
             }
         )
 
@@ -258,84 +440,106 @@ def make_container():
 @deploy_bp.route("/container/<string:container_id>", methods=["GET"])
 @login_required
 def get_container_by_id(container_id):
-    """Fetch complete details of a container by its ID, including API keys."""
+    """
+    Fetch complete details of a container by its ID, including API keys.
+
+    ?fields=id,name,status returns only those fields; only their columns
+    are selected, and API keys are only queried when asked for. With
+    ?live=true the response also carries "live": the Docker state
+    (running/exited, restart count, started_at, health) from a short-TTL
+    inspect cache, next to the stored status.
+    """
     current_app.logger.info(f"Fetching container with ID: {container_id}")
 
-    container = Container.query.get(container_id)
-    if not container:
+    live, error_response = live_arg()
+    if error_response:
+        return error_response
+    fields, error = parse_fields(request.args.get("fields"), DETAIL_FIELDS)
+    if error:
+        return jsonify({"error": error}), 400
+
+    rows = select_containers(fields, Container.id == container_id, live=live)
+    if not rows:
         current_app.logger.warning(f"Container with ID {container_id} not found")
         return jsonify({"error": "Container not found"}), 404
 
-    current_app.logger.info(f"Container found: {container}")
+    row = rows[0]
+    data = row_serializer(rows, fields, detail=True)(row)
+    if live:
+        data["live"] = live_state.inspect(row)
+    return jsonify(data)
 
-    # Fetch API keys associated with the container
-    api_keys = [
-        {
-            "id": api_key.id,
-            "key": api_key.key,
-            "is_active": api_key.is_active,
-            "created_at": api_key.created_at.isoformat(),
-        }
-        for api_key in container.api_keys
-    ]
 
-    return jsonify(
-        {
-            "id": container.id,
-            "user_id": container.user_id,
-            "name": container.name,
-            "available_model_id": container.available_model_id,
-            "model_name": container.available_model.name,  # Model details
-            "model_description": container.available_model.description,
-            "docker_image": container.available_model.docker_image,
-            "version": container.available_model.version,
-            "status": container.status.value,  # Convert Enum to string
-            "ports": container.ports if container.ports else [],
-            "config": (
-                container.config if container.config else {}
-            ),  # Environment variables
-            "created_at": container.created_at.isoformat(),  # Ensure JSON serializable
-            "updated_at": container.available_model.updated_at.isoformat(),  # Model update time
-            "is_active": container.available_model.is_active,  # Model active status
-            "api_keys": api_keys,  # Include API keys,
-        }
-    )
+def live_arg():
+    """(live flag, error response) from the ?live= query parameter."""
+    live = request.args.get("live", "false").lower()
+    if live not in ("true", "false"):
+        return None, (jsonify({"error": "'live' must be 'true' or 'false'"}), 400)
+    return live == "true", None
+
+
+def model_for(container):
+    """Catalog fields for a container, from the model cache when possible."""
+    return model_cache.get(container.available_model_id) or container.available_model
 
 
 @deploy_bp.route("/containers/user/<int:user_id>", methods=["GET"])
 @login_required
 def get_containers_by_user_id(user_id):
+    """
+    Container summaries for a user.
+
+    Takes the same ?fields= and ?live= parameters as a single container;
+    list views typically want ?fields=name,status.
+    """
     current_app.logger.info(f"Fetching containers for user ID: {user_id}")
 
-    containers = Container.query.filter_by(user_id=user_id).all()
-    if not containers:
+    live, error_response = live_arg()
+    if error_response:
+        return error_response
+    fields, error = parse_fields(request.args.get("fields"), SUMMARY_FIELDS)
+    if error:
+        return jsonify({"error": error}), 400
+
+    rows = select_containers(fields, Container.user_id == user_id, live=live)
+    if not rows:
         current_app.logger.warning(f"No containers found for user ID {user_id}")
         return jsonify({"error": "No containers found for the specified user"}), 404
 
-    return jsonify(
-        [
-            {
-                "id": container.id,
-                "user_id": container.user_id,
-                "name": container.name,
-                "available_model_id": container.available_model_id,
-                "model_name": container.available_model.name,  # Include model name
-                "model_description": container.available_model.description,  # Include model description
-                "docker_image": container.available_model.docker_image,  # Include Docker image
-                "status": container.status.value,  # Convert Enum to string
-                "ports": container.ports,  # Include port mappings
-                "config": container.config,
-                "created_at": container.created_at.isoformat(),  # Ensure JSON serializable
-            }
-            for container in containers
-        ]
-    )
+    serialize = row_serializer(rows, fields)
+    if not live:
+        return json_array_response(rows, serialize)
+
+    # One batched containers.list for the whole page, not an inspect per row
+    states = live_state.for_containers(rows)
+
+    def serialize_live(row):
+        data = serialize(row)
+        data["live"] = states[row.id]
+        return data
+
+    return json_array_response(rows, serialize_live)
+
+
+@deploy_bp.route("/queue", methods=["GET"])
+@login_required
+def get_deploy_queue():
+    """Deploy queue state in this worker, with the caller's queued deploys."""
+    return jsonify(deploy_scheduler.snapshot(g.user["id"]))
+
+
+@deploy_bp.route("/summary", methods=["GET"])
+@login_required
+def get_dashboard_summary():
+    """Container, model, API key and port counts for the authenticated user."""
+    current_app.logger.debug(f"Fetching dashboard summary for user {g.user['id']}")
+    return jsonify(get_user_summary(g.user["id"]))
 
 
 @deploy_bp.route("/container/<string:container_id>/stop", methods=["POST"])
 @login_required
 def stop_container(container_id):
-    """Stop a running container."""
+    """Stop (or with ?mode=pause, freeze) a running container."""
     current_app.logger.info(f"Attempting to stop container: {container_id}")
 
     container = Container.query.get(container_id)
@@ -347,26 +551,45 @@ def stop_container(container_id):
         current_app.logger.warning("Unauthorized attempt to stop container")
         return jsonify({"error": "Unauthorized"}), 403
 
-    client = docker.from_env()
+    # mode=pause freezes the container's processes (cgroup freezer) for a
+    # sub-second resume; mode=stop (default) does a full docker stop
+    mode = request.args.get("mode", "stop")
+    if mode not in ("stop", "pause"):
+        return jsonify({"error": "'mode' must be 'stop' or 'pause'"}), 400
+
+    def stop(client):
+        docker_container = find_docker_container(client, container)
+        if mode == "pause":
+            docker_container.pause()
+        else:
+            docker_container.stop()
+        # Extra replicas don't survive a stop; the autoscaler adds them back
+        remove_replicas(client, container.id)
 
     try:
-        docker_container = client.containers.get(container_id)
-        docker_container.stop()
-        container.status = ContainerStatus.STOPPED
-        db.session.commit()
-        current_app.logger.info(f"Container {container_id} stopped successfully")
-        return jsonify(
-            {
-                "message": "Container stopped successfully",
-                "status": container.status.value,
-            }
-        )
-    except docker.errors.NotFound:
-        current_app.logger.error(f"Docker container {container_id} not found")
-        return jsonify({"error": "Docker container not found"}), 404
-    except docker.errors.APIError as e:
-        current_app.logger.error(f"Error stopping container {container_id}: {str(e)}")
-        return jsonify({"error": "Failed to stop container"}), 500
+        # Re-pausing a paused container is a 409, so only stop is retried
+        docker_call(mode, stop, idempotent=(mode == "stop"))
+    except DockerCallError as e:
+        current_app.logger.error(f"Error stopping container {container_id} ({e.outcome}): {str(e)}")
+        return docker_error_response(e)
+
+    container.status = ContainerStatus.PAUSED if mode == "pause" else ContainerStatus.STOPPED
+    container.replicas = 1
+    if mode == "stop":
+        # A paused container keeps its cores; a stopped one gives them back
+        container.cpuset = None
+        container.cpuset_mems = None
+    db.session.commit()
+    live_state.invalidate(container_id)
+    routing_publisher.schedule(current_app._get_current_object())
+    publish_status(container.user_id, container_id, container.status)
+    current_app.logger.info(f"Container {container_id} {container.status.value} successfully")
+    return jsonify(
+        {
+            "message": f"Container {container.status.value} successfully",
+            "status": container.status.value,
+        }
+    )
 
 
 @deploy_bp.route("/container/<string:container_id>", methods=["DELETE"])
@@ -384,31 +607,70 @@ def delete_container(container_id):
         current_app.logger.warning("Unauthorized attempt to delete container")
         return jsonify({"error": "Unauthorized"}), 403
 
-    client = docker.from_env()
+    def remove(client):
+        remove_replicas(client, container.id)
+        try:
+            docker_container = find_docker_container(client, container)
+        except docker.errors.NotFound:
+            current_app.logger.warning(
+                f"Docker container {container_id} not found, removing from database"
+            )
+            return
+        docker_container.remove(force=True)  # Forcefully remove the container
 
     try:
-        docker_container = client.containers.get(container_id)
-        docker_container.remove(force=True)  # Forcefully remove the container
-    except docker.errors.NotFound:
-        current_app.logger.warning(
-            f"Docker container {container_id} not found, removing from database"
-        )
-    except docker.errors.APIError as e:
-        current_app.logger.error(f"Error deleting container {container_id}: {str(e)}")
-        return jsonify({"error": "Failed to delete container"}), 500
+        docker_call("remove", remove, idempotent=True)
+    except DockerCallError as e:
+        current_app.logger.error(f"Error deleting container {container_id} ({e.outcome}): {str(e)}")
+        return docker_error_response(e)
 
     # Remove the container entry from the database
     db.session.delete(container)
     db.session.commit()
+    live_state.invalidate(container_id)
+    routing_publisher.schedule(current_app._get_current_object())
+    publish_status(g.user["id"], container_id, "deleted")
 
     current_app.logger.info(f"Container {container_id} deleted successfully")
     return jsonify({"message": "Container deleted successfully"})
 
 
+@timed()
+def recreate_docker_container(container):
+    """Recreate a missing Docker container from Container.config and Container.ports."""
+    config = container.config or {}
+    env_vars = config.get("environment", {})
+    host = config.get("host")
+    if not host:
+        subdomain = generate_subdomain(g.user["username"], container.name)
+        host = f"{subdomain}.{os.environ.get('DOMAIN')}"
+
+    host_ports, port_mappings = reuse_ports(container.user_id, container.ports or [])
+    first_mapping = port_mappings[0] if port_mappings else None
+    labels = build_traefik_labels(
+        router_name_for(container.user_id, container.id),
+        host,
+        first_mapping["container_port"] if first_mapping else None,
+    )
+    labels.update(managed_labels(container.id))
+
+    model = model_for(container)
+    resources = assign_cores(container.id, model)
+    with deploy_slot(container.user_id, container.id, g.user.get("role")):
+        docker_container = run_docker_container(
+            model, env_vars, container.name, host_ports, labels, resources=resources
+        )
+
+    # Reassign (not mutate) the JSONB values so SQLAlchemy sees the change
+    container.ports = port_mappings
+    container.config = {**config, "host": host}
+    return docker_container
+
+
 @deploy_bp.route("/container/<string:container_id>/start", methods=["POST"])
 @login_required
 def start_container(container_id):
-    """Start a stopped container."""
+    """Start a stopped or paused container, recreating it if Docker lost it."""
     current_app.logger.info(f"Attempting to start container: {container_id}")
 
     container = Container.query.get(container_id)
@@ -420,23 +682,166 @@ def start_container(container_id):
         current_app.logger.warning("Unauthorized attempt to start container")
         return jsonify({"error": "Unauthorized"}), 403
 
-    client = docker.from_env()
+    recreated = False
+    # Cores to free on failure: only ones this request assigns, never those
+    # of a container that was already running (or paused) on them
+    had_cores = container.cpuset is not None
+
+    def docker_status(client):
+        try:
+            return find_docker_container(client, container).status
+        except docker.errors.NotFound:
+            return None
 
     try:
-        docker_container = client.containers.get(container_id)
-        docker_container.start()
-        container.status = ContainerStatus.RUNNING
+        status = docker_call("inspect", docker_status, idempotent=True)
+
+        if status == "paused":
+            # Thawing a paused container is instant and needs no readiness check
+            docker_call(
+                "unpause", lambda client: find_docker_container(client, container).unpause()
+            )
+            readiness_probe = None
+        else:
+            if status is None:
+                current_app.logger.info(
+                    f"Docker container {container_id} missing; recreating from stored config"
+                )
+                recreate_docker_container(container)
+                recreated = True
+            else:
+                resources = assign_cores(container.id, model_for(container))
+
+                def start(client):
+                    docker_container = find_docker_container(client, container)
+                    if resources:
+                        # Cores may differ from the ones it had before it stopped
+                        docker_container.update(**resources)
+                    docker_container.start()
+
+                docker_call("start", start, idempotent=True)
+            readiness_probe = model_for(container).readiness_probe
+
+        container.status = (
+            ContainerStatus.PENDING if readiness_probe else ContainerStatus.RUNNING
+        )
+        container.readiness_token = new_readiness_token() if readiness_probe else None
         db.session.commit()
+        live_state.invalidate(container_id)
+        if readiness_probe:
+            start_readiness_probe(
+                container_id,
+                readiness_probe,
+                container.name,
+                container.ports,
+                container.readiness_token,
+            )
+        routing_publisher.schedule(current_app._get_current_object())
+        publish_status(container.user_id, container_id, container.status)
         current_app.logger.info(f"Container {container_id} started successfully")
         return jsonify(
             {
                 "message": "Container started successfully",
                 "status": container.status.value,
+                "recreated": recreated,
+                "ports": container.ports,
             }
         )
-    except docker.errors.NotFound:
-        current_app.logger.error(f"Docker container {container_id} not found")
-        return jsonify({"error": "Docker container not found"}), 404
-    except docker.errors.APIError as e:
-        current_app.logger.error(f"Error starting container {container_id}: {str(e)}")
-        return jsonify({"error": "Failed to start container"}), 500
+    except NoFreeCores as e:
+        db.session.rollback()
+        return no_free_cores_response(e)
+    except (DeployQueueFull, DeployQueueTimeout) as e:
+        db.session.rollback()
+        if not had_cores:
+            release_cores([container_id])
+        return queue_error_response(e)
+    except DockerCallError as e:
+        db.session.rollback()
+        if not had_cores:
+            release_cores([container_id])
+        current_app.logger.error(f"Error starting container {container_id} ({e.outcome}): {str(e)}")
+        return docker_error_response(e)
+
+
+@deploy_bp.route("/container/<string:container_id>/ready", methods=["GET"])
+@login_required
+def wait_for_container_ready(container_id):
+    """Long-poll until the container's readiness probe settles (?timeout=seconds)."""
+    container = Container.query.get(container_id)
+    if not container:
+        current_app.logger.warning(f"Container with ID {container_id} not found")
+        return jsonify({"error": "Container not found"}), 404
+
+    if container.user_id != g.user["id"]:
+        current_app.logger.warning("Unauthorized attempt to poll container readiness")
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        timeout = float(request.args.get("timeout", 30))
+    except ValueError:
+        return jsonify({"error": "'timeout' must be a number"}), 400
+
+    # Don't hold a DB transaction open while long-polling
+    db.session.commit()
+    status = wait_for_readiness(container_id, max(timeout, 0))
+    if status is None:
+        # Deleted while we waited
+        return jsonify({"error": "Container not found"}), 404
+
+    return jsonify(
+        {
+            "container_id": container_id,
+            "status": status.value,
+            "ready": status == ContainerStatus.RUNNING,
+        }
+    )
+
+
+@deploy_bp.route("/events", methods=["GET"])
+@login_required
+def stream_container_events():
+    """
+    Server-Sent Events stream of the user's container lifecycle events.
+
+    "status" events carry {container_id, status}; "deploy" events carry
+    {container_id, stage}. Events are not replayed, so clients should
+    re-read the container list after reconnecting. Each open stream holds a
+    worker thread, so a worker refuses new streams (503) beyond
+    EVENT_MAX_SUBSCRIBERS.
+    """
+    try:
+        subscription = event_bus.subscribe(
+            current_app._get_current_object(), g.user["id"]
+        )
+    except EventStreamsFull as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(EVENT_RETRY_AFTER_SECONDS)
+        return response
+    except TooManySubscribers as e:
+        return jsonify({"error": str(e)}), 429
+
+    # Nothing below needs the session; don't pin a pooled connection
+    db.session.remove()
+
+    def stream():
+        try:
+            yield "retry: 5000\n: connected\n\n"
+            while True:
+                events = subscription.get(EVENT_HEARTBEAT_SECONDS)
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscription.dropped:
+                    yield f"event: overflow\ndata: {subscription.dropped}\n\n"
+                    subscription.dropped = 0
+                for event in events:
+                    yield format_sse(event)
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
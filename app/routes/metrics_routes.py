@@ -0,0 +1,22 @@
+import hmac
+import os
+
+from flask import Blueprint, jsonify, request
+
+from app.utils.metrics_utils import metrics
+
+# Define the Blueprint
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+# Optional shared secret for scrapers; the endpoint is open when unset
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+
+@metrics_bp.route("/", methods=["GET"])
+def get_metrics():
+    if METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("X-Metrics-Token", ""), METRICS_TOKEN
+    ):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    return jsonify(metrics.snapshot())
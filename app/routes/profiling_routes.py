@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify, send_file
+
+from app.middleware.protected import admin_required, login_required
+from app.utils.profiling_utils import PROFILING_ENABLED, list_profiles, profile_path
+
+# Define the Blueprint
+profiling_bp = Blueprint("profiling", __name__, url_prefix="/api/profiles")
+
+
+@profiling_bp.route("/", methods=["GET"])
+@login_required
+@admin_required
+def get_profiles():
+    """Index of stored request profiles, newest first."""
+    return jsonify({"enabled": PROFILING_ENABLED, "profiles": list_profiles()})
+
+
+@profiling_bp.route("/<string:profile_id>", methods=["GET"])
+@login_required
+@admin_required
+def get_profile(profile_id):
+    """Collapsed stacks for one profile, ready for flamegraph.pl or speedscope."""
+    path = profile_path(profile_id)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype="text/plain", download_name=profile_id)
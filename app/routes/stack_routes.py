@@ -0,0 +1,558 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Blueprint, jsonify, request, current_app, g
+from sqlalchemy import delete, func, update
+
+from app import db
+from app.models.api_key import APIKey
+from app.models.container import Container, ContainerStatus
+from app.models.stack import Stack
+from app.middleware.protected import login_required
+from app.routes.container_routes import (
+    assign_ports,
+    model_for,
+    reuse_ports,
+    run_docker_container,
+)
+from app.utils.api_key_utils import store_api_key
+from app.utils.autoscale_utils import remove_replicas
+from app.utils.cpu_pinning_utils import assign_cores, release_cores
+from app.utils.deploy_queue_utils import deploy_slot
+from app.utils.docker_utils import (
+    DockerCallError,
+    docker_call,
+    find_docker_container,
+    get_owned_container,
+)
+from app.utils.events_utils import (
+    publish_deploy_progress,
+    publish_stack_status,
+    publish_status,
+)
+from app.utils.idempotency_utils import idempotent
+from app.utils.key_filter_utils import api_key_filter
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.model_cache_utils import model_cache
+from app.utils.readiness_utils import (
+    READINESS_DEFAULT_TIMEOUT,
+    get_container_status,
+    new_readiness_token,
+    start_readiness_probe,
+    wait_for_readiness,
+)
+from app.utils.reconcile_utils import MANAGED_LABEL, fail_stale_stacks, managed_labels
+from app.utils.reverse_proxy_utils import (
+    build_traefik_labels,
+    router_name_for,
+    routing_publisher,
+)
+from app.utils.stack_utils import (
+    STACK_HEARTBEAT_SECONDS,
+    STACK_ID_LABEL,
+    STACK_NETWORK_PREFIX,
+    dependency_map,
+    run_dag,
+    run_parallel,
+    validate_stack_spec,
+)
+from app.utils.user_request_utils import generate_subdomain, is_container_name_taken
+
+docker = lazy_import("docker")
+
+# Define the Blueprint
+stack_bp = Blueprint("stacks", __name__, url_prefix="/api/stacks")
+
+
+def serialize_stack(stack, include_services=True):
+    data = {
+        "id": stack.id,
+        "name": stack.name,
+        "status": stack.status.value,
+        "network": stack.network_name,
+        "created_at": stack.created_at.isoformat(),
+    }
+    if include_services:
+        data["services"] = [
+            {
+                "service": (container.config or {}).get("service"),
+                "container_id": container.id,
+                "name": container.name,
+                "available_model_id": container.available_model_id,
+                "status": container.status.value,
+                "ports": container.ports or [],
+                "host": (container.config or {}).get("host"),
+            }
+            for container in stack.containers
+        ]
+    return data
+
+
+def get_owned_stack(stack_id):
+    """(stack, None) or (None, error response) for the authenticated user."""
+    stack = Stack.query.get(stack_id)
+    if not stack:
+        current_app.logger.warning(f"Stack with ID {stack_id} not found")
+        return None, (jsonify({"error": "Stack not found"}), 404)
+    if stack.user_id != g.user["id"]:
+        current_app.logger.warning(f"Unauthorized attempt to access stack {stack_id}")
+        return None, (jsonify({"error": "Unauthorized"}), 403)
+    return stack, None
+
+
+def claim_stack(stack_id, from_statuses, to_status):
+    """
+    Atomically move a stack between statuses.
+
+    Returns False when the stack isn't in from_statuses, e.g. because another
+    request (in any worker) is already deploying or starting it. A PENDING
+    stack whose orchestration died counts as FAILED. Moving to PENDING
+    starts its heartbeat.
+    """
+    fail_stale_stacks(stack_id)
+    values = {"status": to_status}
+    if to_status == ContainerStatus.PENDING:
+        values["heartbeat_at"] = func.now()
+    with db.engine.begin() as conn:
+        result = conn.execute(
+            update(Stack.__table__)
+            .where(Stack.id == stack_id, Stack.status.in_(from_statuses))
+            .values(**values)
+        )
+    return result.rowcount == 1
+
+
+@contextmanager
+def orchestration_heartbeat(stack_id):
+    """Refresh the stack's heartbeat_at every STACK_HEARTBEAT_SECONDS during the block."""
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(STACK_HEARTBEAT_SECONDS):
+            with db.engine.begin() as conn:
+                conn.execute(
+                    update(Stack.__table__)
+                    .where(Stack.id == stack_id, Stack.status == ContainerStatus.PENDING)
+                    .values(heartbeat_at=func.now())
+                )
+
+    thread = threading.Thread(target=beat, name=f"stack-beat-{stack_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+
+
+def _await_ready(container_id, timeout):
+    """Wait out a readiness probe in READINESS_MAX_WAIT-sized slices."""
+    deadline = time.monotonic() + timeout + 5
+    status = get_container_status(container_id)
+    while status == ContainerStatus.PENDING and time.monotonic() < deadline:
+        status = wait_for_readiness(container_id, deadline - time.monotonic())
+    return status
+
+
+def _fail_container(container_id):
+    with db.engine.begin() as conn:
+        user_id = conn.execute(
+            update(Container.__table__)
+            .where(Container.id == container_id)
+            .values(status=ContainerStatus.FAILED)
+            .returning(Container.user_id)
+        ).scalar()
+    if user_id is not None:
+        publish_status(user_id, container_id, ContainerStatus.FAILED)
+
+
+def _bring_up_service(app, container_id, network_name):
+    """Start (or create) one stack service and wait for it to be ready."""
+    with app.app_context():
+        had_cores = True  # nothing to release if the row can't even be read
+        try:
+            container = Container.query.get(container_id)
+            model = model_for(container)
+            config = container.config or {}
+            # A paused service keeps its cores; free only ones assigned here
+            had_cores = container.cpuset is not None
+            resources = assign_cores(container.id, model)
+
+            def resume(client):
+                """Unpause or start an existing container; False if there is none."""
+                try:
+                    docker_container = find_docker_container(client, container)
+                except docker.errors.NotFound:
+                    return False
+                if docker_container.status == "paused":
+                    docker_container.unpause()
+                else:
+                    if resources:
+                        docker_container.update(**resources)
+                    docker_container.start()
+                return True
+
+            if not docker_call("start", resume, idempotent=True):
+                host_ports, port_mappings = reuse_ports(container.user_id, container.ports or [])
+                first_mapping = port_mappings[0] if port_mappings else None
+                labels = build_traefik_labels(
+                    router_name_for(container.user_id, container.id),
+                    config.get("host"),
+                    first_mapping["container_port"] if first_mapping else None,
+                )
+                labels.update(managed_labels(container.id))
+                labels[STACK_ID_LABEL] = container.stack_id
+
+                with deploy_slot(container.user_id, container.id, bounded=False):
+                    publish_deploy_progress(container.user_id, container.id, "starting")
+                    run_docker_container(
+                        model,
+                        config.get("environment", {}),
+                        container.name,
+                        host_ports,
+                        labels,
+                        stack_network=network_name,
+                        alias=config.get("service"),
+                        resources=resources,
+                    )
+                container.ports = port_mappings
+                publish_deploy_progress(container.user_id, container.id, "started")
+
+            probe = model.readiness_probe
+            container.status = ContainerStatus.PENDING if probe else ContainerStatus.RUNNING
+            container.readiness_token = new_readiness_token() if probe else None
+            db.session.commit()
+
+            if not probe:
+                publish_status(container.user_id, container.id, ContainerStatus.RUNNING)
+                return True
+
+            # Dependents only start once this service passes its probe
+            start_readiness_probe(
+                container.id, probe, container.name, container.ports, container.readiness_token
+            )
+            timeout = float(probe.get("timeout_seconds", READINESS_DEFAULT_TIMEOUT))
+            return _await_ready(container.id, timeout) == ContainerStatus.RUNNING
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Failed to start stack service {container_id}: {str(e)}")
+            _fail_container(container_id)
+            if not had_cores:
+                release_cores([container_id])
+            return False
+        finally:
+            db.session.remove()
+
+
+def orchestrate_stack(app, stack_id):
+    """Bring a stack up following its dependency DAG (runs on a worker thread)."""
+    with app.app_context():
+        user_id = None
+        try:
+            stack = Stack.query.get(stack_id)
+            user_id = stack.user_id
+            client = docker.from_env(timeout=60)
+            try:
+                client.networks.get(stack.network_name)
+            except docker.errors.NotFound:
+                client.networks.create(
+                    stack.network_name,
+                    driver="bridge",
+                    labels={MANAGED_LABEL: "true", STACK_ID_LABEL: stack.id},
+                )
+
+            service_ids = {
+                (c.config or {}).get("service"): c.id for c in stack.containers
+            }
+            network_name, dependencies = stack.network_name, dependency_map(stack.spec)
+            db.session.commit()
+
+            with orchestration_heartbeat(stack_id):
+                succeeded, failed, skipped = run_dag(
+                    dependencies,
+                    lambda service: _bring_up_service(app, service_ids[service], network_name),
+                )
+
+            # Services never started because a dependency failed
+            skipped_ids = [service_ids[s] for s in skipped]
+            if skipped_ids:
+                with db.engine.begin() as conn:
+                    conn.execute(
+                        update(Container.__table__)
+                        .where(
+                            Container.id.in_(skipped_ids),
+                            Container.status == ContainerStatus.PENDING,
+                        )
+                        .values(status=ContainerStatus.FAILED)
+                    )
+
+            status = (
+                ContainerStatus.FAILED if failed or skipped else ContainerStatus.RUNNING
+            )
+            app.logger.info(
+                f"Stack {stack_id} {status.value}: {len(succeeded)} up, "
+                f"{len(failed)} failed, {len(skipped)} skipped"
+            )
+        except Exception as e:
+            app.logger.error(f"Stack {stack_id} orchestration failed: {str(e)}")
+            db.session.rollback()
+            status = ContainerStatus.FAILED
+        finally:
+            db.session.remove()
+
+        with db.engine.begin() as conn:
+            # No row when the stack was deleted meanwhile; nothing to report then
+            settled = conn.execute(
+                update(Stack.__table__)
+                .where(Stack.id == stack_id, Stack.status == ContainerStatus.PENDING)
+                .values(status=status)
+                .returning(Stack.user_id)
+            ).scalar()
+        if settled is not None:
+            publish_stack_status(settled, stack_id, status)
+        routing_publisher.schedule(app)
+
+
+def start_orchestration(stack_id):
+    threading.Thread(
+        target=orchestrate_stack,
+        args=(current_app._get_current_object(), stack_id),
+        name=f"stack-{stack_id[:8]}",
+        daemon=True,
+    ).start()
+
+
+@stack_bp.route("/", methods=["POST"])
+@login_required
+@idempotent
+def create_stack():
+    """Create a stack's rows and keys, then start its services in the background."""
+    user = g.user
+    spec = request.get_json()
+
+    error = validate_stack_spec(spec)
+    if error:
+        return jsonify({"error": error}), 400
+
+    services = spec["services"]
+    for service in services:
+        if model_cache.get(service["available_model_id"]) is None:
+            return (
+                jsonify(
+                    {"error": f"Available model with ID {service['available_model_id']} not found"}
+                ),
+                404,
+            )
+
+    if Stack.query.filter_by(user_id=user["id"], name=spec["name"]).first():
+        return jsonify({"error": "You already have a stack with this name"}), 400
+    for service in services:
+        if is_container_name_taken(f"{spec['name']}-{service['name']}", user):
+            return (
+                jsonify({"error": f"Container name '{spec['name']}-{service['name']}' is taken"}),
+                400,
+            )
+
+    try:
+        # One call so host ports are unique across the whole stack
+        requested = [port for service in services for port in service.get("ports", [])]
+        _, mappings = assign_ports(user["id"], requested)
+    except Exception as e:
+        current_app.logger.error(f"Port assignment failed for stack: {str(e)}")
+        return jsonify({"error": "Failed to assign ports"}), 500
+
+    stack = Stack(user_id=user["id"], name=spec["name"], spec=spec, network_name="")
+    db.session.add(stack)
+    db.session.flush()
+    stack.network_name = f"{STACK_NETWORK_PREFIX}{stack.id}"
+
+    domain = os.environ.get("DOMAIN")
+    shared_env = spec.get("environment", {})
+    containers = []
+    offset = 0
+    for service in services:
+        count = len(service.get("ports", []))
+        name = f"{spec['name']}-{service['name']}"
+        container = Container(
+            user_id=user["id"],
+            available_model_id=service["available_model_id"],
+            name=name,
+            status=ContainerStatus.PENDING,
+            ports=mappings[offset : offset + count],
+            config={
+                "environment": {**shared_env, **service.get("environment", {})},
+                "host": f"{generate_subdomain(user['username'], name)}.{domain}",
+                "service": service["name"],
+            },
+            stack_id=stack.id,
+        )
+        offset += count
+        containers.append(container)
+    db.session.add_all(containers)
+    db.session.commit()
+
+    api_keys = {}
+    for container in containers:
+        api_keys[container.id] = store_api_key(user["id"], container.id)
+        publish_deploy_progress(user["id"], container.id, "created")
+
+    start_orchestration(stack.id)
+    current_app.logger.info(f"Stack {stack.id} created with {len(containers)} services")
+
+    body = serialize_stack(stack)
+    for service in body["services"]:
+        service["api_key"] = api_keys[service["container_id"]]
+    return jsonify(body), 202
+
+
+@stack_bp.route("/", methods=["GET"])
+@login_required
+def get_stacks():
+    stacks = (
+        Stack.query.filter_by(user_id=g.user["id"]).order_by(Stack.created_at.desc()).all()
+    )
+    return jsonify([serialize_stack(stack, include_services=False) for stack in stacks])
+
+
+@stack_bp.route("/<string:stack_id>", methods=["GET"])
+@login_required
+def get_stack(stack_id):
+    stack, error_response = get_owned_stack(stack_id)
+    if error_response:
+        return error_response
+    return jsonify(serialize_stack(stack))
+
+
+@stack_bp.route("/<string:stack_id>/start", methods=["POST"])
+@login_required
+def start_stack(stack_id):
+    """Start every service in dependency order; returns immediately (202)."""
+    stack, error_response = get_owned_stack(stack_id)
+    if error_response:
+        return error_response
+
+    startable = (ContainerStatus.STOPPED, ContainerStatus.FAILED, ContainerStatus.PAUSED)
+    if not claim_stack(stack_id, startable, ContainerStatus.PENDING):
+        return jsonify({"error": f"Stack is {stack.status.value}"}), 409
+
+    publish_stack_status(stack.user_id, stack_id, ContainerStatus.PENDING)
+    start_orchestration(stack_id)
+    return jsonify({"message": "Stack starting", "stack_id": stack_id, "status": "pending"}), 202
+
+
+def _stop_one(service):
+    container_id, docker_ref = service
+
+    def stop(client):
+        remove_replicas(client, container_id)
+        try:
+            get_owned_container(client, docker_ref, container_id).stop()
+        except docker.errors.NotFound:
+            pass
+
+    try:
+        docker_call("stop", stop, idempotent=True)
+        return None
+    except DockerCallError as e:
+        return str(e)
+
+
+def _remove_one(service):
+    container_id, docker_ref = service
+
+    def remove(client):
+        remove_replicas(client, container_id)
+        try:
+            get_owned_container(client, docker_ref, container_id).remove(force=True)
+        except docker.errors.NotFound:
+            pass
+
+    try:
+        docker_call("remove", remove, idempotent=True)
+        return None
+    except DockerCallError as e:
+        return str(e)
+
+
+@stack_bp.route("/<string:stack_id>/stop", methods=["POST"])
+@login_required
+def stop_stack(stack_id):
+    """Stop every service in parallel."""
+    stack, error_response = get_owned_stack(stack_id)
+    if error_response:
+        return error_response
+
+    stoppable = (ContainerStatus.RUNNING, ContainerStatus.FAILED, ContainerStatus.PAUSED)
+    if not claim_stack(stack_id, stoppable, ContainerStatus.STOPPED):
+        return jsonify({"error": f"Stack is {stack.status.value}"}), 409
+
+    containers = list(stack.containers)
+    errors = run_parallel([(c.id, c.name) for c in containers], _stop_one)
+    failures = {c.id: e for c, e in zip(containers, errors) if e}
+
+    stopped = [c.id for c in containers if c.id not in failures]
+    db.session.execute(
+        update(Container.__table__)
+        .where(Container.id.in_(stopped))
+        .values(status=ContainerStatus.STOPPED, replicas=1, cpuset=None, cpuset_mems=None)
+    )
+    db.session.commit()
+    for container_id in stopped:
+        publish_status(stack.user_id, container_id, ContainerStatus.STOPPED)
+    publish_stack_status(stack.user_id, stack_id, ContainerStatus.STOPPED)
+    routing_publisher.schedule(current_app._get_current_object())
+
+    if failures:
+        claim_stack(stack_id, (ContainerStatus.STOPPED,), ContainerStatus.FAILED)
+        current_app.logger.error(f"Failed to stop some services of stack {stack_id}: {failures}")
+        return jsonify({"error": "Failed to stop some services", "failures": failures}), 500
+    return jsonify({"message": "Stack stopped successfully", "status": "stopped"})
+
+
+@stack_bp.route("/<string:stack_id>", methods=["DELETE"])
+@login_required
+def delete_stack(stack_id):
+    """Remove every service in parallel, then the network and all rows."""
+    stack, error_response = get_owned_stack(stack_id)
+    if error_response:
+        return error_response
+    if stack.status == ContainerStatus.PENDING and fail_stale_stacks(stack_id):
+        db.session.refresh(stack)
+    if stack.status == ContainerStatus.PENDING:
+        return jsonify({"error": "Stack is starting; try again when it settles"}), 409
+
+    containers = list(stack.containers)
+    errors = run_parallel([(c.id, c.name) for c in containers], _remove_one)
+    failures = {c.id: e for c, e in zip(containers, errors) if e}
+    if failures:
+        current_app.logger.error(f"Failed to remove some services of stack {stack_id}: {failures}")
+        return jsonify({"error": "Failed to delete some services", "failures": failures}), 500
+
+    try:
+        docker.from_env(timeout=60).networks.get(stack.network_name).remove()
+    except docker.errors.NotFound:
+        pass
+    except docker.errors.APIError as e:
+        current_app.logger.warning(f"Failed to remove network {stack.network_name}: {str(e)}")
+
+    container_ids = [c.id for c in containers]
+    user_id = stack.user_id
+    keys = db.session.execute(
+        delete(APIKey.__table__)
+        .where(APIKey.container_id.in_(container_ids))
+        .returning(APIKey.key)
+    ).scalars().all()
+    db.session.execute(delete(Container.__table__).where(Container.stack_id == stack_id))
+    db.session.execute(delete(Stack.__table__).where(Stack.id == stack_id))
+    db.session.commit()
+
+    for key in keys:
+        api_key_filter.remove(key)
+    for container_id in container_ids:
+        publish_status(user_id, container_id, "deleted")
+    publish_stack_status(user_id, stack_id, "deleted")
+    routing_publisher.schedule(current_app._get_current_object())
+
+    current_app.logger.info(f"Stack {stack_id} deleted successfully")
+    return jsonify({"message": "Stack deleted successfully"})
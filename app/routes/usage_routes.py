@@ -0,0 +1,76 @@
+import datetime
+
+from flask import Blueprint, jsonify, request, current_app, g
+
+from app.middleware.protected import login_required
+from app.utils.metering_utils import USAGE_GRANULARITIES, query_usage
+
+# Define the Blueprint
+usage_bp = Blueprint("usage", __name__, url_prefix="/api/usage")
+
+
+def parse_usage_range():
+    """Read ?start=&end=&granularity= (ISO 8601, UTC); defaults to the last 24 hours."""
+    now = datetime.datetime.utcnow()
+    start = request.args.get("start")
+    end = request.args.get("end")
+    granularity = request.args.get("granularity", "hour")
+
+    if granularity not in USAGE_GRANULARITIES:
+        raise ValueError(f"'granularity' must be one of {', '.join(USAGE_GRANULARITIES)}")
+
+    try:
+        start = datetime.datetime.fromisoformat(start) if start else now - datetime.timedelta(days=1)
+        end = datetime.datetime.fromisoformat(end) if end else now
+    except ValueError:
+        raise ValueError("'start' and 'end' must be ISO 8601 timestamps")
+
+    # Stored buckets are naive UTC
+    if start.tzinfo:
+        start = start.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if end.tzinfo:
+        end = end.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if start >= end:
+        raise ValueError("'start' must be before 'end'")
+
+    return start, end, granularity
+
+
+def usage_response(**filters):
+    try:
+        start, end, granularity = parse_usage_range()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    usage = query_usage(g.user["id"], start, end, granularity, **filters)
+    return jsonify(
+        {
+            **filters,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "granularity": granularity,
+            "total_requests": sum(period["requests"] for period in usage),
+            "usage": usage,
+        }
+    )
+
+
+@usage_bp.route("/containers/<string:container_id>", methods=["GET"])
+@login_required
+def get_container_usage(container_id):
+    current_app.logger.info(f"Fetching usage for container {container_id}")
+    return usage_response(container_id=container_id)
+
+
+@usage_bp.route("/api-keys/<string:api_key_id>", methods=["GET"])
+@login_required
+def get_api_key_usage(api_key_id):
+    current_app.logger.info(f"Fetching usage for API key {api_key_id}")
+    return usage_response(api_key_id=api_key_id)
+
+
+@usage_bp.route("/", methods=["GET"])
+@login_required
+def get_user_usage():
+    current_app.logger.info(f"Fetching usage for user {g.user['id']}")
+    return usage_response()
@@ -1,9 +1,22 @@
+import os
 import uuid  # Generate unique API keys
 from flask import current_app, g, jsonify  # Flask context and response handling
+from sqlalchemy import func, or_, update  # Bulk statements for rotation
+from sqlalchemy.dialects.postgresql import insert
 from werkzeug.security import generate_password_hash  # Securely hash API keys
 from app import db  # Database instance
 from app.models.api_key import APIKey  # API Key model
 from app.models.container import Container  # Container model
+from app.utils.key_filter_utils import api_key_filter  # Invalid-key pre-check
+from app.utils.timing_utils import timed  # Server-Timing spans
+
+# How long rotated-out keys keep working, unless the request overrides it
+API_KEY_ROTATION_GRACE_SECONDS = int(os.environ.get("API_KEY_ROTATION_GRACE_SECONDS", "3600"))
+API_KEY_ROTATION_MAX_GRACE_SECONDS = int(
+    os.environ.get("API_KEY_ROTATION_MAX_GRACE_SECONDS", str(7 * 24 * 3600))
+)
+API_KEY_ROTATION_MAX_CONTAINERS = int(os.environ.get("API_KEY_ROTATION_MAX_CONTAINERS", "500"))
+API_KEY_SWEEP_INTERVAL_SECONDS = int(os.environ.get("API_KEY_SWEEP_INTERVAL_SECONDS", "60"))
 
 
 # 🔹 Generate a secure API key
@@ -37,9 +50,9 @@ def get_user_container(container_id, user_id):
 
 
 # 🔹 Store a new API key in the database
+@timed()
 def store_api_key(user_id, container_id):
     api_key_value = generate_api_key()
-    current_app.logger.info(f"Generated API key: {api_key_value}")
 
     new_api_key = APIKey(
         user_id=user_id,
@@ -49,6 +62,7 @@ def store_api_key(user_id, container_id):
 
     db.session.add(new_api_key)
     db.session.commit()
+    api_key_filter.add(api_key_value)
 
     current_app.logger.info(
         f"API key created for container {container_id} by user {user_id}"
@@ -71,8 +85,87 @@ def delete_api_key_by_id(api_key_id, user_id):
 
     db.session.delete(api_key)
     db.session.commit()
+    api_key_filter.remove(api_key.key)
 
     current_app.logger.info(
         f"API Key {api_key_id} deleted successfully by user {user_id}"
     )
     return jsonify({"message": "API Key deleted successfully"}), 200
+
+
+def usable_key_filter():
+    """Criteria for keys that still authenticate: active and not past expires_at."""
+    return (
+        APIKey.is_active.is_(True),
+        or_(APIKey.expires_at.is_(None), APIKey.expires_at > func.now()),
+    )
+
+
+# 🔹 Rotate the keys of many containers in one transaction
+def rotate_api_keys(user_id, container_ids, grace_seconds):
+    """
+    Issue one new key per container and expire the old ones after a grace period.
+
+    Old keys get expires_at = now() + grace_seconds (one UPDATE); new keys are
+    created with a single INSERT ... RETURNING. Both commit together, so a
+    container never ends up with neither. Returns (rows, expires_at) where
+    rows are (api_key_id, container_id, key).
+    """
+    table = APIKey.__table__
+
+    try:
+        # now() is the transaction start, so every row shares this timestamp
+        expires_at = db.session.execute(
+            db.select(func.now() + func.make_interval(0, 0, 0, 0, 0, 0, grace_seconds))
+        ).scalar()
+        db.session.execute(
+            update(table)
+            .where(table.c.container_id.in_(container_ids), *usable_key_filter())
+            .where(or_(table.c.expires_at.is_(None), table.c.expires_at > expires_at))
+            .values(expires_at=expires_at)
+        )
+        rows = db.session.execute(
+            insert(table)
+            .values(
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "container_id": container_id,
+                        "key": generate_api_key(),
+                        "is_active": True,
+                        "created_at": func.now(),
+                    }
+                    for container_id in container_ids
+                ]
+            )
+            .returning(table.c.id, table.c.container_id, table.c.key)
+        ).all()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for _, _, key in rows:
+        api_key_filter.add(key)
+
+    current_app.logger.info(
+        f"Rotated API keys for {len(rows)} containers of user {user_id}; "
+        f"old keys expire at {expires_at.isoformat()}"
+    )
+    return rows, expires_at
+
+
+def deactivate_expired_api_keys():
+    """Bulk-deactivate keys past their rotation grace period; returns the count."""
+    table = APIKey.__table__
+    with db.engine.begin() as conn:
+        keys = conn.execute(
+            update(table)
+            .where(table.c.is_active.is_(True), table.c.expires_at <= func.now())
+            .values(is_active=False)
+            .returning(table.c.key)
+        ).scalars().all()
+    for key in keys:
+        api_key_filter.remove(key)
+    return len(keys)
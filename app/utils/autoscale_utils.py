@@ -0,0 +1,352 @@
+import datetime
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.models.available_models import AvailableModel
+from app.models.container import Container, ContainerStatus
+from app.models.usage_record import UsageRecord
+from app.utils.deploy_queue_utils import deploy_slot
+from app.utils.docker_utils import find_docker_container, remove_partial_container
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.metering_utils import USAGE_BUCKET_SECONDS, bucket_start_for
+from app.utils.metrics_utils import metrics
+from app.utils.model_cache_utils import model_cache
+from app.utils.readiness_utils import build_probe_target, readiness_poller
+from app.utils.reconcile_utils import CONTAINER_ID_LABEL, managed_labels
+from app.utils.reverse_proxy_utils import (
+    build_traefik_labels,
+    replica_name,
+    router_name_for,
+    routing_publisher,
+    uses_generated_routing,
+)
+from app.utils.stack_utils import STACK_NETWORK_PREFIX
+
+docker = lazy_import("docker")
+
+AUTOSCALE_INTERVAL_SECONDS = int(os.environ.get("AUTOSCALE_INTERVAL_SECONDS", "30"))
+# Proxied requests per second one replica is expected to handle
+AUTOSCALE_TARGET_RPS = float(os.environ.get("AUTOSCALE_TARGET_RPS", "20"))
+# Average CPU per replica, in docker stats terms (100 = one full core)
+AUTOSCALE_TARGET_CPU_PERCENT = float(os.environ.get("AUTOSCALE_TARGET_CPU_PERCENT", "80"))
+AUTOSCALE_SCALE_UP_COOLDOWN_SECONDS = int(
+    os.environ.get("AUTOSCALE_SCALE_UP_COOLDOWN_SECONDS", "60")
+)
+# Replicas are removed one at a time, at most once per cooldown
+AUTOSCALE_SCALE_DOWN_COOLDOWN_SECONDS = int(
+    os.environ.get("AUTOSCALE_SCALE_DOWN_COOLDOWN_SECONDS", "300")
+)
+# Deployments inspected / scaled concurrently per run
+AUTOSCALE_MAX_PARALLEL = int(os.environ.get("AUTOSCALE_MAX_PARALLEL", "8"))
+
+# Set on every replica after the primary; value is the replica index
+REPLICA_LABEL = "cloud-platform.replica"
+
+
+def validate_replica_bounds(min_replicas, max_replicas):
+    """Return an error message for invalid per-model replica bounds, or None."""
+    for field, value in (("min_replicas", min_replicas), ("max_replicas", max_replicas)):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            return f"'{field}' must be a positive integer"
+    if min_replicas > max_replicas:
+        return "'min_replicas' can't be greater than 'max_replicas'"
+    return None
+
+
+def list_replicas(client, container_id):
+    """Docker containers running as extra replicas of a Container row, by index."""
+    replicas = client.containers.list(
+        all=True,
+        filters={"label": [f"{CONTAINER_ID_LABEL}={container_id}", REPLICA_LABEL]},
+    )
+    return {int(r.labels.get(REPLICA_LABEL, 0)): r for r in replicas}
+
+
+def remove_replicas(client, container_id, keep=1):
+    """Force-remove replicas with index >= keep; returns how many were removed."""
+    removed = 0
+    for index, replica in list_replicas(client, container_id).items():
+        if index < keep:
+            continue
+        try:
+            remove_partial_container(name, labels)
+            removed += 1
+        except docker.errors.NotFound:
+            continue
+    return removed
+
+
+class RequestRateTracker:
+    """
+    Per-container request rates from the usage_records the proxy auth path writes.
+
+    Each sample reads the cumulative counts of the current and previous usage
+    buckets and diffs them against the previous sample, so the rate is exact
+    regardless of bucket size (lagging by at most one usage flush).
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._ids = set()
+        self._sampled_at = None
+
+    def sample(self, container_ids, max_age):
+        """{container_id: requests/second} since the last sample; {} on the first."""
+        since = bucket_start_for(time.time() - USAGE_BUCKET_SECONDS)
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(
+                    UsageRecord.container_id,
+                    UsageRecord.bucket_start,
+                    func.sum(UsageRecord.request_count),
+                )
+                .where(
+                    UsageRecord.container_id.in_(container_ids),
+                    UsageRecord.bucket_start >= since,
+                )
+                .group_by(UsageRecord.container_id, UsageRecord.bucket_start)
+            ).all()
+        counts = {(container_id, bucket): int(n) for container_id, bucket, n in rows}
+        now = time.monotonic()
+
+        rates = {}
+        # A stale baseline (e.g. another process ran the job meanwhile) is dropped
+        if self._sampled_at is not None and now - self._sampled_at <= max_age:
+            elapsed = max(now - self._sampled_at, 1e-3)
+            for container_id in self._ids.intersection(container_ids):
+                rates[container_id] = 0.0
+            for (container_id, bucket), n in counts.items():
+                if container_id in rates:
+                    delta = n - self._counts.get((container_id, bucket), 0)
+                    rates[container_id] += max(delta, 0) / elapsed
+
+        self._counts, self._ids, self._sampled_at = counts, set(container_ids), now
+        return rates
+
+
+rate_tracker = RequestRateTracker()
+
+
+def cpu_percent(stats):
+    """CPU use from one docker stats snapshot, like `docker stats` (100 = one core)."""
+    cpu, precpu = stats.get("cpu_stats") or {}, stats.get("precpu_stats") or {}
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get(
+        "cpu_usage", {}
+    ).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * online * 100
+
+
+def _average_cpu(client, container):
+    """Mean CPU across the primary and its replicas, or None if none could be read."""
+    samples = []
+    try:
+        docker_containers = [find_docker_container(client, container)]
+    except docker.errors.NotFound:
+        docker_containers = []
+    try:
+        replicas = list_replicas(client, container.id)
+    except docker.errors.APIError:
+        replicas = {}
+    docker_containers += [r for i, r in sorted(replicas.items()) if i < container.replicas]
+    for docker_container in docker_containers:
+        try:
+            samples.append(cpu_percent(docker_container.stats(stream=False)))
+        except (docker.errors.NotFound, docker.errors.APIError):
+            continue
+    return sum(samples) / len(samples) if samples else None
+
+
+def desired_replicas(current, rps, cpu, min_replicas, max_replicas):
+    """Replica count that brings request rate and CPU per replica under target."""
+    wanted = 1
+    if rps is not None and AUTOSCALE_TARGET_RPS > 0:
+        wanted = max(wanted, math.ceil(rps / AUTOSCALE_TARGET_RPS))
+    if cpu is not None and AUTOSCALE_TARGET_CPU_PERCENT > 0:
+        wanted = max(wanted, math.ceil(current * cpu / AUTOSCALE_TARGET_CPU_PERCENT))
+    return min(max(wanted, min_replicas), max_replicas)
+
+
+def _launch_replica(client, container, model, index):
+    """Start replica index with the primary's config behind the same Traefik service."""
+    from app.routes.container_routes import run_docker_container  # avoid import cycle
+
+    name = replica_name(container.name, index)
+    # Left over from a failed scale; found by label, since a container called
+    # name may be someone else's deployment
+    leftover = list_replicas(client, container.id).get(index)
+    if leftover is not None:
+        try:
+            leftover.remove(force=True)
+        except docker.errors.NotFound:
+            pass
+
+    config = container.config or {}
+    ports = [
+        {k: v for k, v in m.items() if k != "host_port"} for m in container.ports or []
+    ]
+    # Same router and service names as the primary, so Traefik load-balances
+    # across all of them; replicas publish no host ports
+    labels = build_traefik_labels(
+        router_name_for(container.user_id, container.id),
+        config.get("host"),
+        ports[0]["container_port"] if ports else None,
+    )
+    labels.update(managed_labels(container.id))
+    labels[REPLICA_LABEL] = str(index)
+
+    stack_network = f"{STACK_NETWORK_PREFIX}{container.stack_id}" if container.stack_id else None
+    with deploy_slot(container.user_id, container.id, bounded=False):
+        run_docker_container(
+            model,
+            config.get("environment", {}),
+            name,
+            {},
+            labels,
+            stack_network=stack_network,
+            alias=config.get("service") if stack_network else None,
+        )
+
+    if model.readiness_probe:
+        target = build_probe_target(model.readiness_probe, name, ports)
+        if target["port"] is None:
+            target["type"] = "docker"
+        if not readiness_poller.probe(target):
+            remove_partial_container(name, labels)
+            raise RuntimeError(f"Replica {name} failed its readiness probe")
+
+
+def scale_container(container, model, target, client=None):
+    """
+    Launch or remove replicas until container has target of them.
+
+    Scale-up stops at the first replica that fails to start. On scale-down
+    the generated routing config drops the replicas before they are removed.
+    Returns the replica count reached.
+    """
+    client = client or docker.from_env(timeout=200)
+    current = container.replicas
+
+    if target > current:
+        reached = current
+        for index in range(current, target):
+            try:
+                _launch_replica(client, container, model, index)
+            except Exception as e:
+                current_app.logger.error(f"Failed to start replica {index} of {container.id}: {str(e)}")
+                break
+            reached = index + 1
+    else:
+        reached = target
+
+    if reached == current:
+        return current
+
+    container.replicas = reached
+    container.scaled_at = datetime.datetime.utcnow()
+    db.session.commit()
+
+    if reached < current:
+        if uses_generated_routing():
+            routing_publisher.sync()
+        remove_replicas(client, container.id, keep=reached)
+    else:
+        routing_publisher.schedule(current_app._get_current_object())
+
+    direction = "up" if reached > current else "down"
+    metrics.inc(f"autoscale_scale_{direction}s_total")
+    current_app.logger.info(f"Scaled {container.id} {direction} from {current} to {reached} replicas")
+    return reached
+
+
+def _plan(container, model, rps, cpu, now):
+    """
+    Next replica count for one deployment, honouring bounds and cooldowns.
+
+    With neither a request rate sample nor CPU stats (tracker gap, stats call
+    failed) there is nothing to scale on, so only the model's bounds apply.
+    """
+    current = container.replicas
+    usable = (rps is not None and AUTOSCALE_TARGET_RPS > 0) or (
+        cpu is not None and AUTOSCALE_TARGET_CPU_PERCENT > 0
+    )
+    if not usable:
+        metrics.inc("autoscale_skipped_total", reason="no_signal")
+        return min(max(current, model.min_replicas), model.max_replicas)
+
+    wanted = desired_replicas(current, rps, cpu, model.min_replicas, model.max_replicas)
+    since = (now - container.scaled_at).total_seconds() if container.scaled_at else math.inf
+
+    if wanted > current and since >= AUTOSCALE_SCALE_UP_COOLDOWN_SECONDS:
+        return wanted
+    if wanted < current and since >= AUTOSCALE_SCALE_DOWN_COOLDOWN_SECONDS:
+        return current - 1
+    # Bounds changed on the model: apply right away
+    if current < model.min_replicas or current > model.max_replicas:
+        return min(max(current, model.min_replicas), model.max_replicas)
+    return current
+
+
+def autoscale():
+    """
+    One autoscaler pass over running deployments of models that allow >1 replica.
+
+    Returns {container_id: (old, new)} for deployments whose count changed.
+    """
+    app = current_app._get_current_object()
+    containers = (
+        Container.query.join(AvailableModel)
+        .filter(
+            Container.status == ContainerStatus.RUNNING,
+            (AvailableModel.max_replicas > 1) | (Container.replicas > 1),
+        )
+        .all()
+    )
+    if not containers:
+        return {}
+
+    rates = rate_tracker.sample([c.id for c in containers], max_age=AUTOSCALE_INTERVAL_SECONDS * 3)
+    ids = [c.id for c in containers]
+    db.session.commit()
+
+    def scale_one(container_id):
+        with app.app_context():
+            try:
+                container = Container.query.get(container_id)
+                model = model_cache.get(container.available_model_id)
+                client = docker.from_env(timeout=200)
+                cpu = _average_cpu(client, container)
+                target = _plan(
+                    container, model, rates.get(container_id), cpu, datetime.datetime.utcnow()
+                )
+                before = container.replicas
+                if target == before:
+                    return None
+                return before, scale_container(container, model, target, client)
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Autoscaling {container_id} failed: {str(e)}")
+                return None
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=min(AUTOSCALE_MAX_PARALLEL, len(ids))) as pool:
+        results = dict(zip(ids, pool.map(scale_one, ids)))
+
+    changes = {cid: r for cid, r in results.items() if r is not None and r[0] != r[1]}
+    metrics.set_gauge(
+        "autoscale_replicas",
+        db.session.query(func.coalesce(func.sum(Container.replicas), 0))
+        .filter(Container.status == ContainerStatus.RUNNING)
+        .scalar(),
+    )
+    return changes
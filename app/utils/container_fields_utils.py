@@ -0,0 +1,172 @@
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app import db
+from app.models.api_key import APIKey
+from app.models.available_models import AvailableModel
+from app.models.container import Container
+from app.utils.model_cache_utils import ModelSnapshot, model_cache
+
+# Response field -> containers column
+CONTAINER_COLUMNS = {
+    "id": Container.id,
+    "user_id": Container.user_id,
+    "name": Container.name,
+    "available_model_id": Container.available_model_id,
+    "status": Container.status,
+    "ports": Container.ports,
+    "replicas": Container.replicas,
+    "cpuset": Container.cpuset,
+    "config": Container.config,
+    "created_at": Container.created_at,
+}
+# Response field -> catalog attribute, served from the model cache
+MODEL_FIELDS = {
+    "model_name": "name",
+    "model_description": "description",
+    "docker_image": "docker_image",
+    "version": "version",
+    "updated_at": "updated_at",
+    "is_active": "is_active",
+}
+
+# Everything the endpoints return by default, in response order
+SUMMARY_FIELDS = (
+    "id",
+    "user_id",
+    "name",
+    "available_model_id",
+    "model_name",
+    "model_description",
+    "docker_image",
+    "status",
+    "ports",
+    "replicas",
+    "cpuset",
+    "config",
+    "created_at",
+)
+DETAIL_FIELDS = (
+    "id",
+    "user_id",
+    "name",
+    "available_model_id",
+    "model_name",
+    "model_description",
+    "docker_image",
+    "version",
+    "status",
+    "ports",
+    "replicas",
+    "cpuset",
+    "config",
+    "created_at",
+    "updated_at",
+    "is_active",
+    "api_keys",
+)
+
+
+def parse_fields(raw, allowed):
+    """
+    (fields, error message) for a ?fields=a,b,c parameter.
+
+    No parameter means every allowed field. "id" is always included so
+    list items stay identifiable.
+    """
+    if raw is None:
+        return allowed, None
+    requested = {field.strip() for field in raw.split(",") if field.strip()}
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        return None, f"Unknown fields: {', '.join(unknown)}; allowed: {', '.join(allowed)}"
+    requested.add("id")
+    return tuple(field for field in allowed if field in requested), None
+
+
+def select_containers(fields, *criteria, live=False):
+    """
+    Rows (not ORM objects) of only the columns fields need, matching criteria.
+
+    Model fields add available_model_id; live state adds name, which the
+    Docker lookup falls back to.
+    """
+    needed = {field for field in fields if field in CONTAINER_COLUMNS}
+    needed.add("id")
+    if any(field in MODEL_FIELDS for field in fields):
+        needed.add("available_model_id")
+    if live:
+        needed.add("name")
+    columns = [column.label(field) for field, column in CONTAINER_COLUMNS.items() if field in needed]
+    return db.session.execute(select(*columns).where(*criteria)).all()
+
+
+def models_for(rows):
+    """{model id: ModelSnapshot} for the rows' models, from the model cache."""
+    ids = {row.available_model_id for row in rows}
+    models = {model_id: model_cache.get(model_id) for model_id in ids}
+    missing = [model_id for model_id, model in models.items() if model is None]
+    if missing:
+        columns = [getattr(AvailableModel, field) for field in ModelSnapshot._fields]
+        for row in db.session.execute(
+            select(*columns).where(AvailableModel.id.in_(missing))
+        ).all():
+            models[row.id] = ModelSnapshot(*row)
+    return models
+
+
+def api_keys_for(container_ids):
+    """{container id: [serialized API key]} in one projected query."""
+    keys = defaultdict(list)
+    rows = db.session.execute(
+        select(APIKey.container_id, APIKey.id, APIKey.key, APIKey.is_active, APIKey.created_at)
+        .where(APIKey.container_id.in_(container_ids))
+    ).all()
+    for row in rows:
+        keys[row.container_id].append(
+            {
+                "id": row.id,
+                "key": row.key,
+                "is_active": row.is_active,
+                "created_at": row.created_at.isoformat(),
+            }
+        )
+    return keys
+
+
+def serialize_row(row, fields, models=None, api_keys=None, detail=False):
+    """
+    Response dict for one projected row.
+
+    detail applies the single-container response's conventions: [] / {}
+    instead of null ports and config.
+    """
+    model = models.get(row.available_model_id) if models is not None else None
+    data = {}
+    for field in fields:
+        if field in MODEL_FIELDS:
+            value = getattr(model, MODEL_FIELDS[field]) if model else None
+            if field == "updated_at" and value is not None:
+                value = value.isoformat()
+        elif field == "api_keys":
+            value = api_keys.get(row.id, [])
+        else:
+            value = getattr(row, field)
+            if field == "created_at":
+                value = value.isoformat()
+            elif field == "status":
+                value = value.value  # Convert Enum to string
+            elif detail and field == "ports":
+                value = value or []
+            elif detail and field == "config":
+                value = value or {}
+        data[field] = value
+    return data
+
+
+def row_serializer(rows, fields, detail=False):
+    """Serializer for rows, loading models and API keys only if fields ask for them."""
+    models = models_for(rows) if any(field in MODEL_FIELDS for field in fields) else None
+    api_keys = api_keys_for([row.id for row in rows]) if "api_keys" in fields else None
+    return lambda row: serialize_row(row, fields, models, api_keys, detail)
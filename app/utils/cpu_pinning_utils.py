@@ -0,0 +1,212 @@
+import glob
+import json
+import os
+import re
+import time
+import zlib
+from functools import lru_cache
+
+from sqlalchemy import select, text, update
+
+from app import db
+from app.models.container import Container
+from app.utils.metrics_utils import metrics
+
+# Off by default: containers float across all cores as before
+CPU_PINNING_ENABLED = os.environ.get("CPU_PINNING_ENABLED", "false").lower() == "true"
+# JSON host topology, e.g. {"nodes": {"0": "0-15", "1": "16-31"}}; read from
+# /sys/devices/system/node when unset
+CPU_TOPOLOGY_PATH = os.environ.get("CPU_TOPOLOGY_PATH")
+# Cores never handed out (the OS, Docker and this app run there)
+CPU_PINNING_RESERVED = os.environ.get("CPU_PINNING_RESERVED", "0")
+# Cores for models that don't set cpu_cores
+CPU_PINNING_DEFAULT_CORES = int(os.environ.get("CPU_PINNING_DEFAULT_CORES", "2"))
+"""
+What a deploy does when no cores are free:
+- "reject": fail right away (503 with Retry-After)
+- "queue":  retry until cores free up or CPU_PINNING_QUEUE_TIMEOUT_SECONDS pass
+"""
+CPU_PINNING_WHEN_FULL = os.environ.get("CPU_PINNING_WHEN_FULL", "reject")
+CPU_PINNING_QUEUE_TIMEOUT_SECONDS = float(
+    os.environ.get("CPU_PINNING_QUEUE_TIMEOUT_SECONDS", "120")
+)
+CPU_PINNING_RETRY_SECONDS = float(os.environ.get("CPU_PINNING_RETRY_SECONDS", "2"))
+
+SYSFS_NODE_GLOB = "/sys/devices/system/node/node[0-9]*/cpulist"
+ALLOCATION_LOCK_ID = zlib.crc32(b"cpu-pinning")
+
+
+class NoFreeCores(Exception):
+    def __init__(self, message, retry_after=CPU_PINNING_RETRY_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_cpulist(cpulist):
+    """Parse a Linux cpulist: "0-3,8" -> [0, 1, 2, 3, 8]."""
+    cpus = set()
+    for part in (cpulist or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def format_cpulist(cpus):
+    """Inverse of parse_cpulist; the form Docker's --cpuset-cpus takes."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+@lru_cache(maxsize=1)
+def load_topology():
+    """
+    {numa node: [usable cpu ids]} and whether the nodes are real memory nodes.
+
+    Falls back to a single pseudo-node of every CPU when neither a topology
+    file nor sysfs NUMA information is available; memory nodes aren't
+    pinned in that case.
+    """
+    if CPU_TOPOLOGY_PATH:
+        with open(CPU_TOPOLOGY_PATH) as f:
+            nodes = {int(n): parse_cpulist(c) for n, c in json.load(f)["nodes"].items()}
+        numa = True
+    else:
+        nodes = {}
+        for path in glob.glob(SYSFS_NODE_GLOB):
+            node = int(re.search(r"node(\d+)", path).group(1))
+            with open(path) as f:
+                nodes[node] = parse_cpulist(f.read())
+        numa = bool(nodes)
+        if not nodes:
+            nodes = {0: list(range(os.cpu_count() or 1))}
+
+    reserved = set(parse_cpulist(CPU_PINNING_RESERVED))
+    return {n: [c for c in cpus if c not in reserved] for n, cpus in nodes.items()}, numa
+
+
+def plan_assignment(nodes, used, cores):
+    """
+    Choose cores for one container, or None if they don't fit.
+
+    Best fit: the NUMA node with the fewest free cores that still holds the
+    whole request, so big nodes stay free for big models and a container's
+    cores share one memory controller. Lowest free ids are taken within the
+    node, keeping assignments packed. Requests larger than any node span
+    nodes, fullest-fitting first. Returns (cpus, nodes used).
+    """
+    free = {n: [c for c in cpus if c not in used] for n, cpus in nodes.items()}
+    fitting = [n for n in free if len(free[n]) >= cores]
+    if fitting:
+        node = min(fitting, key=lambda n: (len(free[n]), n))
+        return free[node][:cores], [node]
+
+    if sum(len(cpus) for cpus in free.values()) < cores:
+        return None
+    cpus, used_nodes = [], []
+    for node in sorted(free, key=lambda n: (-len(free[n]), n)):
+        take = free[node][: cores - len(cpus)]
+        if take:
+            cpus.extend(take)
+            used_nodes.append(node)
+        if len(cpus) == cores:
+            break
+    return cpus, sorted(used_nodes)
+
+
+def cores_for(model):
+    return getattr(model, "cpu_cores", None) or CPU_PINNING_DEFAULT_CORES
+
+
+def pinning_kwargs(cpuset, mems):
+    """Docker create/update keyword arguments for an assignment."""
+    kwargs = {"cpuset_cpus": cpuset}
+    if mems:
+        kwargs["cpuset_mems"] = mems
+    return kwargs
+
+
+def _try_assign(container_id, cores):
+    """One locked attempt; returns the container's (cpuset, mems) or None."""
+    nodes, numa = load_topology()
+    with db.engine.begin() as conn:
+        # Serialises allocations across workers; released at commit
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ALLOCATION_LOCK_ID})
+        current = conn.execute(
+            select(Container.cpuset, Container.cpuset_mems).where(Container.id == container_id)
+        ).one_or_none()
+        if current is None:
+            raise LookupError(f"Container {container_id} not found")
+        if current.cpuset:
+            return current.cpuset, current.cpuset_mems
+
+        used = set()
+        for (cpuset,) in conn.execute(
+            select(Container.cpuset).where(Container.cpuset.isnot(None))
+        ):
+            used.update(parse_cpulist(cpuset))
+
+        plan = plan_assignment(nodes, used, cores)
+        free = sum(len(cpus) for cpus in nodes.values()) - len(used)
+        if plan is None:
+            metrics.set_gauge("cpu_pinning_free_cores", free)
+            return None
+
+        cpus, used_nodes = plan
+        cpuset = format_cpulist(cpus)
+        mems = ",".join(str(n) for n in used_nodes) if numa else None
+        conn.execute(
+            update(Container.__table__)
+            .where(Container.id == container_id)
+            .values(cpuset=cpuset, cpuset_mems=mems)
+        )
+    metrics.set_gauge("cpu_pinning_free_cores", free - len(cpus))
+    return cpuset, mems
+
+
+def assign_cores(container_id, model):
+    """
+    Reserve dedicated cores for a container and store them on its row.
+
+    Returns Docker kwargs (cpuset_cpus / cpuset_mems), or None when pinning
+    is disabled. A container that already holds cores keeps them. Raises
+    NoFreeCores when the host is full (after waiting, in "queue" mode).
+    """
+    if not CPU_PINNING_ENABLED:
+        return None
+
+    cores = cores_for(model)
+    deadline = time.monotonic() + (
+        CPU_PINNING_QUEUE_TIMEOUT_SECONDS if CPU_PINNING_WHEN_FULL == "queue" else 0
+    )
+    while True:
+        assignment = _try_assign(container_id, cores)
+        if assignment is not None:
+            metrics.inc("cpu_pinning_assignments_total")
+            return pinning_kwargs(*assignment)
+        if time.monotonic() + CPU_PINNING_RETRY_SECONDS > deadline:
+            metrics.inc("cpu_pinning_rejections_total")
+            raise NoFreeCores(f"No {cores} free CPU cores on this host")
+        time.sleep(CPU_PINNING_RETRY_SECONDS)
+
+
+def release_cores(container_ids):
+    """Free the cores held by containers (stop, failure); deleting the row also frees them."""
+    if not container_ids:
+        return
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(Container.__table__)
+            .where(Container.id.in_(container_ids), Container.cpuset.isnot(None))
+            .values(cpuset=None, cpuset_mems=None)
+        )
@@ -0,0 +1,253 @@
+import itertools
+import math
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from app.utils.events_utils import publish_deploy_progress
+from app.utils.metrics_utils import metrics
+
+# Docker create/start calls running at once in this process (every limit here is
+# per worker process: divide the daemon's budget by the worker count)
+DEPLOY_MAX_CONCURRENT = int(os.environ.get("DEPLOY_MAX_CONCURRENT", "4"))
+# Of those, at most this many for any one user
+DEPLOY_MAX_PER_USER = int(os.environ.get("DEPLOY_MAX_PER_USER", "2"))
+# Waiting deploys beyond these are refused with 429
+DEPLOY_QUEUE_MAX_DEPTH = int(os.environ.get("DEPLOY_QUEUE_MAX_DEPTH", "200"))
+DEPLOY_QUEUE_MAX_PER_USER = int(os.environ.get("DEPLOY_QUEUE_MAX_PER_USER", "20"))
+# A request-bound deploy holds a web worker while it waits, so it only waits this
+# long before giving up with 429 and Retry-After; the client retries later
+DEPLOY_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("DEPLOY_QUEUE_TIMEOUT_SECONDS", "5"))
+# How often a waiting deploy re-reports its position
+DEPLOY_QUEUE_UPDATE_SECONDS = float(os.environ.get("DEPLOY_QUEUE_UPDATE_SECONDS", "5"))
+# Fair-share weights by user role, e.g. "ADMIN:4,PRO:2"; everyone else gets 1
+DEPLOY_ROLE_WEIGHTS = {
+    role.strip().upper(): float(weight)
+    for role, weight in (
+        item.split(":", 1)
+        for item in os.environ.get("DEPLOY_ROLE_WEIGHTS", "").split(",")
+        if ":" in item
+    )
+}
+# Seed for the service-time estimate until real deploys have been timed
+DEPLOY_INITIAL_ESTIMATE_SECONDS = float(os.environ.get("DEPLOY_INITIAL_ESTIMATE_SECONDS", "10"))
+
+QUEUE_WAIT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class DeployQueueFull(Exception):
+    def __init__(self, message, estimated_wait):
+        super().__init__(message)
+        self.estimated_wait = estimated_wait
+
+
+class DeployQueueTimeout(Exception):
+    def __init__(self, message, estimated_wait):
+        super().__init__(message)
+        self.estimated_wait = estimated_wait
+
+
+def weight_for_role(role):
+    return DEPLOY_ROLE_WEIGHTS.get(str(role or "").upper(), 1.0)
+
+
+class DeployTicket:
+    __slots__ = ("user_id", "tag", "seq", "enqueued_at", "granted")
+
+    def __init__(self, user_id, tag, seq):
+        self.user_id = user_id
+        self.tag = tag
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class DeployScheduler:
+    """
+    Weighted fair queue in front of Docker container creation.
+
+    At most max_concurrent deploys run at once, and at most per_user of them
+    for one user. Waiting deploys are ordered by virtual finish time (start
+    fair queuing): each user's next deploy is tagged 1/weight after their
+    previous one, so a user with 50 queued deploys is interleaved with
+    everyone else instead of going first. Limits are per process; size
+    DEPLOY_MAX_CONCURRENT as the daemon's budget divided by the worker count.
+    """
+
+    def __init__(self, max_concurrent=DEPLOY_MAX_CONCURRENT, per_user=DEPLOY_MAX_PER_USER):
+        self.max_concurrent = max_concurrent
+        self.per_user = per_user
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._running_by_user = Counter()
+        self._last_tag = {}  # user_id -> tag of their latest deploy
+        self._virtual_time = 0.0
+        self._service_time = DEPLOY_INITIAL_ESTIMATE_SECONDS
+
+    def _ordered(self):
+        return sorted(self._queue, key=lambda t: (t.tag, t.seq))
+
+    def _dispatch(self):
+        """Grant slots in tag order to tickets whose user is under the cap (lock held)."""
+        granted = False
+        for ticket in self._ordered():
+            if self._running >= self.max_concurrent:
+                break
+            if self._running_by_user[ticket.user_id] >= self.per_user:
+                continue
+            self._queue.remove(ticket)
+            self._running += 1
+            self._running_by_user[ticket.user_id] += 1
+            self._virtual_time = max(self._virtual_time, ticket.tag)
+            ticket.granted = True
+            granted = True
+        if granted:
+            self._cond.notify_all()
+        self._update_gauges()
+
+    def _update_gauges(self):
+        metrics.set_gauge("deploy_queue_depth", len(self._queue))
+        metrics.set_gauge("deploy_in_flight", self._running)
+
+    def _estimate(self, ahead):
+        """Seconds until a deploy with `ahead` queued deploys in front of it starts."""
+        rounds = math.floor(ahead / max(self.max_concurrent, 1)) + 1
+        return round(rounds * self._service_time, 1)
+
+    def enqueue(self, user_id, weight=1.0, bounded=True):
+        with self._cond:
+            if bounded:
+                queued_for_user = sum(1 for t in self._queue if t.user_id == user_id)
+                if len(self._queue) >= DEPLOY_QUEUE_MAX_DEPTH:
+                    metrics.inc("deploy_queue_rejections_total", reason="depth")
+                    raise DeployQueueFull("Deploy queue is full", self._estimate(len(self._queue)))
+                if queued_for_user >= DEPLOY_QUEUE_MAX_PER_USER:
+                    metrics.inc("deploy_queue_rejections_total", reason="user")
+                    raise DeployQueueFull(
+                        "You have too many queued deploys", self._estimate(len(self._queue))
+                    )
+
+            start = max(self._virtual_time, self._last_tag.get(user_id, 0.0))
+            tag = start + 1.0 / max(weight, 1e-6)
+            self._last_tag[user_id] = tag
+            ticket = DeployTicket(user_id, tag, next(self._seq))
+            self._queue.append(ticket)
+            self._dispatch()
+            return ticket
+
+    def position(self, ticket):
+        """(deploys ahead, estimated seconds until start); (0, 0) once granted."""
+        with self._cond:
+            if ticket.granted:
+                return 0, 0
+            ahead = self._ordered().index(ticket)
+            return ahead, self._estimate(ahead)
+
+    def wait(self, ticket, timeout):
+        with self._cond:
+            return self._cond.wait_for(lambda: ticket.granted, timeout)
+
+    def cancel(self, ticket):
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                self._dispatch()
+
+    def release(self, ticket, duration=None):
+        with self._cond:
+            self._running -= 1
+            self._running_by_user[ticket.user_id] -= 1
+            if self._running_by_user[ticket.user_id] <= 0:
+                del self._running_by_user[ticket.user_id]
+                if not any(t.user_id == ticket.user_id for t in self._queue):
+                    # Forget users with nothing queued or running
+                    self._last_tag.pop(ticket.user_id, None)
+            if duration is not None:
+                # EWMA of how long a slot is held
+                self._service_time = 0.8 * self._service_time + 0.2 * duration
+            self._dispatch()
+
+    def snapshot(self, user_id=None):
+        """Queue state; with user_id, that user's waiting deploys and their positions."""
+        with self._cond:
+            ordered = self._ordered()
+            data = {
+                "in_flight": self._running,
+                "queued": len(ordered),
+                "max_concurrent": self.max_concurrent,
+                "estimated_service_seconds": round(self._service_time, 1),
+            }
+            if user_id is not None:
+                data["in_flight_for_user"] = self._running_by_user.get(user_id, 0)
+                data["waiting"] = [
+                    {"position": i + 1, "estimated_wait_seconds": self._estimate(i)}
+                    for i, ticket in enumerate(ordered)
+                    if ticket.user_id == user_id
+                ]
+            return data
+
+    @contextmanager
+    def slot(self, user_id, weight=1.0, bounded=True, on_queued=None):
+        """
+        Hold a deploy slot for the duration of the block.
+
+        Raises DeployQueueFull if the queue is over its limits and, for
+        bounded (request-bound) callers, DeployQueueTimeout after
+        DEPLOY_QUEUE_TIMEOUT_SECONDS. on_queued(position, estimated_wait) is
+        called while waiting whenever the position changes.
+        """
+        ticket = self.enqueue(user_id, weight, bounded)
+        deadline = time.monotonic() + DEPLOY_QUEUE_TIMEOUT_SECONDS if bounded else None
+        reported = None
+        try:
+            while not ticket.granted:
+                ahead, estimate = self.position(ticket)
+                if on_queued is not None and ahead != reported:
+                    on_queued(ahead + 1, estimate)
+                    reported = ahead
+                wait = DEPLOY_QUEUE_UPDATE_SECONDS
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        metrics.inc("deploy_queue_timeouts_total")
+                        raise DeployQueueTimeout(
+                            "Deploy queue is busy, try again later", estimate
+                        )
+                self.wait(ticket, wait)
+        except BaseException:
+            self.cancel(ticket)
+            if ticket.granted:
+                self.release(ticket)
+            raise
+
+        waited = time.monotonic() - ticket.enqueued_at
+        metrics.observe("deploy_queue_wait_seconds", waited, buckets=QUEUE_WAIT_BUCKETS)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(ticket, time.monotonic() - started)
+
+
+deploy_scheduler = DeployScheduler()
+
+
+def deploy_slot(user_id, container_id, role=None, bounded=True):
+    """deploy_scheduler.slot that reports queue position as "queued" deploy events."""
+
+    def report(position, estimated_wait):
+        publish_deploy_progress(
+            user_id,
+            container_id,
+            "queued",
+            position=position,
+            estimated_wait_seconds=estimated_wait,
+        )
+
+    return deploy_scheduler.slot(
+        user_id, weight_for_role(role), bounded=bounded, on_queued=report
+    )
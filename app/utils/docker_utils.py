@@ -0,0 +1,254 @@
+import logging
+import os
+import time
+
+from flask import jsonify
+
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.metrics_utils import metrics
+from app.utils.timing_utils import timed
+
+docker = lazy_import("docker")
+requests = lazy_import("requests")
+
+# Whole-operation deadlines in seconds (all attempts together); override
+# individual ones with e.g. DOCKER_OP_TIMEOUTS="create:300,stop:30"
+DOCKER_OP_TIMEOUTS = {
+    "create": 200.0,
+    "start": 60.0,
+    "stop": 60.0,
+    "pause": 15.0,
+    "unpause": 15.0,
+    "remove": 60.0,
+    "inspect": 10.0,
+    "list": 15.0,
+}
+DOCKER_OP_TIMEOUTS.update(
+    {
+        op.strip(): float(seconds)
+        for op, seconds in (
+            item.split(":", 1)
+            for item in os.environ.get("DOCKER_OP_TIMEOUTS", "").split(",")
+            if ":" in item
+        )
+    }
+)
+# Set on every container the platform starts
+MANAGED_LABEL = "cloud-platform.managed"
+CONTAINER_ID_LABEL = "cloud-platform.container-id"
+
+DOCKER_RETRY_ATTEMPTS = int(os.environ.get("DOCKER_RETRY_ATTEMPTS", "3"))
+DOCKER_RETRY_BACKOFF = float(os.environ.get("DOCKER_RETRY_BACKOFF", "0.5"))
+
+# Not current_app.logger: Docker calls also run on worker threads without an app context
+logger = logging.getLogger("app.docker")
+
+
+class DockerCallError(Exception):
+    """A failed Docker operation, classified for the HTTP response."""
+
+    status_code = 502
+    outcome = "failed"
+
+    def __init__(self, op, message):
+        super().__init__(message)
+        self.op = op
+
+
+class DockerNotFound(DockerCallError):
+    status_code = 404
+    outcome = "not_found"
+
+
+class DockerConflict(DockerCallError):
+    status_code = 409
+    outcome = "conflict"
+
+
+class DockerTimeout(DockerCallError):
+    status_code = 504
+    outcome = "timeout"
+
+
+class DockerUnavailable(DockerCallError):
+    status_code = 503
+    outcome = "unavailable"
+
+
+# Worth another attempt, if the operation is idempotent
+TRANSIENT_ERRORS = (DockerTimeout, DockerUnavailable)
+
+
+def classify_docker_error(op, error):
+    """Map a docker-py / requests exception to a DockerCallError subclass instance."""
+    if isinstance(error, DockerCallError):
+        return error
+    if isinstance(error, docker.errors.NotFound):
+        return DockerNotFound(op, str(error))
+    if isinstance(error, docker.errors.APIError):
+        if error.status_code == 409:
+            return DockerConflict(op, error.explanation or str(error))
+        return DockerCallError(op, error.explanation or str(error))
+    if isinstance(error, requests.exceptions.Timeout):
+        return DockerTimeout(op, f"Docker {op} timed out")
+    if isinstance(error, (requests.exceptions.ConnectionError, docker.errors.DockerException)):
+        return DockerUnavailable(op, "Docker daemon unavailable")
+    return None
+
+
+def _is_transient(error):
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    # 5xx from the daemon (not 404/409) is usually a hiccup worth retrying
+    cause = error.__cause__
+    return (
+        type(error) is DockerCallError
+        and isinstance(cause, docker.errors.APIError)
+        and cause.is_server_error()
+    )
+
+
+def bind_deadline(client, op, deadline):
+    """
+    Make every daemon request through client time out at deadline.
+
+    A client's socket timeout is fixed when it is created, so an fn making
+    several calls (create, connect, start) could otherwise run past the
+    deadline. Each request is instead given the time actually left, and one
+    issued after the deadline fails with DockerTimeout without being sent.
+    """
+    api = client.api
+    send = api.request
+
+    def request(method, url, **kwargs):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DockerTimeout(op, f"Docker {op} exceeded its deadline")
+        timeout = kwargs.get("timeout")
+        kwargs["timeout"] = remaining if timeout is None else min(timeout, remaining)
+        return send(method, url, **kwargs)
+
+    api.request = request
+    return client
+
+
+def docker_call(op, fn, idempotent=False, cleanup=None, timeout=None):
+    """
+    Run fn(client) as one Docker operation with a deadline.
+
+    Each attempt gets a fresh client bound to the deadline
+    (DOCKER_OP_TIMEOUTS[op] unless timeout is given): every request fn makes
+    times out with whatever is left of it.
+    Idempotent operations are retried with exponential backoff on timeouts,
+    connection errors and 5xx responses; others get exactly one attempt.
+    Failures raise a DockerCallError subclass carrying the HTTP status the
+    route should return. If the operation fails or is interrupted,
+    cleanup(error) runs once (best-effort) to remove whatever it had half
+    created.
+    """
+    deadline = time.monotonic() + (timeout or DOCKER_OP_TIMEOUTS.get(op, 60.0))
+    attempts = DOCKER_RETRY_ATTEMPTS if idempotent else 1
+    started = time.perf_counter()
+    outcome = "ok"
+
+    try:
+        for attempt in range(1, attempts + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DockerTimeout(op, f"Docker {op} exceeded its deadline")
+            try:
+                client = docker.from_env(timeout=max(1, int(remaining)))
+                return fn(bind_deadline(client, op, deadline))
+            except Exception as e:
+                error = classify_docker_error(op, e)
+                if error is None:
+                    raise
+                if error is not e:
+                    error.__cause__ = e
+                backoff = DOCKER_RETRY_BACKOFF * 2 ** (attempt - 1)
+                if (
+                    attempt == attempts
+                    or not _is_transient(error)
+                    or time.monotonic() + backoff >= deadline
+                ):
+                    raise error
+                metrics.inc("docker_call_retries_total", op=op)
+                logger.warning(
+                    f"Docker {op} attempt {attempt} failed ({error.outcome}); retrying"
+                )
+                time.sleep(backoff)
+    except BaseException as e:
+        outcome = getattr(e, "outcome", "error")
+        if cleanup is not None:
+            try:
+                cleanup(e)
+            except Exception as cleanup_error:
+                logger.error(f"Cleanup after failed Docker {op} failed: {cleanup_error}")
+        raise
+    finally:
+        metrics.inc("docker_calls_total", op=op, outcome=outcome)
+        metrics.observe("docker_call_seconds", time.perf_counter() - started, op=op)
+
+
+def remove_partial_container(name, labels):
+    """
+    Force-remove the container called name if it carries all of labels.
+
+    Used to clean up after a failed create/start; the label check keeps it
+    from removing an unrelated container that already had the name.
+    """
+
+    def remove(client):
+        try:
+            existing = client.containers.get(name)
+        except docker.errors.NotFound:
+            return
+        if all(existing.labels.get(k) == v for k, v in labels.items()):
+            existing.remove(force=True)
+
+    docker_call("remove", remove, idempotent=True)
+
+
+def docker_error_response(error):
+    """(body, status) for a DockerCallError, for routes to return as-is."""
+    return jsonify({"error": str(error), "docker_outcome": error.outcome}), error.status_code
+
+
+def belongs_to(labels, container_id):
+    """
+    Whether a Docker container with these labels is the one behind row container_id.
+
+    Docker names are global while Container names are only unique per user,
+    so a name match alone may be another user's container. Containers from
+    before the labels existed carry no row id and are trusted by name.
+    """
+    row_id = (labels or {}).get(CONTAINER_ID_LABEL)
+    return row_id is None or row_id == container_id
+
+
+def get_owned_container(client, ref, container_id):
+    """client.containers.get(ref), raising NotFound if it belongs to another row."""
+    docker_container = client.containers.get(ref)
+    if not belongs_to(docker_container.labels, container_id):
+        metrics.inc("docker_foreign_name_matches_total")
+        raise docker.errors.NotFound(f"Docker container {ref} belongs to another deployment")
+    return docker_container
+
+
+@timed()
+def find_docker_container(client, container):
+    """
+    Look up the Docker container behind a Container row.
+
+    Deploys name Docker containers after Container.name, while some older
+    code paths looked them up by the row id, so try both. A container of
+    that name deployed for another row doesn't count.
+    """
+    for ref in (container.id, container.name):
+        if not ref:
+            continue
+        try:
+            return get_owned_container(client, ref, container.id)
+        except docker.errors.NotFound:
+            continue
+    raise docker.errors.NotFound(f"No Docker container for {container.id}")
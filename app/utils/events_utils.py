@@ -0,0 +1,212 @@
+import json
+import os
+import select
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+from sqlalchemy import text
+
+from app import db
+from app.utils.metrics_utils import metrics
+
+"""
+Where published events go:
+- "local":    delivered to subscribers in this process only (single worker)
+- "postgres": sent with NOTIFY and fanned out by a LISTEN thread in every
+              worker, so a subscriber sees events published by any worker
+"""
+EVENT_BUS_BACKEND = os.environ.get("EVENT_BUS_BACKEND", "local")
+EVENT_CHANNEL = os.environ.get("EVENT_CHANNEL", "container_events")
+# Comment lines sent on idle streams so proxies and clients keep them open
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get("EVENT_HEARTBEAT_SECONDS", "15"))
+# Undelivered events kept per subscriber; the oldest are dropped beyond this
+EVENT_QUEUE_SIZE = int(os.environ.get("EVENT_QUEUE_SIZE", "100"))
+EVENT_MAX_SUBSCRIBERS_PER_USER = int(os.environ.get("EVENT_MAX_SUBSCRIBERS_PER_USER", "10"))
+# Every open stream holds one web worker thread for as long as it stays open,
+# so a process serves at most this many; keep it well below the worker's
+# thread count so ordinary requests still get a thread
+EVENT_MAX_SUBSCRIBERS = int(os.environ.get("EVENT_MAX_SUBSCRIBERS", "32"))
+# Suggested reconnect delay when this process has no stream capacity left
+EVENT_RETRY_AFTER_SECONDS = int(os.environ.get("EVENT_RETRY_AFTER_SECONDS", "30"))
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class EventStreamsFull(TooManySubscribers):
+    """This process is already serving EVENT_MAX_SUBSCRIBERS streams."""
+
+
+class Subscription:
+    """One open event stream: a bounded queue and a wakeup flag."""
+
+    __slots__ = ("user_id", "_queue", "_ready", "dropped")
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._queue = deque(maxlen=EVENT_QUEUE_SIZE)
+        self._ready = threading.Event()
+        self.dropped = 0
+
+    def put(self, event):
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(event)
+        self._ready.set()
+
+    def get(self, timeout):
+        """Block up to timeout; return all pending events (possibly none)."""
+        if not self._ready.wait(timeout):
+            return []
+        self._ready.clear()
+        events = []
+        while self._queue:
+            events.append(self._queue.popleft())
+        return events
+
+
+class EventBus:
+    """
+    Per-user publish/subscribe for container lifecycle events.
+
+    Subscribers are indexed by user, so a publish only touches that user's
+    streams. An idle subscriber is a deque and a threading.Event its stream
+    thread sleeps on; nothing polls the database. That thread is a web worker
+    thread, so the number of open streams is capped per process at
+    EVENT_MAX_SUBSCRIBERS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set of Subscription
+        self._total = 0
+        self._listener = None
+
+    def subscribe(self, app, user_id):
+        if EVENT_BUS_BACKEND == "postgres":
+            self._ensure_listener(app)
+        subscription = Subscription(user_id)
+        with self._lock:
+            if self._total >= EVENT_MAX_SUBSCRIBERS:
+                metrics.inc("event_subscribers_rejected_total", reason="process")
+                raise EventStreamsFull("Event stream capacity reached, try again later")
+            streams = self._subscribers.setdefault(user_id, set())
+            if len(streams) >= EVENT_MAX_SUBSCRIBERS_PER_USER:
+                metrics.inc("event_subscribers_rejected_total", reason="user")
+                raise TooManySubscribers("Too many open event streams")
+            streams.add(subscription)
+            self._total += 1
+            metrics.set_gauge("event_subscribers", self._total)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            streams = self._subscribers.get(subscription.user_id)
+            if streams is not None and subscription in streams:
+                streams.discard(subscription)
+                self._total -= 1
+                if not streams:
+                    del self._subscribers[subscription.user_id]
+            metrics.set_gauge("event_subscribers", self._total)
+
+    def publish(self, user_id, event_type, data):
+        event = {"type": event_type, "user_id": user_id, "data": data, "ts": time.time()}
+        metrics.inc("events_published_total", type=event_type)
+        if EVENT_BUS_BACKEND == "postgres":
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": EVENT_CHANNEL, "payload": json.dumps(event, default=str)},
+                )
+        else:
+            self.deliver(event)
+
+    def deliver(self, event):
+        with self._lock:
+            streams = list(self._subscribers.get(event["user_id"], ()))
+        for subscription in streams:
+            subscription.put(event)
+
+    def _ensure_listener(self, app):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, args=(app,), name="event-listener", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self, app):
+        """LISTEN on EVENT_CHANNEL and deliver notifications, reconnecting on errors."""
+        backoff = 1
+        while True:
+            try:
+                with app.app_context():
+                    raw = db.engine.raw_connection()
+                try:
+                    connection = raw.driver_connection
+                    connection.autocommit = True
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {EVENT_CHANNEL}")
+                    backoff = 1
+                    while True:
+                        if not select.select([connection], [], [], 60)[0]:
+                            continue
+                        connection.poll()
+                        while connection.notifies:
+                            notify = connection.notifies.pop(0)
+                            self.deliver(json.loads(notify.payload))
+                finally:
+                    raw.invalidate()
+            except Exception as e:
+                app.logger.error(f"Event listener failed, reconnecting: {str(e)}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+event_bus = EventBus()
+
+
+def publish_status(user_id, container_id, status):
+    """Status transition; status is a ContainerStatus or "deleted"."""
+    try:
+        event_bus.publish(
+            user_id,
+            "status",
+            {"container_id": container_id, "status": getattr(status, "value", status)},
+        )
+    except Exception as e:
+        # Events are best-effort; never fail the lifecycle operation over one
+        metrics.inc("events_publish_errors_total")
+        current_app.logger.warning(f"Failed to publish status event: {str(e)}")
+
+
+def publish_deploy_progress(user_id, container_id, stage, **details):
+    """Deploy progress: "created", "queued", "starting" or "started"."""
+    try:
+        event_bus.publish(
+            user_id, "deploy", {"container_id": container_id, "stage": stage, **details}
+        )
+    except Exception as e:
+        metrics.inc("events_publish_errors_total")
+        current_app.logger.warning(f"Failed to publish deploy event: {str(e)}")
+
+
+def publish_stack_status(user_id, stack_id, status):
+    """Stack-level transition; status is a ContainerStatus or "deleted"."""
+    try:
+        event_bus.publish(
+            user_id,
+            "stack",
+            {"stack_id": stack_id, "status": getattr(status, "value", status)},
+        )
+    except Exception as e:
+        metrics.inc("events_publish_errors_total")
+        current_app.logger.warning(f"Failed to publish stack event: {str(e)}")
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
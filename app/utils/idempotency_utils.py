@@ -0,0 +1,263 @@
+import datetime
+import hashlib
+import os
+import threading
+import time
+import zlib
+from functools import wraps
+
+from flask import current_app, g, jsonify, make_response, request
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# In-flight claims older than this are treated as abandoned (worker crashed)
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", "300"))
+# How long a concurrent duplicate waits for the in-flight request to finish
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get("IDEMPOTENCY_WAIT_SECONDS", "60"))
+MAX_KEY_LENGTH = 255
+# Outcomes that depend on server state at the time (busy, queue full, lock
+# held) rather than on the request; a retry may succeed, so they aren't stored
+RETRYABLE_STATUSES = {408, 409, 423, 425, 429}
+
+_table = IdempotencyKey.__table__
+
+# Wakes duplicates waiting in this worker as soon as the owner finishes;
+# duplicates in other workers fall back to polling the row.
+_local_events = {}
+_events_lock = threading.Lock()
+
+
+def request_fingerprint():
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(request.method.encode())
+    digest.update(b"\0")
+    digest.update(request.path.encode())
+    digest.update(b"\0")
+    digest.update(request.get_data())
+    return digest.digest()
+
+
+def _key_filter(user_id, key):
+    return and_(_table.c.user_id == user_id, _table.c.key == key)
+
+
+def _claim(user_id, key, fingerprint):
+    """Insert an in-flight record; True if this request now owns the key."""
+    now = db.func.now()
+    with db.engine.begin() as conn:
+        # Free the key if its record expired or its owner never finished
+        conn.execute(
+            delete(_table).where(
+                _key_filter(user_id, key),
+                or_(
+                    _table.c.expires_at <= now,
+                    and_(
+                        _table.c.status_code.is_(None),
+                        _table.c.created_at
+                        <= now - datetime.timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS),
+                    ),
+                ),
+            )
+        )
+        result = conn.execute(
+            insert(_table)
+            .values(
+                user_id=user_id,
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + datetime.timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            )
+            .on_conflict_do_nothing(constraint="uq_idempotency_keys_user_key")
+            .returning(_table.c.id)
+        )
+        return result.first() is not None
+
+
+def _load(user_id, key):
+    with db.engine.connect() as conn:
+        return conn.execute(
+            select(
+                _table.c.fingerprint,
+                _table.c.status_code,
+                _table.c.content_type,
+                _table.c.response_body,
+            ).where(_key_filter(user_id, key))
+        ).first()
+
+
+def _finish(user_id, key, response):
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(_table)
+            .where(_key_filter(user_id, key))
+            .values(
+                status_code=response.status_code,
+                content_type=response.content_type,
+                response_body=zlib.compress(response.get_data()),
+            )
+        )
+
+
+def is_final(response):
+    """
+    Whether a response should be stored and replayed for the key.
+
+    Only 2xx and 4xx validation results are final. 5xx, the retryable 4xx
+    statuses, anything with Retry-After and Docker outcomes (whose body
+    carries docker_outcome) depend on the moment and must run again.
+    """
+    if response.status_code >= 500 or response.is_streamed:
+        return False
+    if response.status_code in RETRYABLE_STATUSES or "Retry-After" in response.headers:
+        return False
+    if response.status_code >= 400 and response.is_json:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict) and "docker_outcome" in body:
+            return False
+    return True
+
+
+def _release(user_id, key):
+    """Drop an unfinished claim so a retry can run the request again."""
+    with db.engine.begin() as conn:
+        conn.execute(
+            delete(_table).where(
+                _key_filter(user_id, key), _table.c.status_code.is_(None)
+            )
+        )
+
+
+def _replay(row):
+    response = current_app.response_class(
+        zlib.decompress(row.response_body) if row.response_body else b"",
+        status=row.status_code,
+        content_type=row.content_type,
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _mismatch_response():
+    return (
+        jsonify(
+            {"error": f"{IDEMPOTENCY_HEADER} was already used for a different request"}
+        ),
+        422,
+    )
+
+
+def _wait_for_result(user_id, key, fingerprint):
+    """
+    Wait for the owner of an in-flight key.
+
+    Returns the response to send, or None if the owner gave up (the claim was
+    released) and this request should try to claim the key itself.
+    """
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    interval = 0.05
+
+    while True:
+        row = _load(user_id, key)
+        if row is None:
+            return None
+        if row.fingerprint != fingerprint:
+            return _mismatch_response()
+        if row.status_code is not None:
+            return _replay(row)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return (
+                jsonify(
+                    {"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"}
+                ),
+                409,
+            )
+
+        event = _local_events.get((user_id, key))
+        if event is not None:
+            event.wait(min(interval, remaining))
+        else:
+            time.sleep(min(interval, remaining))
+        interval = min(interval * 2, 1.0)
+
+
+def idempotent(f):
+    """
+    Honour an Idempotency-Key header on a POST endpoint.
+
+    The first request with a key runs the endpoint and its final response is
+    stored for IDEMPOTENCY_TTL_SECONDS. Retries with the same key and request
+    body replay that response. Concurrent duplicates wait for the in-flight
+    request instead of running the pipeline again. Non-final responses (see
+    is_final) release the key, so the client can retry them. Must be applied
+    after login_required.
+    """
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        user = g.get("user", None)
+        if not key or not user:
+            return f(*args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return (
+                jsonify(
+                    {"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"}
+                ),
+                400,
+            )
+
+        user_id = user["id"]
+        fingerprint = request_fingerprint()
+
+        for _ in range(3):
+            if _claim(user_id, key, fingerprint):
+                break
+            result = _wait_for_result(user_id, key, fingerprint)
+            if result is not None:
+                current_app.logger.info(
+                    f"Replayed response for {IDEMPOTENCY_HEADER} {key} (user {user_id})"
+                )
+                return result
+        else:
+            return (
+                jsonify(
+                    {"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"}
+                ),
+                409,
+            )
+
+        event = threading.Event()
+        with _events_lock:
+            _local_events[(user_id, key)] = event
+
+        try:
+            response = make_response(f(*args, **kwargs))
+            if is_final(response):
+                _finish(user_id, key, response)
+            else:
+                _release(user_id, key)
+            return response
+        except Exception:
+            _release(user_id, key)
+            raise
+        finally:
+            with _events_lock:
+                _local_events.pop((user_id, key), None)
+            event.set()
+
+    return decorated_function
+
+
+def purge_expired_idempotency_keys():
+    """Delete expired records; returns the number removed."""
+    with db.engine.begin() as conn:
+        result = conn.execute(delete(_table).where(_table.c.expires_at <= db.func.now()))
+        return result.rowcount
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models.available_models import AvailableModel
+from app.models.container import Container
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.metrics_utils import metrics
+
+docker = lazy_import("docker")
+
+IMAGE_GC_INTERVAL_SECONDS = int(os.environ.get("IMAGE_GC_INTERVAL_SECONDS", "3600"))
+# Evict least recently used images until unique image bytes fit this budget
+IMAGE_GC_DISK_BUDGET_BYTES = int(
+    os.environ.get("IMAGE_GC_DISK_BUDGET_BYTES", str(50 * 1024**3))
+)
+# Newest tags kept per repository of an active model, on top of the current one
+IMAGE_GC_KEEP_VERSIONS = int(os.environ.get("IMAGE_GC_KEEP_VERSIONS", "2"))
+# Never evict images used or pulled more recently than this
+IMAGE_GC_MIN_IDLE_SECONDS = int(os.environ.get("IMAGE_GC_MIN_IDLE_SECONDS", "3600"))
+
+_lock = threading.Lock()
+_last_used = {}  # normalized image ref -> epoch seconds
+_in_flight = Counter()  # normalized image ref -> deploys currently using it
+
+
+def normalize_image_ref(image):
+    """"repo/name" -> "repo/name:latest"; tags and digests are left alone."""
+    if "@" in image:
+        return image
+    if ":" not in image.rsplit("/", 1)[-1]:
+        return f"{image}:latest"
+    return image
+
+
+def repository_of(image_ref):
+    if "@" in image_ref:
+        return image_ref.split("@", 1)[0]
+    return image_ref.rsplit(":", 1)[0]
+
+
+def record_image_use(image):
+    with _lock:
+        _last_used[normalize_image_ref(image)] = time.time()
+
+
+@contextmanager
+def image_in_use(image):
+    """Pin an image for the duration of a deploy so GC can't remove it."""
+    ref = normalize_image_ref(image)
+    with _lock:
+        _in_flight[ref] += 1
+        _last_used[ref] = time.time()
+    try:
+        yield
+    finally:
+        with _lock:
+            _in_flight[ref] -= 1
+            if _in_flight[ref] <= 0:
+                del _in_flight[ref]
+
+
+def _last_use_from_db():
+    """Newest deploy time per image, from the Container table."""
+    rows = (
+        db.session.query(AvailableModel.docker_image, func.max(Container.created_at))
+        .join(Container, Container.available_model_id == AvailableModel.id)
+        .group_by(AvailableModel.docker_image)
+        .all()
+    )
+    return {
+        normalize_image_ref(image): last.timestamp() for image, last in rows if last
+    }
+
+
+def _protected_refs(images_by_id):
+    """Image refs that must never be evicted."""
+    protected = set()
+
+    # Every image a Container row points at: live, stopped or mid-deploy
+    # (rows are written before containers.run in every worker)
+    referenced = (
+        db.session.query(AvailableModel.docker_image)
+        .join(Container, Container.available_model_id == AvailableModel.id)
+        .distinct()
+        .all()
+    )
+    protected.update(normalize_image_ref(image) for (image,) in referenced)
+
+    active = AvailableModel.query.filter_by(is_active=True).all()
+    active_refs = {normalize_image_ref(m.docker_image) for m in active}
+    protected.update(active_refs)
+
+    # Keep the newest few tags of each active model's repository
+    active_repos = {repository_of(ref) for ref in active_refs}
+    by_repo = {}
+    for image in images_by_id.values():
+        for tag in image.get("RepoTags") or []:
+            repo = repository_of(tag)
+            if repo in active_repos:
+                by_repo.setdefault(repo, []).append((image.get("Created", 0), tag))
+    for tags in by_repo.values():
+        for _, tag in sorted(tags, reverse=True)[:IMAGE_GC_KEEP_VERSIONS]:
+            protected.add(tag)
+
+    with _lock:
+        protected.update(_in_flight)
+
+    return protected
+
+
+def collect_images(client=None, dry_run=False):
+    """
+    Prune dangling layers, then evict least recently used images over budget.
+
+    Returns a report dict. Images used by any container (per Docker), pinned
+    by an in-flight deploy, referenced by a Container row, belonging to an
+    active model (or its recent versions), or used recently are never removed.
+    """
+    client = client or docker.from_env(timeout=300)
+    report = {"pruned_bytes": 0, "evicted": [], "evicted_bytes": 0, "dry_run": dry_run}
+
+    if not dry_run:
+        pruned = client.images.prune(filters={"dangling": True})
+        report["pruned_bytes"] = pruned.get("SpaceReclaimed") or 0
+
+    images_by_id = {image["Id"]: image for image in client.df().get("Images") or []}
+    unique_size = {
+        image_id: max(image.get("Size", 0) - max(image.get("SharedSize", 0), 0), 0)
+        for image_id, image in images_by_id.items()
+    }
+    total_bytes = sum(unique_size.values())
+    metrics.set_gauge("image_disk_usage_bytes", total_bytes)
+
+    protected = _protected_refs(images_by_id)
+    last_used = _last_use_from_db()
+    with _lock:
+        for ref, used_at in _last_used.items():
+            last_used[ref] = max(used_at, last_used.get(ref, 0))
+
+    now = time.time()
+    candidates = []
+    for image_id, image in images_by_id.items():
+        refs = [normalize_image_ref(tag) for tag in image.get("RepoTags") or []]
+        if image.get("Containers", 0) > 0 or any(ref in protected for ref in refs):
+            continue
+        used_at = max(
+            [last_used.get(ref, 0) for ref in refs] + [image.get("Created", 0)]
+        )
+        if now - used_at < IMAGE_GC_MIN_IDLE_SECONDS:
+            continue
+        candidates.append((used_at, image_id, refs))
+
+    for used_at, image_id, refs in sorted(candidates):
+        if total_bytes <= IMAGE_GC_DISK_BUDGET_BYTES:
+            break
+        if not dry_run:
+            try:
+                client.images.remove(image_id, force=False)
+            except docker.errors.APIError as e:
+                # 409: a container started using it since df(); leave it
+                current_app.logger.warning(f"Skipped image {image_id[:19]}: {str(e)}")
+                continue
+        total_bytes -= unique_size[image_id]
+        report["evicted"].append({"id": image_id, "tags": refs, "bytes": unique_size[image_id]})
+        report["evicted_bytes"] += unique_size[image_id]
+
+    report["reclaimed_bytes"] = report["pruned_bytes"] + report["evicted_bytes"]
+    report["remaining_bytes"] = total_bytes
+
+    if not dry_run:
+        metrics.inc("image_gc_runs_total")
+        metrics.inc("image_gc_reclaimed_bytes_total", report["reclaimed_bytes"])
+        metrics.inc("image_gc_evicted_images_total", len(report["evicted"]))
+        metrics.set_gauge("image_disk_usage_bytes", total_bytes)
+
+    current_app.logger.info(
+        f"Image GC reclaimed {report['reclaimed_bytes']} bytes "
+        f"({len(report['evicted'])} images evicted, {total_bytes} bytes remaining)"
+    )
+    return report
@@ -0,0 +1,127 @@
+import datetime
+import json
+import os
+from enum import Enum
+
+from flask import Response, current_app, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+from app.utils.compression_utils import negotiate_encoding, streaming_compressor
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# "http" keeps Flask's default RFC 822 dates, "iso" emits ISO 8601
+JSON_DATETIME_FORMAT = os.environ.get("JSON_DATETIME_FORMAT", "http")
+# Arrays longer than this are streamed in chunks instead of encoded in one go
+JSON_STREAM_THRESHOLD = int(os.environ.get("JSON_STREAM_THRESHOLD", "1000"))
+JSON_STREAM_CHUNK_SIZE = int(os.environ.get("JSON_STREAM_CHUNK_SIZE", "500"))
+
+
+def _default(obj):
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime.datetime):
+        if JSON_DATETIME_FORMAT == "iso":
+            return obj.isoformat()
+        return http_date(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson when it is installed.
+
+    Datetimes and enums (e.g. ContainerStatus) are encoded natively, so routes
+    can hand model values straight to jsonify. Keys are not sorted; ordering is
+    not part of any response contract and sorting 10k-row payloads is costly.
+    """
+
+    sort_keys = False
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def dumps_bytes(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault("default", self.default)
+            kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+            kwargs.setdefault("sort_keys", self.sort_keys)
+            kwargs.setdefault("separators", (",", ":"))
+            return json.dumps(obj, **kwargs).encode()
+
+        option = orjson.OPT_NON_STR_KEYS
+        if JSON_DATETIME_FORMAT != "iso":
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        return self._app.response_class(
+            self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype
+        )
+
+
+def _encode(obj):
+    provider = current_app.json
+    if hasattr(provider, "dumps_bytes"):
+        return provider.dumps_bytes(obj)
+    return provider.dumps(obj).encode()
+
+
+def _iter_json_array(items, serialize, chunk_size):
+    yield b"["
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(serialize(item))
+        if len(chunk) >= chunk_size:
+            # Encode a whole chunk as one array and strip its brackets
+            body = _encode(chunk)[1:-1]
+            yield body if first else b"," + body
+            first = False
+            chunk = []
+    if chunk:
+        body = _encode(chunk)[1:-1]
+        yield body if first else b"," + body
+    yield b"]\n"
+
+
+def json_array_response(items, serialize, status=200):
+    """
+    Serialize a list of rows as a JSON array.
+
+    Small lists go through jsonify (and the compression after_request hook).
+    Lists above JSON_STREAM_THRESHOLD are encoded and compressed chunk by
+    chunk, so the full payload is never held in memory at once.
+    """
+    if len(items) <= JSON_STREAM_THRESHOLD:
+        response = current_app.json.response([serialize(item) for item in items])
+        response.status_code = status
+        return response
+
+    chunks = _iter_json_array(items, serialize, JSON_STREAM_CHUNK_SIZE)
+    headers = {"Vary": "Accept-Encoding"}
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+    if encoding:
+        chunks = streaming_compressor(chunks, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(
+        stream_with_context(chunks),
+        status=status,
+        mimetype="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,273 @@
+import datetime
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.models.api_key import APIKey
+from app.utils.cache_utils import TTLCache
+from app.utils.metrics_utils import metrics
+
+API_KEY_FILTER_ENABLED = os.environ.get("API_KEY_FILTER_ENABLED", "true").lower() == "true"
+API_KEY_FILTER_ERROR_RATE = float(os.environ.get("API_KEY_FILTER_ERROR_RATE", "0.001"))
+API_KEY_FILTER_MIN_CAPACITY = int(os.environ.get("API_KEY_FILTER_MIN_CAPACITY", "100000"))
+# Background sync interval for keys created in other workers
+API_KEY_FILTER_SYNC_SECONDS = float(os.environ.get("API_KEY_FILTER_SYNC_SECONDS", "1"))
+# A Bloom miss runs a catch-up sync first unless a sync started within this
+# many seconds before the request; bounds both how stale a rejection can be
+# and how often a flood of bad keys reaches the DB (per worker)
+API_KEY_FILTER_CATCH_UP_SECONDS = float(os.environ.get("API_KEY_FILTER_CATCH_UP_SECONDS", "0.25"))
+# Full rebuilds drop deleted keys and resize the filter
+API_KEY_FILTER_REBUILD_SECONDS = float(os.environ.get("API_KEY_FILTER_REBUILD_SECONDS", "600"))
+API_KEY_FILTER_REBUILD_AFTER_DELETES = int(
+    os.environ.get("API_KEY_FILTER_REBUILD_AFTER_DELETES", "1000")
+)
+# Digests of keys the DB recently said are invalid
+API_KEY_NEGATIVE_CACHE_SIZE = int(os.environ.get("API_KEY_NEGATIVE_CACHE_SIZE", "10000"))
+API_KEY_NEGATIVE_CACHE_TTL = float(os.environ.get("API_KEY_NEGATIVE_CACHE_TTL", "60"))
+# Source IPs with more invalid keys than this per window are refused outright
+API_KEY_OFFENDER_THRESHOLD = int(os.environ.get("API_KEY_OFFENDER_THRESHOLD", "50"))
+API_KEY_OFFENDER_WINDOW_SECONDS = float(os.environ.get("API_KEY_OFFENDER_WINDOW_SECONDS", "60"))
+API_KEY_OFFENDER_MAX_TRACKED = int(os.environ.get("API_KEY_OFFENDER_MAX_TRACKED", "100000"))
+
+# Overlap for incremental syncs: created_at is the inserting transaction's
+# start time, so a slow commit can land behind the watermark
+SYNC_OVERLAP = datetime.timedelta(seconds=30)
+
+
+def key_digest(key):
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte digests (double hashing)."""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+
+class OffenderTracker:
+    """Fixed-window invalid-key counters per source IP, bounded in size."""
+
+    def __init__(self, threshold, window_seconds, max_tracked):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._windows = OrderedDict()  # ip -> [window_start, count]
+
+    def _window(self, ip, now):
+        window = self._windows.get(ip)
+        if window is None or now - window[0] >= self.window_seconds:
+            return None
+        return window
+
+    def is_blocked(self, ip):
+        """Seconds until ip may retry, or 0 if it isn't blocked."""
+        now = time.monotonic()
+        with self._lock:
+            window = self._window(ip, now)
+            if window is None or window[1] < self.threshold:
+                return 0
+            return max(1, int(window[0] + self.window_seconds - now))
+
+    def record_failure(self, ip):
+        now = time.monotonic()
+        with self._lock:
+            window = self._window(ip, now)
+            if window is None:
+                self._windows.pop(ip, None)
+                window = self._windows[ip] = [now, 0]
+                while len(self._windows) > self.max_tracked:
+                    self._windows.popitem(last=False)
+            window[1] += 1
+
+
+class ApiKeyFilter:
+    """
+    In-memory pre-check for API keys on the proxy auth path.
+
+    A Bloom filter of every active key's digest answers "definitely invalid"
+    without touching Postgres; "maybe valid" still goes to the DB. Until the
+    first build finishes, every key goes to the DB. Each worker keeps the
+    filter current with a background thread: incremental syncs by created_at
+    every API_KEY_FILTER_SYNC_SECONDS, full rebuilds periodically or after
+    enough deletions (Bloom filters can't remove entries).
+
+    A key issued by another worker since the last sync isn't in the filter
+    yet, so a miss runs a catch-up sync before rejecting, unless a sync
+    started less than API_KEY_FILTER_CATCH_UP_SECONDS before the request.
+    A flood of bad keys therefore costs at most one small created_at range
+    query per that interval per worker, and a key issued in another worker
+    may be refused for up to that long. Only misses confirmed by a sync
+    that started after the request go into the negative cache, so a retry
+    of such a key isn't refused for the cache TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._watermark = None
+        self._deletes = 0
+        self._last_rebuild = 0.0
+        self._thread = None
+        self._sync_lock = threading.Lock()  # one catch-up sync at a time
+        self._synced_from = float("-inf")  # monotonic start of the latest finished sync
+        self.negative_cache = TTLCache(API_KEY_NEGATIVE_CACHE_TTL, API_KEY_NEGATIVE_CACHE_SIZE)
+        self.offenders = OffenderTracker(
+            API_KEY_OFFENDER_THRESHOLD,
+            API_KEY_OFFENDER_WINDOW_SECONDS,
+            API_KEY_OFFENDER_MAX_TRACKED,
+        )
+
+    def might_be_valid(self, key):
+        """False only when key is definitely not an active API key."""
+        if not API_KEY_FILTER_ENABLED:
+            return True
+        if self._thread is None:
+            self._start(current_app._get_current_object())
+
+        requested_at = time.monotonic()
+        digest = key_digest(key)
+        if self.negative_cache.get(digest):
+            metrics.inc("api_key_negative_cache_hits_total")
+            return False
+        if self._filter is None or digest in self._filter:
+            return True
+
+        confirmed = self._catch_up(requested_at)
+        if digest not in self._filter:
+            if confirmed:
+                # Repeats of the same bad key skip the catch-up
+                self.negative_cache.set(digest, True)
+            metrics.inc("api_key_filter_rejections_total")
+            return False
+        metrics.inc("api_key_filter_late_adds_total")
+        return True
+
+    def _catch_up(self, requested_at):
+        """
+        Sync unless one started recently; True if the filter now covers requested_at.
+
+        Waiting on the lock lets concurrent misses share one sync.
+        """
+        with self._sync_lock:
+            if self._synced_from >= requested_at:
+                return True
+            if requested_at - self._synced_from < API_KEY_FILTER_CATCH_UP_SECONDS:
+                metrics.inc("api_key_filter_catch_ups_skipped_total")
+                return False
+            self.sync()
+            return True
+
+    def add(self, key):
+        digest = key_digest(key)
+        self.negative_cache.pop(digest)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(digest)
+
+    def remove(self, key):
+        # Shed the deleted key in memory now; the next rebuild clears its bits
+        self.negative_cache.set(key_digest(key), True)
+        with self._lock:
+            self._deletes += 1
+
+    def record_invalid(self, key):
+        self.negative_cache.set(key_digest(key), True)
+
+    def _start(self, app):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._maintain, args=(app,), name="api-key-filter", daemon=True
+            )
+            self._thread.start()
+
+    def _maintain(self, app):
+        while True:
+            with app.app_context():
+                try:
+                    due = time.monotonic() - self._last_rebuild >= API_KEY_FILTER_REBUILD_SECONDS
+                    if self._filter is None or due or self._deletes >= API_KEY_FILTER_REBUILD_AFTER_DELETES:
+                        self.rebuild()
+                    else:
+                        self.sync()
+                except Exception as e:
+                    app.logger.error(f"API key filter refresh failed: {str(e)}")
+                finally:
+                    db.session.remove()
+            time.sleep(API_KEY_FILTER_SYNC_SECONDS)
+
+    def rebuild(self):
+        """Build a fresh filter from all active keys and swap it in."""
+        started = time.perf_counter()
+        with db.engine.connect() as conn:
+            count, watermark = conn.execute(
+                select(func.count(APIKey.id), func.max(APIKey.created_at)).where(
+                    APIKey.is_active.is_(True)
+                )
+            ).one()
+            bloom = BloomFilter(
+                max(count * 2, API_KEY_FILTER_MIN_CAPACITY), API_KEY_FILTER_ERROR_RATE
+            )
+            rows = conn.execution_options(yield_per=5000).execute(
+                select(APIKey.key).where(APIKey.is_active.is_(True))
+            )
+            for (key,) in rows:
+                bloom.add(key_digest(key))
+
+        with self._lock:
+            previous_watermark = self._watermark
+            self._filter = bloom
+            self._watermark = watermark or previous_watermark
+            self._deletes = 0
+            self._last_rebuild = time.monotonic()
+        # Keys committed while the scan ran
+        self.sync()
+
+        metrics.set_gauge("api_key_filter_keys", bloom.count)
+        metrics.observe("api_key_filter_rebuild_seconds", time.perf_counter() - started)
+
+    def sync(self):
+        """Add keys created since the last sync (with overlap)."""
+        started = time.monotonic()
+        query = select(APIKey.key, APIKey.created_at).where(APIKey.is_active.is_(True))
+        if self._watermark is not None:
+            query = query.where(APIKey.created_at > self._watermark - SYNC_OVERLAP)
+        with db.engine.connect() as conn:
+            rows = conn.execute(query).all()
+
+        with self._lock:
+            for key, created_at in rows:
+                self._filter.add(key_digest(key))
+                if created_at and (self._watermark is None or created_at > self._watermark):
+                    self._watermark = created_at
+            self._synced_from = max(self._synced_from, started)
+
+
+api_key_filter = ApiKeyFilter()
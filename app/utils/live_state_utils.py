@@ -0,0 +1,202 @@
+import datetime
+import os
+import re
+import threading
+from concurrent.futures import Future
+
+from app.utils.cache_utils import TTLCache
+from app.utils.docker_utils import (
+    CONTAINER_ID_LABEL,
+    MANAGED_LABEL,
+    DockerCallError,
+    docker_call,
+    find_docker_container,
+)
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.metrics_utils import metrics
+
+docker = lazy_import("docker")
+
+# How long an inspect (or the host-wide list) answers live reads; bounds staleness
+LIVE_STATE_TTL_SECONDS = float(os.environ.get("LIVE_STATE_TTL_SECONDS", "2"))
+LIVE_STATE_CACHE_SIZE = int(os.environ.get("LIVE_STATE_CACHE_SIZE", "5000"))
+
+# Cache key of the one host-wide list that serves every per-user list view
+INVENTORY_KEY = ("inventory",)
+
+# "Up 5 minutes (healthy)", "Up 2 seconds (health: starting)"
+_HEALTH_IN_STATUS = re.compile(r"\((?:health: )?(healthy|unhealthy|starting)\)")
+
+
+def _now():
+    return datetime.datetime.utcnow().isoformat()
+
+
+def state_from_inspect(attrs):
+    """Live fields from a full inspect (containers.get)."""
+    state = attrs.get("State") or {}
+    health = state.get("Health") or {}
+    return {
+        "state": state.get("Status"),
+        "running": bool(state.get("Running")),
+        "exit_code": state.get("ExitCode"),
+        "restart_count": attrs.get("RestartCount", 0),
+        "started_at": state.get("StartedAt"),
+        "health": health.get("Status"),
+        "checked_at": _now(),
+    }
+
+
+def state_from_list(attrs):
+    """
+    Live fields from a sparse containers.list entry.
+
+    The list API has no restart count or start time; those stay None and are
+    only filled in by a single-container inspect.
+    """
+    match = _HEALTH_IN_STATUS.search(attrs.get("Status") or "")
+    return {
+        "state": attrs.get("State"),
+        "running": attrs.get("State") == "running",
+        "exit_code": None,
+        "restart_count": None,
+        "started_at": None,
+        "health": match.group(1) if match else None,
+        "checked_at": _now(),
+    }
+
+
+def missing_state():
+    return {"state": "missing", "running": False, "checked_at": _now()}
+
+
+def error_state(error):
+    return {"state": "unknown", "running": None, "error": error.outcome, "checked_at": _now()}
+
+
+class LiveStateCache:
+    """
+    Short-TTL cache of Docker container state for live reads.
+
+    Concurrent misses for the same key share one in-flight Docker call
+    (single flight): the first caller loads, the rest wait on its result.
+    Daemon errors are cached like answers so an outage isn't hammered by
+    every dashboard poll. The cache is per process.
+    """
+
+    def __init__(self, ttl_seconds=LIVE_STATE_TTL_SECONDS, max_entries=LIVE_STATE_CACHE_SIZE):
+        self._cache = TTLCache(ttl_seconds, max_entries)
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> Future of the in-flight load
+
+    def _get(self, key, load):
+        value = self._cache.get(key)
+        if value is not None:
+            metrics.inc("live_state_cache_total", result="hit")
+            return value
+
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                metrics.inc("live_state_cache_total", result="hit")
+                return value
+            future = self._pending.get(key)
+            leader = future is None
+            if leader:
+                future = self._pending[key] = Future()
+
+        if not leader:
+            metrics.inc("live_state_cache_total", result="coalesced")
+            return future.result()
+
+        metrics.inc("live_state_cache_total", result="miss")
+        try:
+            value = load()
+            self._cache.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def inspect(self, container):
+        """Live state of one Container row from a (cached) inspect."""
+
+        def load():
+            def get_state(client):
+                try:
+                    return state_from_inspect(find_docker_container(client, container).attrs)
+                except docker.errors.NotFound:
+                    return missing_state()
+
+            try:
+                return docker_call("inspect", get_state, idempotent=True)
+            except DockerCallError as e:
+                return error_state(e)
+
+        return self._get(("container", container.id), load)
+
+    def _inventory(self):
+        """
+        {row id or docker name: live state} for every managed container on the host.
+
+        Only containers without a row id label are indexed by name: a name
+        can belong to another user's deployment.
+        """
+
+        def load():
+            def list_states(client):
+                states = {}
+                for item in client.containers.list(
+                    all=True, sparse=True, filters={"label": MANAGED_LABEL}
+                ):
+                    attrs = item.attrs
+                    state = state_from_list(attrs)
+                    row_id = (attrs.get("Labels") or {}).get(CONTAINER_ID_LABEL)
+                    if row_id:
+                        states[row_id] = state
+                        continue
+                    for name in attrs.get("Names") or []:
+                        states.setdefault(name.lstrip("/"), state)
+                return states
+
+            try:
+                return docker_call("list", list_states, idempotent=True)
+            except DockerCallError as e:
+                return e
+
+        return self._get(INVENTORY_KEY, load)
+
+    def for_containers(self, containers):
+        """
+        {row id: live state} for many rows from one batched containers.list.
+
+        Rows with a fresh single-container inspect cached use that instead,
+        since it carries the restart count and start time.
+        """
+        inventory = self._inventory()
+        states = {}
+        for container in containers:
+            cached = self._cache.get(("container", container.id))
+            if cached is not None:
+                states[container.id] = cached
+            elif isinstance(inventory, DockerCallError):
+                states[container.id] = error_state(inventory)
+            else:
+                states[container.id] = (
+                    inventory.get(container.id)
+                    or inventory.get(container.name)
+                    or missing_state()
+                )
+        return states
+
+    def invalidate(self, container_id):
+        """Forget cached state after this worker changed the container."""
+        self._cache.pop(("container", container_id))
+        self._cache.pop(INVENTORY_KEY)
+
+
+live_state = LiveStateCache()
@@ -0,0 +1,143 @@
+import atexit
+import datetime
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.usage_record import UsageRecord
+from app.utils.metrics_utils import metrics
+
+USAGE_BUCKET_SECONDS = int(os.environ.get("USAGE_BUCKET_SECONDS", "3600"))
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.environ.get("USAGE_FLUSH_INTERVAL_SECONDS", "10"))
+USAGE_GRANULARITIES = ("hour", "day", "week", "month")
+
+
+def bucket_start_for(epoch_seconds):
+    start = int(epoch_seconds) - int(epoch_seconds) % USAGE_BUCKET_SECONDS
+    return datetime.datetime.fromtimestamp(start, datetime.timezone.utc).replace(
+        tzinfo=None
+    )
+
+
+class UsageMeter:
+    """
+    In-memory request counters, flushed to usage_records in bulk.
+
+    record() is a dict increment under a lock, so the proxy auth path never
+    writes to the database. A per-process flusher thread upserts the
+    accumulated counts every USAGE_FLUSH_INTERVAL_SECONDS; counts from a
+    failed flush are merged back and retried on the next one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._app = None
+        self._flusher = None
+
+    def record(self, api_key_id, container_id, user_id):
+        bucket = int(time.time()) // USAGE_BUCKET_SECONDS
+        key = (bucket, api_key_id, container_id, user_id)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+        if self._flusher is None:
+            self._start_flusher(current_app._get_current_object())
+
+    def _start_flusher(self, app):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._app = app
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="usage-flusher", daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self._flush_in_context)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(USAGE_FLUSH_INTERVAL_SECONDS)
+            self._flush_in_context()
+
+    def _flush_in_context(self):
+        with self._app.app_context():
+            try:
+                self.flush()
+            except Exception as e:
+                self._app.logger.error(f"Usage flush failed: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def _drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return counts
+
+    def _restore(self, counts):
+        with self._lock:
+            for key, count in counts.items():
+                self._counts[key] = self._counts.get(key, 0) + count
+
+    def flush(self):
+        """Upsert all pending counts in one statement; returns rows written."""
+        counts = self._drain()
+        if not counts:
+            return 0
+
+        rows = [
+            {
+                "bucket_start": bucket_start_for(bucket * USAGE_BUCKET_SECONDS),
+                "api_key_id": api_key_id,
+                "container_id": container_id,
+                "user_id": user_id,
+                "request_count": count,
+            }
+            for (bucket, api_key_id, container_id, user_id), count in counts.items()
+        ]
+        table = UsageRecord.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_usage_records_bucket_key_container",
+            set_={"request_count": table.c.request_count + statement.excluded.request_count},
+        )
+
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(statement)
+        except Exception:
+            self._restore(counts)
+            raise
+
+        metrics.inc("usage_flush_rows_total", len(rows))
+        metrics.inc("usage_flush_requests_total", sum(counts.values()))
+        return len(rows)
+
+
+usage_meter = UsageMeter()
+
+
+def query_usage(user_id, start, end, granularity, container_id=None, api_key_id=None):
+    """Aggregate rolled-up usage rows into granularity-sized periods."""
+    period = func.date_trunc(granularity, UsageRecord.bucket_start).label("period")
+    query = db.session.query(
+        period, func.sum(UsageRecord.request_count).label("requests")
+    ).filter(
+        UsageRecord.user_id == user_id,
+        UsageRecord.bucket_start >= start,
+        UsageRecord.bucket_start < end,
+    )
+    if container_id is not None:
+        query = query.filter(UsageRecord.container_id == container_id)
+    if api_key_id is not None:
+        query = query.filter(UsageRecord.api_key_id == api_key_id)
+
+    rows = query.group_by(period).order_by(period).all()
+    return [
+        {"period_start": row.period.isoformat(), "requests": int(row.requests)}
+        for row in rows
+    ]
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.models.available_models import AvailableModel
+from app.models.catalog_version import CatalogVersion
+from app.utils.metrics_utils import metrics
+
+CATALOG_NAME = "available_models"
+# How often a worker re-reads the catalog version (one primary-key lookup)
+MODEL_CACHE_CHECK_SECONDS = float(os.environ.get("MODEL_CACHE_CHECK_SECONDS", "2"))
+
+ModelSnapshot = namedtuple(
+    "ModelSnapshot",
+    [
+        "id",
+        "name",
+        "description",
+        "docker_image",
+        "version",
+        "is_active",
+        "readiness_probe",
+        "min_replicas",
+        "max_replicas",
+        "cpu_cores",
+        "created_at",
+        "updated_at",
+    ],
+)
+
+
+def bump_catalog_version():
+    """
+    Increment the catalog version in the current session's transaction.
+
+    Call before committing any AvailableModel create/update/delete, so the
+    new version becomes visible together with the change.
+    """
+    table = CatalogVersion.__table__
+    statement = insert(table).values(name=CATALOG_NAME, version=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.name], set_={"version": table.c.version + 1}
+    )
+    db.session.execute(statement)
+
+
+class ModelCache:
+    """
+    Process-local, read-only snapshot of the available_models catalog.
+
+    The whole catalog is reloaded when the DB version moves; the version is
+    checked at most every MODEL_CACHE_CHECK_SECONDS, which bounds how stale
+    another worker's edits can be here. Edits in this worker invalidate it
+    immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+        self._version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = 0.0
+            self._version = None
+
+    def _current_version(self):
+        with db.engine.connect() as conn:
+            return conn.execute(
+                select(CatalogVersion.version).where(CatalogVersion.name == CATALOG_NAME)
+            ).scalar() or 0
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < MODEL_CACHE_CHECK_SECONDS:
+            return
+        with self._lock:
+            if now - self._checked_at < MODEL_CACHE_CHECK_SECONDS:
+                return
+            version = self._current_version()
+            if version != self._version:
+                columns = [getattr(AvailableModel, field) for field in ModelSnapshot._fields]
+                with db.engine.connect() as conn:
+                    rows = conn.execute(select(*columns)).all()
+                self._models = {row.id: ModelSnapshot(*row) for row in rows}
+                self._version = version
+                metrics.inc("model_cache_reloads_total")
+            self._checked_at = time.monotonic()
+
+    def get(self, model_id):
+        """ModelSnapshot for model_id, or None if it doesn't exist."""
+        self._refresh()
+        model = self._models.get(model_id)
+        if model is None:
+            metrics.inc("model_cache_misses_total")
+        return model
+
+
+model_cache = ModelCache()
@@ -0,0 +1,98 @@
+import base64
+import datetime
+import json
+import os
+import re
+
+from sqlalchemy import func, tuple_
+
+from app.models.available_models import AvailableModel
+from app.utils.timing_utils import timed
+
+MODEL_SEARCH_DEFAULT_LIMIT = int(os.environ.get("MODEL_SEARCH_DEFAULT_LIMIT", "100"))
+MODEL_SEARCH_MAX_LIMIT = int(os.environ.get("MODEL_SEARCH_MAX_LIMIT", "500"))
+MODEL_SORT_KEYS = ("name", "-name", "created_at", "-created_at")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def build_search_query(text):
+    """
+    Turn free text into a prefix-matching tsquery string.
+
+    Tokens are split on non-alphanumerics the same way search_vector is
+    built, so "llama-3.1" matches "llama:* & 3:* & 1:*". Returns None when
+    the text has no searchable tokens.
+    """
+    tokens = re.findall(r"[^\W_]+", text.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def encode_cursor(sort_value, model_id):
+    if isinstance(sort_value, datetime.datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, model_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort_field):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, model_id = json.loads(raw)
+        if sort_field == "created_at":
+            sort_value = datetime.datetime.fromisoformat(sort_value)
+        return sort_value, int(model_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+@timed()
+def search_models(q=None, is_active=None, sort="name", limit=None, cursor=None, paginate=True):
+    """
+    Keyset-paginated catalog search.
+
+    Returns (models, next_cursor). next_cursor is None on the last page.
+    With paginate=False (and no cursor) every match is returned in one page.
+    Text search goes through the GIN-indexed search_vector column; ordering
+    is (sort column, id) so pages are stable under concurrent inserts.
+    """
+    descending = sort.startswith("-")
+    sort_field = sort.lstrip("-")
+    column = getattr(AvailableModel, sort_field)
+    limit = min(limit or MODEL_SEARCH_DEFAULT_LIMIT, MODEL_SEARCH_MAX_LIMIT)
+
+    query = AvailableModel.query
+    if q:
+        tsquery = build_search_query(q)
+        if tsquery is None:
+            return [], None
+        query = query.filter(
+            AvailableModel.search_vector.op("@@")(func.to_tsquery("simple", tsquery))
+        )
+    if is_active is not None:
+        query = query.filter(AvailableModel.is_active == is_active)
+
+    if cursor:
+        after = tuple_(column, AvailableModel.id)
+        position = tuple_(*decode_cursor(cursor, sort_field))
+        query = query.filter(after < position if descending else after > position)
+
+    if descending:
+        query = query.order_by(column.desc(), AvailableModel.id.desc())
+    else:
+        query = query.order_by(column.asc(), AvailableModel.id.asc())
+
+    if not paginate:
+        return query.all(), None
+
+    # One extra row tells us whether there is another page
+    models = query.limit(limit + 1).all()
+    if len(models) <= limit:
+        return models, None
+    models = models[:limit]
+    last = models[-1]
+    return models, encode_cursor(getattr(last, sort_field), last.id)
@@ -0,0 +1,201 @@
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+
+from app.utils.metrics_utils import metrics
+
+# Nothing is registered unless this is set, so a disabled profiler costs nothing
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+# Secret for X-Profile-Token headers; header-triggered profiling is off without it
+PROFILING_SECRET = os.environ.get("PROFILING_SECRET")
+# Fraction of eligible requests profiled without a header (0 disables sampling)
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+# Comma-separated endpoints eligible for sampling, e.g. "deploy.make_container"
+PROFILING_ROUTES = {
+    r.strip() for r in os.environ.get("PROFILING_ROUTES", "").split(",") if r.strip()
+}
+PROFILING_INTERVAL_SECONDS = float(os.environ.get("PROFILING_INTERVAL_MS", "5")) / 1000
+PROFILING_DIR = os.environ.get("PROFILING_DIR", "/tmp/profiles")
+# Oldest profiles are deleted once the directory holds more than this
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", "200"))
+
+PROFILE_ID_PATTERN = re.compile(r"^[\w.-]+\.folded$")
+
+
+def sign_profile_token(expires_at):
+    """X-Profile-Token value valid until expires_at (epoch seconds)."""
+    expires_at = int(expires_at)
+    signature = hmac.new(
+        PROFILING_SECRET.encode(), str(expires_at).encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{expires_at}:{signature}"
+
+
+def verify_profile_token(token):
+    if not PROFILING_SECRET or not token or ":" not in token:
+        return False
+    expires_at, _ = token.split(":", 1)
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(token, sign_profile_token(expires_at))
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """
+    Samples one thread's stack on a timer and counts collapsed stacks.
+
+    Output is Brendan Gregg's folded format ("root;child;leaf count"), which
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, thread_id, interval=PROFILING_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def _should_profile():
+    if verify_profile_token(request.headers.get("X-Profile-Token")):
+        return True
+    if PROFILING_SAMPLE_RATE <= 0:
+        return False
+    if PROFILING_ROUTES and request.endpoint not in PROFILING_ROUTES:
+        return False
+    return random.random() < PROFILING_SAMPLE_RATE
+
+
+def _start_profile():
+    if not _should_profile():
+        return
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    g.profiler = sampler
+
+
+def _finish_profile(response):
+    sampler = g.pop("profiler", None)
+    if sampler is None:
+        return response
+    sampler.stop()
+    profile_id = write_profile(sampler, request.endpoint or "unmatched")
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+def _abandon_profile(exc=None):
+    # after_request doesn't run on unhandled errors; don't leak the sampler
+    sampler = g.pop("profiler", None)
+    if sampler is not None:
+        sampler.stop()
+
+
+def write_profile(sampler, endpoint):
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    profile_id = (
+        f"{int(time.time() * 1000)}_{endpoint}_{int(sampler.duration * 1000)}ms_"
+        f"{uuid.uuid4().hex[:8]}.folded"
+    )
+    path = os.path.join(PROFILING_DIR, profile_id)
+    with open(f"{path}.tmp", "w") as f:
+        f.write(sampler.folded())
+    os.replace(f"{path}.tmp", path)
+    metrics.inc("profiles_written_total", endpoint=endpoint)
+    _enforce_retention()
+    return profile_id
+
+
+def _enforce_retention():
+    profiles = list_profiles()
+    for profile in profiles[PROFILING_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILING_DIR, profile["id"]))
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles():
+    """Stored profiles, newest first."""
+    try:
+        names = [n for n in os.listdir(PROFILING_DIR) if PROFILE_ID_PATTERN.match(n)]
+    except FileNotFoundError:
+        return []
+
+    profiles = []
+    for name in names:
+        created_ms, rest = name.split("_", 1)
+        endpoint, duration, _ = rest.rsplit("_", 2)
+        try:
+            size = os.path.getsize(os.path.join(PROFILING_DIR, name))
+        except FileNotFoundError:
+            continue
+        profiles.append(
+            {
+                "id": name,
+                "endpoint": endpoint,
+                "duration_ms": int(duration[:-2]),
+                "created_at": int(created_ms) / 1000,
+                "size_bytes": size,
+            }
+        )
+    profiles.sort(key=lambda p: p["created_at"], reverse=True)
+    return profiles
+
+
+def profile_path(profile_id):
+    """Filesystem path for a stored profile id, or None if it isn't one."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(PROFILING_DIR, profile_id)
+    return path if os.path.isfile(path) else None
+
+
+def init_profiling(app):
+    if not PROFILING_ENABLED:
+        return
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
+    app.logger.info(
+        f"Profiling enabled (sample rate {PROFILING_SAMPLE_RATE}, "
+        f"header {'on' if PROFILING_SECRET else 'off'}, dir {PROFILING_DIR})"
+    )
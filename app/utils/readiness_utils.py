@@ -0,0 +1,282 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from app import db
+from app.models.container import Container, ContainerStatus
+from app.utils.events_utils import publish_status
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.reverse_proxy_utils import routing_publisher
+
+docker = lazy_import("docker")
+
+PROBE_TYPES = ("http", "tcp", "docker")
+READINESS_DEFAULT_TIMEOUT = float(os.environ.get("READINESS_DEFAULT_TIMEOUT", "120"))
+READINESS_INITIAL_BACKOFF = float(os.environ.get("READINESS_INITIAL_BACKOFF", "0.25"))
+READINESS_MAX_BACKOFF = float(os.environ.get("READINESS_MAX_BACKOFF", "5"))
+READINESS_ATTEMPT_TIMEOUT = float(os.environ.get("READINESS_ATTEMPT_TIMEOUT", "2"))
+# Upper bound for a single long-poll on /container/<id>/ready
+READINESS_MAX_WAIT = float(os.environ.get("READINESS_MAX_WAIT", "60"))
+"""
+How the platform reaches a container:
+- "container": <docker name>:<container port> over the shared Docker network
+- "host":      READINESS_PROBE_HOST:<host port> (e.g. when running outside Docker)
+"""
+READINESS_PROBE_ADDRESSING = os.environ.get("READINESS_PROBE_ADDRESSING", "container")
+READINESS_PROBE_HOST = os.environ.get("READINESS_PROBE_HOST", "127.0.0.1")
+
+
+def validate_readiness_probe(probe):
+    """Return an error message for an invalid probe spec, or None."""
+    if probe is None:
+        return None
+    if not isinstance(probe, dict):
+        return "'readiness_probe' must be an object"
+    if probe.get("type") not in PROBE_TYPES:
+        return f"'readiness_probe.type' must be one of {', '.join(PROBE_TYPES)}"
+    if probe["type"] == "http" and not str(probe.get("path", "/")).startswith("/"):
+        return "'readiness_probe.path' must start with '/'"
+    for field in ("port", "timeout_seconds"):
+        value = probe.get(field)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            return f"'readiness_probe.{field}' must be a positive number"
+    return None
+
+
+def new_readiness_token():
+    """Token for one start attempt; store it on the row with the PENDING status."""
+    return str(uuid.uuid4())
+
+
+def build_probe_target(probe, docker_name, port_mappings):
+    """Resolve a model's probe spec against a deployed container's ports."""
+    if not port_mappings:
+        mapping = {}
+    else:
+        mapping = next(
+            (
+                m
+                for m in port_mappings
+                if probe.get("port") and int(m["container_port"]) == int(probe["port"])
+            ),
+            port_mappings[0],
+        )
+
+    if READINESS_PROBE_ADDRESSING == "host":
+        host, port = READINESS_PROBE_HOST, mapping.get("host_port")
+    else:
+        host, port = docker_name, probe.get("port") or mapping.get("container_port")
+
+    return {
+        "type": probe["type"],
+        "host": host,
+        "port": int(port) if port else None,
+        "path": probe.get("path", "/"),
+        "docker_name": docker_name,
+        "timeout_seconds": float(probe.get("timeout_seconds", READINESS_DEFAULT_TIMEOUT)),
+    }
+
+
+async def _probe_tcp(target):
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(target["host"], target["port"]),
+        READINESS_ATTEMPT_TIMEOUT,
+    )
+    writer.close()
+    return True
+
+
+async def _probe_http(target):
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(target["host"], target["port"]),
+        READINESS_ATTEMPT_TIMEOUT,
+    )
+    try:
+        writer.write(
+            f"GET {target['path']} HTTP/1.0\r\nHost: {target['host']}\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), READINESS_ATTEMPT_TIMEOUT)
+    finally:
+        writer.close()
+    parts = status_line.split()
+    return len(parts) >= 2 and parts[1][:1] in (b"2", b"3")
+
+
+def _docker_health(docker_name):
+    client = docker.from_env(timeout=int(READINESS_ATTEMPT_TIMEOUT) + 1)
+    state = client.api.inspect_container(docker_name)["State"]
+    health = state.get("Health")
+    if health is None:
+        # No HEALTHCHECK in the image; fall back to "is it running"
+        return state.get("Running", False)
+    return health.get("Status") == "healthy"
+
+
+class ReadinessPoller:
+    """
+    Shared asyncio loop that polls readiness probes for newly started containers.
+
+    Each probe retries with exponential backoff until it passes or its deadline
+    expires, then flips the container from PENDING to RUNNING or FAILED.
+    Threads long-polling on a container are woken as soon as it settles.
+
+    Each probe carries the readiness token of the start it checks, and only
+    settles the row while that token is still current: a probe left over
+    from an earlier start (stopped and started again, in any worker) can't
+    settle the new one.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+        self._events = {}
+        self._tokens = {}  # container_id -> token of this worker's latest probe
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._loop.run_forever, name="readiness-poller", daemon=True
+                )
+                thread.start()
+            return self._loop
+
+    def event_for(self, container_id):
+        with self._lock:
+            return self._events.setdefault(container_id, threading.Event())
+
+    def wait(self, container_id, timeout):
+        """Sleep up to timeout, waking early if this worker settles the probe."""
+        with self._lock:
+            event = self._events.get(container_id)
+        if event is not None:
+            event.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def submit(self, app, container_id, target, token):
+        self.event_for(container_id)
+        with self._lock:
+            self._tokens[container_id] = token
+        asyncio.run_coroutine_threadsafe(
+            self._poll(app, container_id, target, token), self._ensure_loop()
+        )
+
+    async def _attempt(self, target):
+        try:
+            if target["type"] == "tcp":
+                return await _probe_tcp(target)
+            if target["type"] == "http":
+                return await _probe_http(target)
+            return await asyncio.get_running_loop().run_in_executor(
+                None, _docker_health, target["docker_name"]
+            )
+        except Exception:
+            return False
+
+    async def _wait_ready(self, target):
+        """Retry the probe with backoff until it passes (True) or times out (False)."""
+        deadline = time.monotonic() + target["timeout_seconds"]
+        backoff = READINESS_INITIAL_BACKOFF
+
+        while True:
+            if await self._attempt(target):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(backoff, remaining))
+            backoff = min(backoff * 2, READINESS_MAX_BACKOFF)
+
+    def probe(self, target):
+        """Blocking _wait_ready for callers that don't track a Container row."""
+        return asyncio.run_coroutine_threadsafe(
+            self._wait_ready(target), self._ensure_loop()
+        ).result()
+
+    async def _poll(self, app, container_id, target, token):
+        ready = await self._wait_ready(target)
+        status = ContainerStatus.RUNNING if ready else ContainerStatus.FAILED
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._settle, app, container_id, status, token
+        )
+
+    def _settle(self, app, container_id, status, token):
+        with app.app_context():
+            try:
+                with db.engine.begin() as conn:
+                    user_id = conn.execute(
+                        update(Container.__table__)
+                        .where(
+                            Container.id == container_id,
+                            Container.status == ContainerStatus.PENDING,
+                            Container.readiness_token == token,
+                        )
+                        .values(status=status, readiness_token=None)
+                        .returning(Container.user_id)
+                    ).scalar()
+                if user_id is not None:
+                    publish_status(user_id, container_id, status)
+                    log = (
+                        app.logger.info if status == ContainerStatus.RUNNING else app.logger.warning
+                    )
+                    log(f"Container {container_id} readiness settled: {status.value}")
+                    if status == ContainerStatus.RUNNING:
+                        routing_publisher.schedule(app)
+                else:
+                    app.logger.info(
+                        f"Discarding stale readiness result for {container_id}: {status.value}"
+                    )
+            except Exception as e:
+                app.logger.error(f"Failed to record readiness for {container_id}: {str(e)}")
+
+        with self._lock:
+            if self._tokens.get(container_id) != token:
+                # A newer probe in this worker owns the waiters
+                return
+            del self._tokens[container_id]
+            event = self._events.pop(container_id, None)
+        if event is not None:
+            event.set()
+
+
+readiness_poller = ReadinessPoller()
+
+
+def get_container_status(container_id):
+    with db.engine.connect() as conn:
+        return conn.execute(
+            select(Container.status).where(Container.id == container_id)
+        ).scalar()
+
+
+def wait_for_readiness(container_id, timeout):
+    """
+    Block until the container leaves PENDING or the timeout expires.
+
+    Wakes immediately when the probe ran in this worker; otherwise re-reads
+    the status about once a second. Returns the latest status.
+    """
+    deadline = time.monotonic() + min(timeout, READINESS_MAX_WAIT)
+    while True:
+        status = get_container_status(container_id)
+        remaining = deadline - time.monotonic()
+        if status != ContainerStatus.PENDING or remaining <= 0:
+            return status
+        readiness_poller.wait(container_id, min(1.0, remaining))
+
+
+def start_readiness_probe(container_id, probe, docker_name, port_mappings, token):
+    """Probe a PENDING container whose row carries readiness_token == token."""
+    target = build_probe_target(probe, docker_name, port_mappings)
+    current_app.logger.info(
+        f"Probing readiness of {container_id} ({target['type']} {target['host']}:{target['port']})"
+    )
+    readiness_poller.submit(current_app._get_current_object(), container_id, target, token)
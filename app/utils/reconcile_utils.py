@@ -0,0 +1,208 @@
+import os
+import time
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import func, select, text, update
+
+from app import db
+from app.models.container import Container, ContainerStatus
+from app.models.stack import Stack
+from app.utils.docker_utils import CONTAINER_ID_LABEL, MANAGED_LABEL
+from app.utils.events_utils import publish_stack_status, publish_status
+from app.utils.lazy_import_utils import lazy_import
+from app.utils.metrics_utils import metrics
+from app.utils.reverse_proxy_utils import routing_publisher
+from app.utils.stack_utils import STACK_STALE_SECONDS
+
+docker = lazy_import("docker")
+
+RECONCILE_INTERVAL_SECONDS = int(os.environ.get("RECONCILE_INTERVAL_SECONDS", "900"))
+# Rows and containers younger than this are skipped: a deploy saves its row
+# before containers.run, so the two briefly disagree
+RECONCILE_GRACE_SECONDS = int(os.environ.get("RECONCILE_GRACE_SECONDS", "300"))
+RECONCILE_BATCH_SIZE = int(os.environ.get("RECONCILE_BATCH_SIZE", "1000"))
+
+# Rows claiming a Docker container should exist
+LIVE_STATUSES = (ContainerStatus.RUNNING, ContainerStatus.PAUSED, ContainerStatus.PENDING)
+
+
+def managed_labels(container_id):
+    return {MANAGED_LABEL: "true", CONTAINER_ID_LABEL: container_id}
+
+
+def _docker_inventory(client, cutoff_epoch):
+    """
+    One sparse containers.list(all=True) (no per-container inspect).
+
+    Returns ({row id: [docker ids]} for labelled containers created before
+    cutoff_epoch, set of row ids of all labelled containers, set of
+    unlabelled names). A row has several Docker containers when it runs
+    replicas, which carry the primary's row id label.
+    Unlabelled containers predate the labels; they are matched by name and
+    never removed.
+    """
+    labelled, labelled_any, unlabelled_names = defaultdict(list), set(), set()
+    for item in client.containers.list(all=True, sparse=True):
+        attrs = item.attrs
+        labels = attrs.get("Labels") or {}
+        row_id = labels.get(CONTAINER_ID_LABEL)
+        if labels.get(MANAGED_LABEL) == "true" and row_id:
+            labelled_any.add(row_id)
+            if attrs.get("Created", 0) < cutoff_epoch:
+                labelled[row_id].append(attrs["Id"])
+        else:
+            unlabelled_names.update(name.lstrip("/") for name in attrs.get("Names") or [])
+    return labelled, labelled_any, unlabelled_names
+
+
+# Drop host_port from every mapping; reuse_ports assigns new ones on restart
+_RELEASE_PORTS = text(
+    "(SELECT jsonb_agg(mapping - 'host_port') FROM jsonb_array_elements(containers.ports) AS mapping)"
+)
+
+
+def _mark_missing(ids):
+    with db.engine.begin() as conn:
+        rows = conn.execute(
+            update(Container.__table__)
+            .where(Container.id.in_(ids), Container.status.in_(LIVE_STATUSES))
+            .values(
+                status=ContainerStatus.FAILED,
+                ports=func.coalesce(_RELEASE_PORTS, Container.ports),
+                # Pinned cores go back to the pool too
+                cpuset=None,
+                cpuset_mems=None,
+            )
+            .returning(Container.id, Container.user_id)
+        ).all()
+    for container_id, user_id in rows:
+        publish_status(user_id, container_id, ContainerStatus.FAILED)
+    return len(rows)
+
+
+def fail_stale_stacks(stack_id=None):
+    """
+    Mark PENDING stacks whose orchestration stopped heartbeating as FAILED.
+
+    That happens when the worker running the orchestration thread dies
+    mid-deploy. Their still-PENDING services are failed too, so the stack
+    can be started or deleted again. Limited to stack_id when given;
+    returns the ids of the stacks failed.
+    """
+    stale = Stack.status == ContainerStatus.PENDING
+    stale &= Stack.heartbeat_at.is_(None) | (
+        Stack.heartbeat_at
+        < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, STACK_STALE_SECONDS)
+    )
+    if stack_id is not None:
+        stale &= Stack.id == stack_id
+
+    with db.engine.begin() as conn:
+        stacks = conn.execute(
+            update(Stack.__table__)
+            .where(stale)
+            .values(status=ContainerStatus.FAILED)
+            .returning(Stack.id, Stack.user_id)
+        ).all()
+        if not stacks:
+            return []
+        services = conn.execute(
+            update(Container.__table__)
+            .where(
+                Container.stack_id.in_([row.id for row in stacks]),
+                Container.status == ContainerStatus.PENDING,
+            )
+            .values(status=ContainerStatus.FAILED)
+            .returning(Container.id, Container.user_id)
+        ).all()
+
+    for container_id, user_id in services:
+        publish_status(user_id, container_id, ContainerStatus.FAILED)
+    for failed_id, user_id in stacks:
+        publish_stack_status(user_id, failed_id, ContainerStatus.FAILED)
+    metrics.inc("stacks_orchestration_stale_total", len(stacks))
+    return [row.id for row in stacks]
+
+
+def reconcile_containers(client=None, dry_run=False):
+    """
+    Bring Docker and the Container table back in line.
+
+    - Managed Docker containers without a Container row are removed.
+    - Live rows (RUNNING/PAUSED/PENDING) without a Docker container are
+      marked FAILED and their host ports released.
+    - Stacks left PENDING by a dead orchestration are marked FAILED.
+
+    The DB side is streamed in batches, so memory is bounded by the Docker
+    inventory (ids only) plus one batch. Returns a report dict.
+    """
+    client = client or docker.from_env(timeout=120)
+    labelled, labelled_any, unlabelled_names = _docker_inventory(
+        client, time.time() - RECONCILE_GRACE_SECONDS
+    )
+    report = {
+        "dry_run": dry_run,
+        "removed": [],
+        "marked_failed": 0,
+        "missing": [],
+        "stale_stacks": [] if dry_run else fail_stale_stacks(),
+    }
+
+    with db.engine.connect() as conn:
+        rows = conn.execution_options(yield_per=RECONCILE_BATCH_SIZE).execute(
+            select(
+                Container.id,
+                Container.name,
+                Container.status,
+                # Compared in the database so its clock and timezone apply
+                (
+                    Container.created_at
+                    < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, RECONCILE_GRACE_SECONDS)
+                ).label("settled"),
+            )
+        )
+        for partition in rows.partitions():
+            missing = []
+            for row_id, name, status, settled in partition:
+                labelled.pop(row_id, None)
+                if (
+                    status in LIVE_STATUSES
+                    and settled
+                    and row_id not in labelled_any
+                    and name not in unlabelled_names
+                ):
+                    missing.append(row_id)
+            if missing:
+                report["missing"].extend(missing)
+                if not dry_run:
+                    report["marked_failed"] += _mark_missing(missing)
+
+    # Whatever is left has no row; remove the primary and every replica
+    for row_id, docker_ids in labelled.items():
+        for docker_id in docker_ids:
+            if not dry_run:
+                try:
+                    client.api.remove_container(docker_id, force=True)
+                except docker.errors.NotFound:
+                    continue
+                except docker.errors.APIError as e:
+                    current_app.logger.warning(
+                        f"Failed to remove orphan {docker_id[:12]}: {str(e)}"
+                    )
+                    continue
+            report["removed"].append({"container_id": row_id, "docker_id": docker_id})
+
+    if not dry_run:
+        metrics.inc("reconcile_runs_total")
+        metrics.inc("reconcile_orphans_removed_total", len(report["removed"]))
+        metrics.inc("reconcile_rows_failed_total", report["marked_failed"])
+        if report["marked_failed"]:
+            routing_publisher.schedule(current_app._get_current_object())
+
+    current_app.logger.info(
+        f"Reconcile removed {len(report['removed'])} orphan containers, "
+        f"marked {report['marked_failed']} missing rows FAILED, "
+        f"failed {len(report['stale_stacks'])} stale stack deploys"
+    )
+    return report
@@ -1 +1,309 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from flask import current_app
+
+from app import db
+from app.models.container import Container, ContainerStatus
+from app.utils.lazy_import_utils import lazy_import
+
+requests = lazy_import("requests")
+
 CADDY_API_URL = os.environ.get("CADDY_API_URL")
+
+"""
+Routing modes:
+- "labels": Traefik labels are baked into each container at run time (default)
+- "file":   a Traefik file-provider config is generated from the Container table
+- "api":    route diffs are pushed to the Caddy admin API at CADDY_API_URL
+"""
+ROUTING_MODE = os.environ.get("ROUTING_MODE", "labels")
+ROUTING_CONFIG_PATH = os.environ.get(
+    "ROUTING_CONFIG_PATH", "/etc/traefik/dynamic/containers.yml"
+)
+ROUTING_MIDDLEWARES = [
+    m.strip()
+    for m in os.environ.get(
+        "ROUTING_MIDDLEWARES", "api-key-auth@docker,rate-limit@docker"
+    ).split(",")
+    if m.strip()
+]
+ROUTING_CADDY_SERVER = os.environ.get("ROUTING_CADDY_SERVER", "srv0")
+ROUTING_AUTH_DIAL = os.environ.get("ROUTING_AUTH_DIAL")  # e.g. "flask-app:5001"
+ROUTING_DEBOUNCE_SECONDS = float(os.environ.get("ROUTING_DEBOUNCE_SECONDS", "2"))
+ROUTING_MAX_DELAY_SECONDS = float(os.environ.get("ROUTING_MAX_DELAY_SECONDS", "10"))
+
+
+def uses_generated_routing():
+    return ROUTING_MODE in ("file", "api")
+
+
+# Every router (and Caddy route @id) this app generates starts with this
+ROUTER_NAME_PREFIX = "user-"
+
+
+def router_name_for(user_id, container_id):
+    return f"{ROUTER_NAME_PREFIX}{user_id}-{container_id}"
+
+
+def replica_name(name, index):
+    """Docker name of a deployment's replica; index 0 is the primary container."""
+    return name if index == 0 else f"{name}-r{index}"
+
+
+def build_traefik_labels(router_name, host, container_port):
+    """Labels for a container; routing is left to the generated config if enabled."""
+    if uses_generated_routing():
+        return {"traefik.enable": "false"}
+
+    return {
+        "traefik.enable": "true",
+        f"traefik.http.routers.{router_name}.rule": f'Host("{host}")',
+        f"traefik.http.routers.{router_name}.entrypoints": "websecure",
+        f"traefik.http.routers.{router_name}.tls.certresolver": "myresolver",
+        f"traefik.http.services.{router_name}.loadbalancer.server.port": str(
+            container_port
+        ),
+        f"traefik.http.routers.{router_name}.middlewares": "api-key-auth",
+        f"traefik.http.routers.{router_name}.middlewares": "rate-limit",
+    }
+
+
+def build_route_map():
+    """
+    Build the full host-to-service map from the Container table.
+
+    Returns {router_name: {"host": ..., "upstreams": ["name:port", ...]}} for
+    every running container that has a stored host and a port mapping.
+    """
+    rows = (
+        db.session.query(
+            Container.id,
+            Container.user_id,
+            Container.name,
+            Container.ports,
+            Container.config,
+            Container.replicas,
+        )
+        .filter(Container.status == ContainerStatus.RUNNING)
+        .all()
+    )
+
+    routes = {}
+    for container_id, user_id, name, ports, config, replicas in rows:
+        host = (config or {}).get("host")
+        if not host or not ports or not name:
+            continue
+        container_port = ports[0].get("container_port")
+        routes[router_name_for(user_id, container_id)] = {
+            "host": host,
+            "upstreams": [
+                f"{replica_name(name, i)}:{container_port}" for i in range(replicas or 1)
+            ],
+        }
+    return routes
+
+
+def diff_route_maps(old_routes, new_routes):
+    """Return (upserts, removals) needed to turn old_routes into new_routes."""
+    upserts = {
+        name: route
+        for name, route in new_routes.items()
+        if old_routes.get(name) != route
+    }
+    removals = [name for name in old_routes if name not in new_routes]
+    return upserts, removals
+
+
+def render_traefik_file_config(routes):
+    routers = {}
+    services = {}
+    for name, route in sorted(routes.items()):
+        routers[name] = {
+            "rule": f"Host(`{route['host']}`)",
+            "entryPoints": ["websecure"],
+            "tls": {"certResolver": "myresolver"},
+            "middlewares": ROUTING_MIDDLEWARES,
+            "service": name,
+        }
+        services[name] = {
+            "loadBalancer": {
+                "servers": [{"url": f"http://{u}"} for u in route["upstreams"]]
+            }
+        }
+    return {"http": {"routers": routers, "services": services}}
+
+
+def write_file_provider_config(routes, path=ROUTING_CONFIG_PATH):
+    """
+    Atomically replace the Traefik file-provider config.
+
+    JSON is valid YAML, so Traefik reads the file as-is. The config is written
+    to a temp file in the same directory and renamed over the old one so the
+    file watcher never sees a partial write.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".routing-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(render_traefik_file_config(routes), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def render_caddy_route(name, route):
+    handlers = []
+    if ROUTING_AUTH_DIAL:
+        # Equivalent of Caddy's forward_auth directive pointing at /validate
+        handlers.append(
+            {
+                "handler": "reverse_proxy",
+                "upstreams": [{"dial": ROUTING_AUTH_DIAL}],
+                "rewrite": {"method": "POST", "uri": "/api/api-keys/validate"},
+                "handle_response": [
+                    {"match": {"status_code": [2]}, "routes": [{"handle": []}]}
+                ],
+            }
+        )
+    handlers.append(
+        {
+            "handler": "reverse_proxy",
+            "upstreams": [{"dial": u} for u in route["upstreams"]],
+        }
+    )
+    return {"@id": name, "match": [{"host": [route["host"]]}], "handle": handlers}
+
+
+def caddy_routes_url(api_url=CADDY_API_URL):
+    return f"{api_url}/config/apps/http/servers/{ROUTING_CADDY_SERVER}/routes"
+
+
+def fetch_caddy_routes(api_url=CADDY_API_URL):
+    """
+    Routes this app manages that the Caddy server currently serves.
+
+    Returns {router_name: route} for every route whose @id is one of our
+    router names. A route whose config isn't exactly what we would render
+    for it (hand-edited, or rendered with other settings) maps to None, so
+    the next diff re-pushes it.
+    """
+    response = requests.get(caddy_routes_url(api_url), timeout=5)
+    if response.status_code == 404:
+        # Server has no routes yet
+        return {}
+    response.raise_for_status()
+
+    current = {}
+    for raw in response.json() or []:
+        name = raw.get("@id") if isinstance(raw, dict) else None
+        if not name or not name.startswith(ROUTER_NAME_PREFIX):
+            continue
+        try:
+            route = {
+                "host": raw["match"][0]["host"][0],
+                "upstreams": [u["dial"] for u in raw["handle"][-1]["upstreams"]],
+            }
+        except (KeyError, IndexError, TypeError):
+            route = None
+        if route is not None and render_caddy_route(name, route) != raw:
+            route = None
+        current[name] = route
+    return current
+
+
+def push_route_diff(upserts, removals, api_url=CADDY_API_URL):
+    """Apply a route diff through the Caddy admin API, one call per changed route."""
+    routes_url = caddy_routes_url(api_url)
+
+    for name, route in upserts.items():
+        body = render_caddy_route(name, route)
+        response = requests.patch(f"{api_url}/id/{name}", json=body, timeout=5)
+        if not response.ok:
+            # Route not known to the proxy yet; append it
+            response = requests.post(routes_url, json=body, timeout=5)
+        response.raise_for_status()
+
+    for name in removals:
+        response = requests.delete(f"{api_url}/id/{name}", timeout=5)
+        if response.status_code not in (200, 404):
+            response.raise_for_status()
+
+
+class RoutingConfigPublisher:
+    """
+    Debounces routing syncs across many deploys.
+
+    Every lifecycle change calls schedule(); the actual sync runs once the
+    changes have been quiet for ROUTING_DEBOUNCE_SECONDS, and never later than
+    ROUTING_MAX_DELAY_SECONDS after the first pending change.
+
+    In api mode every sync diffs against the routes Caddy is serving right
+    then, not against what this process last pushed: a route pushed by
+    another worker, or left behind while no worker was running, is still
+    deleted once its container is gone.
+    """
+
+    def __init__(self, debounce=ROUTING_DEBOUNCE_SECONDS, max_delay=ROUTING_MAX_DELAY_SECONDS):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._timer = None
+        self._first_pending = None
+
+    def schedule(self, app):
+        if not uses_generated_routing():
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._first_pending is None:
+                self._first_pending = now
+            delay = min(self.debounce, self.max_delay - (now - self._first_pending))
+
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(max(delay, 0), self._run, args=(app,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self, app):
+        with self._lock:
+            self._timer = None
+            self._first_pending = None
+
+        with app.app_context():
+            try:
+                self.sync()
+            except Exception as e:
+                current_app.logger.error(f"Routing config sync failed: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def sync(self):
+        with self._sync_lock:
+            routes = build_route_map()
+
+            if ROUTING_MODE == "file":
+                write_file_provider_config(routes)
+                current_app.logger.info(
+                    f"Wrote routing config with {len(routes)} routes"
+                )
+            elif ROUTING_MODE == "api":
+                upserts, removals = diff_route_maps(fetch_caddy_routes(), routes)
+                push_route_diff(upserts, removals)
+                current_app.logger.info(
+                    f"Pushed routing diff: {len(upserts)} upserts, {len(removals)} removals"
+                )
+
+
+routing_publisher = RoutingConfigPublisher()
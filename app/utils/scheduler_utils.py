@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+import zlib
+
+from sqlalchemy import text
+
+from app import db
+
+# Only processes started with BACKGROUND_JOBS=true run periodic jobs
+BACKGROUND_JOBS = os.environ.get("BACKGROUND_JOBS", "false").lower() == "true"
+
+_jobs = {}
+
+
+def run_exclusive(app, name, fn):
+    """
+    Run fn in an app context while holding a Postgres advisory lock for name.
+
+    Jobs are scheduled in every process with BACKGROUND_JOBS=true; the lock
+    makes sure only one of them does the work at a time. Returns fn's result,
+    or None if another process holds the lock.
+    """
+    lock_id = zlib.crc32(f"job:{name}".encode())
+    with app.app_context():
+        try:
+            with db.engine.connect() as conn:
+                acquired = conn.execute(
+                    text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}
+                ).scalar()
+                if not acquired:
+                    app.logger.debug(f"Job {name} is running elsewhere; skipping")
+                    return None
+                try:
+                    return fn()
+                finally:
+                    conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+        finally:
+            db.session.remove()
+
+
+def schedule_periodic(app, name, interval_seconds, fn):
+    """Run fn every interval_seconds on a daemon thread (once per process)."""
+    if name in _jobs or interval_seconds <= 0:
+        return
+
+    def loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                run_exclusive(app, name, fn)
+            except Exception as e:
+                app.logger.error(f"Background job {name} failed: {str(e)}")
+
+    thread = threading.Thread(target=loop, name=f"job-{name}", daemon=True)
+    _jobs[name] = thread
+    thread.start()
+    app.logger.info(f"Scheduled background job {name} every {interval_seconds}s")
+
+
+def start_background_jobs(app):
+    if not BACKGROUND_JOBS:
+        return
+
+    from .image_gc_utils import IMAGE_GC_INTERVAL_SECONDS, collect_images
+
+    from .reconcile_utils import RECONCILE_INTERVAL_SECONDS, reconcile_containers
+    from .api_key_utils import API_KEY_SWEEP_INTERVAL_SECONDS, deactivate_expired_api_keys
+    from .autoscale_utils import AUTOSCALE_INTERVAL_SECONDS, autoscale
+
+    schedule_periodic(app, "image-gc", IMAGE_GC_INTERVAL_SECONDS, collect_images)
+    schedule_periodic(app, "reconcile", RECONCILE_INTERVAL_SECONDS, reconcile_containers)
+    schedule_periodic(
+        app, "api-key-sweep", API_KEY_SWEEP_INTERVAL_SECONDS, deactivate_expired_api_keys
+    )
+    schedule_periodic(app, "autoscale", AUTOSCALE_INTERVAL_SECONDS, autoscale)
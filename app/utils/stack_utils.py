@@ -0,0 +1,158 @@
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STACK_MAX_SERVICES = int(os.environ.get("STACK_MAX_SERVICES", "10"))
+# Services started (or torn down) at the same time within one stack
+STACK_MAX_PARALLEL = int(os.environ.get("STACK_MAX_PARALLEL", "4"))
+STACK_NETWORK_PREFIX = os.environ.get("STACK_NETWORK_PREFIX", "stack-")
+STACK_ID_LABEL = "cloud-platform.stack-id"
+# How often a running orchestration refreshes stacks.heartbeat_at
+STACK_HEARTBEAT_SECONDS = int(os.environ.get("STACK_HEARTBEAT_SECONDS", "15"))
+# A PENDING stack whose heartbeat is older than this is treated as FAILED
+STACK_STALE_SECONDS = int(os.environ.get("STACK_STALE_SECONDS", "120"))
+
+# Used as Docker names, network aliases and subdomain parts
+NAME_PATTERN = re.compile(r"^[a-z][a-z0-9-]{0,30}$")
+
+
+def _validate_ports(ports, where):
+    if not isinstance(ports, list):
+        return f"{where}.ports must be a list"
+    for entry in ports:
+        if not isinstance(entry, dict) or not isinstance(entry.get("port"), int):
+            return f"{where}.ports entries must be objects with an integer 'port'"
+    return None
+
+
+def validate_stack_spec(spec):
+    """
+    Return an error message for an invalid stack spec, or None.
+
+    {
+      "name": "rag",
+      "environment": {"SHARED": "1"},
+      "services": [
+        {"name": "vectordb", "available_model_id": 3, "ports": [{"port": 6333}]},
+        {"name": "llm", "available_model_id": 1, "ports": [{"port": 8080}],
+         "environment": {"VECTOR_URL": "http://vectordb:6333"},
+         "depends_on": ["vectordb"]}
+      ]
+    }
+    """
+    if not isinstance(spec, dict):
+        return "Stack spec must be an object"
+    if not isinstance(spec.get("name"), str) or not NAME_PATTERN.match(spec["name"]):
+        return "'name' must be lowercase letters, digits and '-' (max 31 chars)"
+    if not isinstance(spec.get("environment", {}), dict):
+        return "'environment' must be an object"
+
+    services = spec.get("services")
+    if not isinstance(services, list) or not services:
+        return "'services' must be a non-empty list"
+    if len(services) > STACK_MAX_SERVICES:
+        return f"A stack can have at most {STACK_MAX_SERVICES} services"
+
+    names = set()
+    for i, service in enumerate(services):
+        where = f"services[{i}]"
+        if not isinstance(service, dict):
+            return f"{where} must be an object"
+        name = service.get("name")
+        if not isinstance(name, str) or not NAME_PATTERN.match(name):
+            return f"{where}.name must be lowercase letters, digits and '-' (max 31 chars)"
+        if name in names:
+            return f"Duplicate service name '{name}'"
+        names.add(name)
+        if not isinstance(service.get("available_model_id"), int):
+            return f"{where}.available_model_id must be an integer"
+        if not isinstance(service.get("environment", {}), dict):
+            return f"{where}.environment must be an object"
+        error = _validate_ports(service.get("ports", []), where)
+        if error:
+            return error
+        depends_on = service.get("depends_on", [])
+        if not isinstance(depends_on, list) or not all(isinstance(d, str) for d in depends_on):
+            return f"{where}.depends_on must be a list of service names"
+
+    for service in services:
+        for dependency in service.get("depends_on", []):
+            if dependency not in names:
+                return f"Service '{service['name']}' depends on unknown service '{dependency}'"
+            if dependency == service["name"]:
+                return f"Service '{service['name']}' depends on itself"
+
+    try:
+        startup_order(dependency_map(spec))
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def dependency_map(spec):
+    return {s["name"]: list(dict.fromkeys(s.get("depends_on", []))) for s in spec["services"]}
+
+
+def startup_order(dependencies):
+    """Topological order of service names; raises ValueError on a cycle."""
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    order = []
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(
+                f"Dependency cycle between services: {', '.join(sorted(remaining))}"
+            )
+        for name in ready:
+            del remaining[name]
+            for deps in remaining.values():
+                deps.discard(name)
+        order.extend(ready)
+    return order
+
+
+def run_dag(dependencies, start, max_parallel=STACK_MAX_PARALLEL):
+    """
+    Call start(name) for every service, each as soon as its dependencies succeeded.
+
+    Independent services run in parallel (up to max_parallel). start returns
+    True on success; a failed service's dependents are never started.
+    Returns (succeeded, failed, skipped) sets of names.
+    """
+    succeeded, failed, skipped = set(), set(), set()
+    waiting = dict(dependencies)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        while waiting or running:
+            for name, deps in list(waiting.items()):
+                if any(d in failed or d in skipped for d in deps):
+                    skipped.add(name)
+                    del waiting[name]
+                elif all(d in succeeded for d in deps):
+                    running[pool.submit(start, name)] = name
+                    del waiting[name]
+
+            if not running:
+                # Everything left waits on something that can't start
+                skipped.update(waiting)
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    ok = future.result()
+                except Exception:
+                    ok = False
+                (succeeded if ok else failed).add(name)
+
+    return succeeded, failed, skipped
+
+
+def run_parallel(items, fn, max_parallel=STACK_MAX_PARALLEL):
+    """Apply fn to every item concurrently; returns the results in order."""
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(items))) as pool:
+        return list(pool.map(fn, items))
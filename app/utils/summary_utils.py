@@ -0,0 +1,85 @@
+import os
+
+from sqlalchemy import func
+
+from app import db
+from app.models.api_key import APIKey
+from app.models.available_models import AvailableModel
+from app.models.container import Container, ContainerStatus
+from app.utils.cache_utils import TTLCache
+from app.utils.timing_utils import timed
+
+SUMMARY_CACHE_TTL_SECONDS = float(os.environ.get("SUMMARY_CACHE_TTL_SECONDS", "5"))
+
+summary_cache = TTLCache(SUMMARY_CACHE_TTL_SECONDS)
+
+
+@timed()
+def build_user_summary(user_id):
+    """Dashboard counts for one user, computed with GROUP BY aggregates."""
+    status_rows = (
+        db.session.query(
+            Container.status,
+            func.count(Container.id),
+            # Mappings without a host_port were released (e.g. by reconcile)
+            func.coalesce(
+                func.sum(
+                    func.jsonb_array_length(
+                        func.jsonb_path_query_array(Container.ports, "$[*].host_port")
+                    )
+                ),
+                0,
+            ),
+        )
+        .filter(Container.user_id == user_id)
+        .group_by(Container.status)
+        .all()
+    )
+
+    model_rows = (
+        db.session.query(
+            Container.available_model_id, AvailableModel.name, func.count(Container.id)
+        )
+        .join(AvailableModel, AvailableModel.id == Container.available_model_id)
+        .filter(Container.user_id == user_id)
+        .group_by(Container.available_model_id, AvailableModel.name)
+        .all()
+    )
+
+    key_rows = (
+        db.session.query(APIKey.is_active, func.count(APIKey.id))
+        .filter(APIKey.user_id == user_id)
+        .group_by(APIKey.is_active)
+        .all()
+    )
+
+    by_status = {status.value: 0 for status in ContainerStatus}
+    total_ports = 0
+    for status, count, ports in status_rows:
+        by_status[status.value] = count
+        total_ports += int(ports)
+
+    api_keys = {"active": 0, "inactive": 0}
+    for is_active, count in key_rows:
+        api_keys["active" if is_active else "inactive"] += count
+
+    return {
+        "user_id": user_id,
+        "total_containers": sum(by_status.values()),
+        "containers_by_status": by_status,
+        "containers_by_model": [
+            {"available_model_id": model_id, "model_name": name, "count": count}
+            for model_id, name, count in model_rows
+        ],
+        "api_keys": {**api_keys, "total": api_keys["active"] + api_keys["inactive"]},
+        "allocated_ports": total_ports,
+    }
+
+
+def get_user_summary(user_id):
+    """Cached per user for SUMMARY_CACHE_TTL_SECONDS."""
+    summary = summary_cache.get(user_id)
+    if summary is None:
+        summary = build_user_summary(user_id)
+        summary_cache.set(user_id, summary)
+    return summary
@@ -0,0 +1,77 @@
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+from app.utils.metrics_utils import metrics
+
+# Emit a Server-Timing header on responses; spans are always aggregated into
+# the metrics histograms either way
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "true").lower() == "true"
+
+
+def _record(name, seconds):
+    metrics.observe("span_duration_seconds", seconds, span=name)
+    if has_request_context():
+        spans = g.setdefault("timing_spans", {})
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+@contextmanager
+def span(name):
+    """Time a block as a named span; repeated spans in one request add up."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def timed(name=None):
+    """Decorator form of span(); the span defaults to the function name."""
+
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+
+def _add_server_timing(response):
+    started_at = g.get("request_started_at")
+    if started_at is None:
+        return response
+
+    total = time.perf_counter() - started_at
+    metrics.observe(
+        "http_request_duration_seconds",
+        total,
+        endpoint=request.endpoint or "unmatched",
+        method=request.method,
+    )
+
+    if SERVER_TIMING_HEADER:
+        entries = [
+            f"{name};dur={seconds * 1000:.2f}"
+            for name, seconds in g.get("timing_spans", {}).items()
+        ]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+
+def init_timing(app):
+    app.before_request(_start_request_timer)
+    app.after_request(_add_server_timing)
@@ -1,6 +1,5 @@
 import hashlib
 import socket
-import docker
 import time  # Import time for the current timestamp
 from app.models.container import Container
 
@@ -0,0 +1,126 @@
+"""
+Rejection throughput of POST /api/api-keys/validate under a random-key flood.
+
+Seeds a model, a container and --keys API keys into the database at
+DATABASE_URL (use a scratch database), then sends --requests random keys
+through the app in three modes:
+
+- no filter:   every key costs a Postgres lookup (the old behaviour)
+- filter:      Bloom filter + negative cache, one source IP per request; the
+               only DB queries are catch-up syncs, at most one per
+               API_KEY_FILTER_CATCH_UP_SECONDS
+- offender:    filter on, all requests from one IP (blocked after the threshold)
+
+Seeded rows are removed afterwards.
+
+    python benchmarks/bench_api_key_flood.py [--keys 50000] [--requests 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, text  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+import app.utils.key_filter_utils as key_filter_utils  # noqa: E402
+from app.utils.key_filter_utils import ApiKeyFilter  # noqa: E402
+
+BENCH_CONTAINER = "bench-flood-container"
+
+
+def seed(keys):
+    db.session.execute(
+        text(
+            "INSERT INTO available_models (name, docker_image, version, is_active, created_at, updated_at) "
+            "VALUES ('bench-flood-model', 'bench/flood:latest', 'latest', true, now(), now())"
+        )
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO containers (id, user_id, name, available_model_id, status, created_at) "
+            "SELECT :id, 0, 'bench-flood', id, 'RUNNING', now() FROM available_models "
+            "WHERE name = 'bench-flood-model'"
+        ),
+        {"id": BENCH_CONTAINER},
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO api_keys (id, user_id, container_id, key, is_active, created_at) "
+            "SELECT gen_random_uuid()::text, 0, :container, "
+            "replace(gen_random_uuid()::text, '-', ''), true, now() "
+            "FROM generate_series(1, :keys)"
+        ),
+        {"container": BENCH_CONTAINER, "keys": keys},
+    )
+    db.session.commit()
+
+
+def cleanup():
+    db.session.execute(text("DELETE FROM api_keys WHERE container_id = :c"), {"c": BENCH_CONTAINER})
+    db.session.execute(text("DELETE FROM containers WHERE id = :c"), {"c": BENCH_CONTAINER})
+    db.session.execute(text("DELETE FROM available_models WHERE name = 'bench-flood-model'"))
+    db.session.commit()
+
+
+def flood(client, requests, single_ip):
+    keys = [uuid.uuid4().hex for _ in range(requests)]
+    statuses = {}
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        ip = "203.0.113.7" if single_ip else f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        response = client.post(
+            "/api/api-keys/validate",
+            headers={"X-API-Key": key, "X-Forwarded-For": ip, "Host": "bench.example.com"},
+        )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return time.perf_counter() - start, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    queries = {"count": 0}
+
+    with app.app_context():
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *a, **k: queries.__setitem__("count", queries["count"] + 1),
+        )
+        cleanup()
+        seed(args.keys)
+        try:
+            print(f"seeded {args.keys} keys; flooding with {args.requests} random keys\n")
+            print(f"{'mode':<12}{'req/s':>10}{'us/req':>10}{'db queries':>12}  statuses")
+
+            for mode in ("no filter", "filter", "offender"):
+                fresh = ApiKeyFilter()
+                key_filter_utils.API_KEY_FILTER_ENABLED = mode != "no filter"
+                if mode != "no filter":
+                    fresh.rebuild()
+                    # Keep the benchmark single-threaded: no background refresh
+                    fresh._thread = object()
+                key_filter_utils.api_key_filter.__dict__.update(fresh.__dict__)
+
+                queries["count"] = 0
+                elapsed, statuses = flood(client, args.requests, single_ip=mode == "offender")
+                print(
+                    f"{mode:<12}{args.requests / elapsed:>10.0f}"
+                    f"{elapsed / args.requests * 1e6:>10.0f}{queries['count']:>12}  {statuses}"
+                )
+        finally:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
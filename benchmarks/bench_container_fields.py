@@ -0,0 +1,219 @@
+"""
+DB time and payload size of container list/detail responses with ?fields=.
+
+Seeds --containers containers (each with a config env dict and --keys API
+keys) for one user into the database at DATABASE_URL (use a scratch
+database), then builds the /containers/user/<id> and /container/<id>
+responses --repeat times in three modes:
+
+- orm:         Container.query + per-row model lookup (the old handlers)
+- all fields:  column projection, every field (the default response)
+- name,status: column projection, ?fields=name,status (a typical list view)
+
+DB time is measured from cursor execute events. Seeded rows are removed
+afterwards.
+
+    python benchmarks/bench_container_fields.py [--containers 2000] [--keys 3] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, text  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models.container import Container  # noqa: E402
+from app.utils.container_fields_utils import (  # noqa: E402
+    DETAIL_FIELDS,
+    SUMMARY_FIELDS,
+    parse_fields,
+    row_serializer,
+    select_containers,
+)
+from app.utils.model_cache_utils import model_cache  # noqa: E402
+
+BENCH_USER = 987654
+
+
+def seed(containers, keys):
+    db.session.execute(
+        text(
+            "INSERT INTO available_models (name, description, docker_image, version, is_active, created_at, updated_at) "
+            "VALUES ('bench-fields-model', 'A small language model served over HTTP', "
+            "'bench/fields:latest', 'latest', true, now(), now())"
+        )
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO containers (id, user_id, name, available_model_id, status, ports, config, created_at) "
+            "SELECT gen_random_uuid()::text, :user, 'bench-' || i, m.id, 'RUNNING', "
+            "jsonb_build_array(jsonb_build_object('host_port', 6000 + i, 'container_port', 8080)), "
+            "jsonb_build_object('host', 'bench-' || i || '.example.com', 'environment', "
+            "(SELECT jsonb_object_agg('VAR_' || j, repeat('x', 40)) FROM generate_series(1, 20) j)), "
+            "now() FROM generate_series(1, :n) i, available_models m WHERE m.name = 'bench-fields-model'"
+        ),
+        {"user": BENCH_USER, "n": containers},
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO api_keys (id, user_id, container_id, key, is_active, created_at) "
+            "SELECT gen_random_uuid()::text, :user, c.id, replace(gen_random_uuid()::text, '-', ''), true, now() "
+            "FROM containers c, generate_series(1, :keys) WHERE c.user_id = :user"
+        ),
+        {"user": BENCH_USER, "keys": keys},
+    )
+    db.session.commit()
+
+
+def cleanup():
+    db.session.execute(
+        text(
+            "DELETE FROM api_keys WHERE container_id IN (SELECT id FROM containers WHERE user_id = :u)"
+        ),
+        {"u": BENCH_USER},
+    )
+    db.session.execute(text("DELETE FROM containers WHERE user_id = :u"), {"u": BENCH_USER})
+    db.session.execute(text("DELETE FROM available_models WHERE name = 'bench-fields-model'"))
+    db.session.commit()
+
+
+def orm_list():
+    """The pre-fields list handler: ORM objects and every field."""
+    rows = []
+    for container in Container.query.filter_by(user_id=BENCH_USER).all():
+        model = model_cache.get(container.available_model_id) or container.available_model
+        rows.append(
+            {
+                "id": container.id,
+                "user_id": container.user_id,
+                "name": container.name,
+                "available_model_id": container.available_model_id,
+                "model_name": model.name,
+                "model_description": model.description,
+                "docker_image": model.docker_image,
+                "status": container.status.value,
+                "ports": container.ports,
+                "replicas": container.replicas,
+                "cpuset": container.cpuset,
+                "config": container.config,
+                "created_at": container.created_at.isoformat(),
+            }
+        )
+    return rows
+
+
+def orm_detail(container_id):
+    """The pre-fields detail handler: ORM object plus the api_keys relationship."""
+    container = db.session.get(Container, container_id)
+    model = model_cache.get(container.available_model_id) or container.available_model
+    return {
+        "id": container.id,
+        "user_id": container.user_id,
+        "name": container.name,
+        "available_model_id": container.available_model_id,
+        "model_name": model.name,
+        "model_description": model.description,
+        "docker_image": model.docker_image,
+        "version": model.version,
+        "status": container.status.value,
+        "ports": container.ports or [],
+        "replicas": container.replicas,
+        "cpuset": container.cpuset,
+        "config": container.config or {},
+        "created_at": container.created_at.isoformat(),
+        "updated_at": model.updated_at.isoformat(),
+        "is_active": model.is_active,
+        "api_keys": [
+            {
+                "id": k.id,
+                "key": k.key,
+                "is_active": k.is_active,
+                "created_at": k.created_at.isoformat(),
+            }
+            for k in container.api_keys
+        ],
+    }
+
+
+def projected_list(raw_fields):
+    fields, _ = parse_fields(raw_fields, SUMMARY_FIELDS)
+    rows = select_containers(fields, Container.user_id == BENCH_USER)
+    serialize = row_serializer(rows, fields)
+    return [serialize(row) for row in rows]
+
+
+def projected_detail(container_id, raw_fields):
+    fields, _ = parse_fields(raw_fields, DETAIL_FIELDS)
+    rows = select_containers(fields, Container.id == container_id)
+    return row_serializer(rows, fields, detail=True)(rows[0])
+
+
+def measure(app, build, repeat, db_time):
+    """(best total ms, best DB ms, payload bytes) over repeat runs."""
+    best_total = best_db = float("inf")
+    size = 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        db_time["seconds"] = 0.0
+        start = time.perf_counter()
+        body = app.json.dumps(build())
+        best_total = min(best_total, time.perf_counter() - start)
+        best_db = min(best_db, db_time["seconds"])
+        size = len(body.encode())
+        db.session.rollback()
+    return best_total * 1000, best_db * 1000, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--containers", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    db_time = {"seconds": 0.0}
+
+    with app.app_context():
+        started = {}
+
+        def before(conn, cursor, statement, parameters, context, executemany):
+            started[id(cursor)] = time.perf_counter()
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            db_time["seconds"] += time.perf_counter() - started.pop(id(cursor), time.perf_counter())
+
+        event.listen(db.engine, "before_cursor_execute", before)
+        event.listen(db.engine, "after_cursor_execute", after)
+
+        cleanup()
+        seed(args.containers, args.keys)
+        try:
+            container_id = db.session.execute(
+                text("SELECT id FROM containers WHERE user_id = :u LIMIT 1"), {"u": BENCH_USER}
+            ).scalar()
+            model_cache.get(0)  # load the catalog outside the timings
+
+            print(f"{args.containers} containers, {args.keys} keys each, best of {args.repeat}\n")
+            print(f"{'view':<8}{'mode':<13}{'total ms':>10}{'db ms':>9}{'bytes':>12}")
+            cases = [
+                ("list", "orm", orm_list),
+                ("list", "all fields", lambda: projected_list(None)),
+                ("list", "name,status", lambda: projected_list("name,status")),
+                ("detail", "orm", lambda: orm_detail(container_id)),
+                ("detail", "all fields", lambda: projected_detail(container_id, None)),
+                ("detail", "name,status", lambda: projected_detail(container_id, "name,status")),
+            ]
+            for view, mode, build in cases:
+                total, db_ms, size = measure(app, build, args.repeat, db_time)
+                print(f"{view:<8}{mode:<13}{total:>10.2f}{db_ms:>9.2f}{size:>12,}")
+        finally:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Encode time and bytes on the wire for a 10k-container list response.
+
+Compares Flask's default JSON provider with FastJSONProvider, buffered and
+streamed, across identity/gzip/brotli encodings. No database is needed; rows
+are synthetic dicts shaped like the /containers/user/<id> response.
+
+    python benchmarks/bench_json_responses.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app.models.container import ContainerStatus  # noqa: E402
+from app.utils.compression_utils import init_compression  # noqa: E402
+from app.utils.json_utils import FastJSONProvider, json_array_response  # noqa: E402
+
+
+def make_rows(n):
+    now = datetime.datetime(2025, 2, 1, 12, 0, 0)
+    statuses = list(ContainerStatus)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": i % 50,
+            "name": f"container-{i}",
+            "available_model_id": i % 20,
+            "model_name": f"model-{i % 20}",
+            "model_description": "A small language model served over HTTP",
+            "docker_image": f"registry.example.com/models/model-{i % 20}:latest",
+            "status": statuses[i % len(statuses)],
+            "ports": [{"host_port": 6000 + i % 1000, "container_port": 8080, "protocol": "tcp"}],
+            "config": {"environment": {"MODEL_THREADS": "4", "LOG_LEVEL": "info"}},
+            "created_at": now + datetime.timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+
+
+def build_app(provider_cls):
+    app = Flask(__name__)
+    app.json = provider_cls(app)
+    init_compression(app)
+
+    return app
+
+
+def measure(app, rows, accept_encoding, repeat):
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        with app.test_request_context(headers={"Accept-Encoding": accept_encoding}):
+            start = time.perf_counter()
+            response = json_array_response(rows, lambda row: row)
+            response = app.process_response(response)
+            body = b"".join(response.response) if response.is_streamed else response.get_data()
+            best = min(best, time.perf_counter() - start)
+            size = len(body)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import app.utils.json_utils as json_utils
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'provider':<10} {'mode':<9} {'encoding':<9} {'ms':>9} {'bytes':>11}")
+
+    for provider_name, provider_cls in (
+        ("default", DefaultJSONProvider),
+        ("fast", FastJSONProvider),
+    ):
+        for mode, threshold in (("buffered", args.rows + 1), ("streamed", 0)):
+            json_utils.JSON_STREAM_THRESHOLD = threshold
+            app = build_app(provider_cls)
+            for encoding in ("identity", "gzip", "br"):
+                seconds, size = measure(app, rows, encoding, args.repeat)
+                print(
+                    f"{provider_name:<10} {mode:<9} {encoding:<9} "
+                    f"{seconds * 1000:>9.1f} {size:>11,}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Catalog search latency on a synthetic 100k-row available_models table.
+
+Inserts rows named "bench-model-<n>" into the database at DATABASE_URL
+(use a scratch database), times GET /api/models/ queries through the app,
+prints the plan of the text search, then deletes the rows again.
+
+    python benchmarks/bench_model_search.py [--rows 100000] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+
+FAMILIES = ("llama", "mistral", "whisper", "phi", "gemma", "qwen", "falcon", "bert")
+
+QUERIES = (
+    ("first page", "/api/models/?limit=50"),
+    ("active only", "/api/models/?is_active=true&limit=50"),
+    ("text search", "/api/models/?q=whisper%20speech&limit=50"),
+    ("prefix search", "/api/models/?q=gemm&is_active=true&limit=50"),
+    ("rare term", "/api/models/?q=variant%2099917"),
+    ("newest first", "/api/models/?sort=-created_at&limit=50"),
+)
+
+
+def seed(rows):
+    families = "ARRAY[" + ",".join(f"'{f}'" for f in FAMILIES) + "]"
+    db.session.execute(
+        text(
+            f"""
+            INSERT INTO available_models
+                (name, description, docker_image, version, is_active, created_at, updated_at)
+            SELECT 'bench-model-' || g,
+                   ({families})[1 + g % {len(FAMILIES)}] || ' variant ' || g
+                       || CASE WHEN g % 7 = 0 THEN ' speech' ELSE ' chat' END,
+                   'registry.example.com/bench/model-' || g,
+                   'latest',
+                   g % 5 <> 0,
+                   now() - (g || ' seconds')::interval,
+                   now()
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"rows": rows},
+    )
+    db.session.commit()
+    db.session.execute(text("ANALYZE available_models"))
+    db.session.commit()
+
+
+def cleanup():
+    db.session.execute(text("DELETE FROM available_models WHERE name LIKE 'bench-model-%'"))
+    db.session.commit()
+
+
+def time_query(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return statistics.median(timings), max(timings), len(response.get_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        cleanup()
+        start = time.perf_counter()
+        seed(args.rows)
+        print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s\n")
+
+        try:
+            print(f"{'query':<16}{'median ms':>12}{'max ms':>10}{'rows':>8}")
+            for label, url in QUERIES:
+                median, worst, count = time_query(client, url, args.repeat)
+                print(f"{label:<16}{median:>12.2f}{worst:>10.2f}{count:>8}")
+
+            plan = db.session.execute(
+                text(
+                    "EXPLAIN ANALYZE SELECT id FROM available_models "
+                    "WHERE search_vector @@ to_tsquery('simple', 'whisper:* & speech:*') "
+                    "ORDER BY name, id LIMIT 51"
+                )
+            ).fetchall()
+            print("\nplan for text search:")
+            for (line,) in plan:
+                print(f"  {line}")
+        finally:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
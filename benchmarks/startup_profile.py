@@ -0,0 +1,113 @@
+"""
+Import-time profile and time-to-first-request for the web app.
+
+Runs `import app; create_app()` in a fresh interpreter with -X importtime,
+then reports the slowest top-level imports and the wall time until a first
+request has been served by the test client. Meant to be run in CI:
+
+    python benchmarks/startup_profile.py [--top 15] [--runs 5] [--json]
+                                         [--budget-ms 300]
+
+Exits non-zero when the median time-to-first-request exceeds --budget-ms.
+No database connection is needed; the probed route fails auth before any
+query is made.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+FIRST_REQUEST_SNIPPET = """
+import time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+client = app.test_client()
+client.get("/api/deploy/container/startup-probe")
+print(round((time.perf_counter() - start) * 1000, 2))
+"""
+
+
+def parse_importtime(stderr):
+    """Return [(cumulative_us, self_us, depth, module)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((cumulative_us, self_us, depth, name.strip()))
+    return rows
+
+
+def run_importtime():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import create_app; create_app()"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def run_first_request():
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SNIPPET],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    rows = run_importtime()
+    top_level = sorted((r for r in rows if r[2] <= 1), reverse=True)[: args.top]
+    total_ms = sum(r[1] for r in rows) / 1000
+    first_request = [run_first_request() for _ in range(args.runs)]
+    median_ms = statistics.median(first_request)
+
+    report = {
+        "import_total_ms": round(total_ms, 1),
+        "time_to_first_request_ms": {
+            "median": median_ms,
+            "min": min(first_request),
+            "max": max(first_request),
+        },
+        "slowest_imports": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(own / 1000, 1)}
+            for cum, own, _, name in top_level
+        ],
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Total import time: {report['import_total_ms']} ms")
+        print(f"Time to first request (median of {args.runs}): {median_ms} ms")
+        print(f"\n{'module':<45} {'cumulative ms':>14} {'self ms':>9}")
+        for entry in report["slowest_imports"]:
+            print(f"{entry['module']:<45} {entry['cumulative_ms']:>14} {entry['self_ms']:>9}")
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"\nTime to first request {median_ms} ms exceeds budget {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""add PAUSED to containerstatus enum
+
+Revision ID: c4e2a91f3d60
+Revises: 5b1c9e04a7d2
+Create Date: 2026-10-19 14:06:31.550812
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e2a91f3d60'
+down_revision = '5b1c9e04a7d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ALTER TYPE ... ADD VALUE can't run inside a transaction block on older
+    # PostgreSQL versions
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE containerstatus ADD VALUE IF NOT EXISTS 'PAUSED'")
+
+
+def downgrade():
+    # PostgreSQL can't drop a value from an enum type; move rows off it instead
+    op.execute("UPDATE containers SET status = 'STOPPED' WHERE status = 'PAUSED'")
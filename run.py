@@ -1,6 +1,7 @@
 from app import create_app, db
 
 from sqlalchemy.exc import OperationalError
+import os
 
 # from app.models.user import User
 
@@ -21,7 +22,15 @@ def create_tables():
         print(f"Details: {e}")
 
 
-if __name__ == "__main__":
+@app.cli.command("create-tables")
+def create_tables_command():
+    """Create any missing tables (prefer `flask db upgrade`)."""
     create_tables()
+
+
+if __name__ == "__main__":
+    # Schema is managed by migrations; opt back in to create_all on boot if needed
+    if os.getenv("CREATE_TABLES_ON_START", "false").lower() == "true":
+        create_tables()
     print(app.url_map)
     app.run(debug=True, port=5001, host="0.0.0.0")